@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgentFleet - 單一行程驅動多台機台的 AutoTestAgent
+讀取 host:port 目標清單，在同一個 asyncio 事件迴圈中為每台機台建立獨立的 agent、日誌與統計
+"""
+
+import os
+import time
+import asyncio
+import argparse
+
+from AsyncAutoTestAgent import AsyncAutoTestAgent, run_agents
+from AgentMetrics import Histogram
+
+
+def parse_target(text):
+    """解析 host:port，只有埠號時使用 127.0.0.1"""
+    text = text.strip()
+    if ':' in text:
+        host, port = text.rsplit(':', 1)
+    else:
+        host, port = "127.0.0.1", text
+    return host or "127.0.0.1", int(port)
+
+
+def load_targets(path):
+    """讀取目標清單檔，每行一個 host:port，# 之後為註解"""
+    targets = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                targets.append(parse_target(line))
+    return targets
+
+
+class AgentFleet:
+    def __init__(self, targets, log_dir="FleetLogs", record_mode="text", summary_interval=10.0,
+                 input_format="simple", race_drive=False, schedule_input=False, max_command_rate=30.0,
+                 coalesce="off", change_only=False, policy=None):
+        self.targets = targets
+        self.log_dir = log_dir
+        self.summary_interval = summary_interval
+        os.makedirs(log_dir, exist_ok=True)
+
+        self.agents = []
+        for host, port in targets:
+            name = f"{host.replace('.', '_')}_{port}"
+            self.agents.append(AsyncAutoTestAgent(
+                host=host,
+                port=port,
+                log_file=os.path.join(log_dir, f"AutoTestAgent_{name}.log"),
+                record_mode=record_mode,
+                capture_file=os.path.join(log_dir, f"AutoTestAgent_{name}.capture"),
+                echo=False,
+                input_format=input_format,
+                race_drive=race_drive,
+                schedule_input=schedule_input,
+                max_command_rate=max_command_rate,
+                coalesce=coalesce,
+                change_only=change_only,
+                policy=policy
+            ))
+
+        self._last_frames = [0] * len(self.agents)
+        self._last_time = time.monotonic()
+
+    def summary(self):
+        """彙整所有機台的吞吐量與延遲"""
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        lines = []
+        total_fps = 0.0
+        all_latency = Histogram()
+
+        for i, agent in enumerate(self.agents):
+            frames = agent.metrics.frames
+            fps = (frames - self._last_frames[i]) / elapsed
+            self._last_frames[i] = frames
+            total_fps += fps
+            latency = agent.metrics.histograms["latency"]
+            all_latency.merge(latency)
+            status = "🟢" if agent.transport else "🔴"
+            lines.append(f"   {status} {agent.host}:{agent.port}  frames={frames}  fps={fps:.1f}  "
+                         f"p99={latency.percentile(0.99) * 1000:.3f}ms  丟棄={agent.metrics.dropped}  重連={agent.metrics.reconnects}")
+
+        connected = sum(1 for agent in self.agents if agent.transport)
+        header = (f"📊 機台 {connected}/{len(self.agents)} 連線  總 fps={total_fps:.1f}  "
+                  f"延遲 p50={all_latency.percentile(0.5) * 1000:.3f}ms  "
+                  f"p99={all_latency.percentile(0.99) * 1000:.3f}ms")
+        self._last_time = now
+        return "\n".join([header] + lines)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.summary_interval)
+            print(self.summary())
+
+    async def run(self, duration=None):
+        print(f"🚀 AgentFleet 啟動，共 {len(self.agents)} 台機台，日誌目錄: {self.log_dir}")
+        reporter = asyncio.create_task(self._report())
+        try:
+            if duration:
+                try:
+                    await asyncio.wait_for(run_agents(self.agents), duration)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await run_agents(self.agents)
+        finally:
+            reporter.cancel()
+            print(self.summary())
+            self.stop()
+
+    def stop(self):
+        for agent in self.agents:
+            agent.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AgentFleet - 單一行程驅動多台機台')
+    parser.add_argument('--targets', help='目標清單檔 (每行一個 host:port)')
+    parser.add_argument('--target', action='append', default=[], help='目標 host:port (可重複)')
+    parser.add_argument('--log-dir', default='FleetLogs', help='各機台日誌目錄')
+    parser.add_argument('--record', choices=['text', 'binary'], default='text', help='錄製模式 (預設 text)')
+    parser.add_argument('--summary-interval', type=float, default=10.0, help='統計輸出間隔 (秒)')
+    parser.add_argument('--duration', type=float, help='執行秒數 (未指定時持續執行)')
+    parser.add_argument('--input-format', choices=['simple', 'complex'], default='simple', help='輸入格式')
+    parser.add_argument('--race-drive', action='store_true', help='比賽中依 race_data 自動轉向 (需搭配 --input-format complex)')
+    parser.add_argument('--schedule-input', action='store_true', help='以輸入排程取代每個 frame 送一個指令')
+    parser.add_argument('--max-rate', type=float, default=30.0, help='排程模式每台機台每秒最多送出的指令數')
+    parser.add_argument('--coalesce', choices=['off', 'latest', 'transitions'], default='off', help='落後時的積壓處理')
+    parser.add_argument('--change-only', action='store_true', help='相同的 frame 不解析也不記錄，只記錄變更的欄位')
+    parser.add_argument('--policy', help='決策策略：規則檔 (.json) 或提供 decide(game_data) 的 Python 模組')
+    args = parser.parse_args()
+    if args.race_drive and args.input_format != 'complex':
+        parser.error('--race-drive 需要 --input-format complex')
+
+    targets = [parse_target(target) for target in args.target]
+    if args.targets:
+        targets += load_targets(args.targets)
+    if not targets:
+        parser.error("請使用 --targets 或 --target 指定至少一台機台")
+
+    fleet = AgentFleet(targets, log_dir=args.log_dir, record_mode=args.record,
+                       summary_interval=args.summary_interval, input_format=args.input_format,
+                       race_drive=args.race_drive, schedule_input=args.schedule_input,
+                       max_command_rate=args.max_rate, coalesce=args.coalesce,
+                       change_only=args.change_only, policy=args.policy)
+    try:
+        asyncio.run(fleet.run(args.duration))
+    except KeyboardInterrupt:
+        print("\n收到中斷信號，正在優雅退出...")
+        fleet.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgentInput - 單一 frame 的輸入組合
+把同一個 frame 的按下、放開與 VR 類比數值合併成一個 ComplexInputCommand 封包
+"""
+
+from ProtoSchema.InputCommand_pb2 import ComplexInputCommand, EInputKeyType, EInputVrType
+
+
+class InputFrame:
+    def __init__(self):
+        self.pressed = []
+        self.released = []
+        self.analog = {}
+
+    def press(self, key):
+        if key not in self.pressed:
+            self.pressed.append(key)
+
+    def release(self, key):
+        if key not in self.released:
+            self.released.append(key)
+
+    def set_axis(self, vr_type, value):
+        self.analog[vr_type] = value
+
+    def is_empty(self):
+        return not (self.pressed or self.released or self.analog)
+
+    def to_complex(self, timestamp):
+        """組成 ComplexInputCommand：放開在前、按下在後，最後是類比數值"""
+        command = ComplexInputCommand()
+        command.timestamp = timestamp
+        for keys, is_key_down in ((self.released, False), (self.pressed, True)):
+            if keys:
+                digital = command.digital_inputs.add()
+                digital.key_inputs.extend(keys)
+                digital.is_key_down = is_key_down
+                digital.timestamp = timestamp
+        for vr_type, value in self.analog.items():
+            analog = command.analog_inputs.add()
+            analog.vr_type = vr_type
+            analog.value = value
+            analog.timestamp = timestamp
+        return command
+
+
+def describe_complex(command):
+    """日誌用的 ComplexInputCommand 摘要，例: 放開 LEFT / 按下 START / THROTTLE=1.00"""
+    parts = []
+    for digital in command.digital_inputs:
+        keys = ", ".join(EInputKeyType.Name(key).replace("INPUT_KEY_", "") for key in digital.key_inputs)
+        parts.append(f"{'按下' if digital.is_key_down else '放開'} {keys}")
+    for analog in command.analog_inputs:
+        parts.append(f"{EInputVrType.Name(analog.vr_type).replace('INPUT_VR_', '')}={analog.value:.2f}")
+    return " / ".join(parts)
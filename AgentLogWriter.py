@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgentLogWriter - 非阻塞背景日誌寫入器
+由背景執行緒持有檔案控制代碼，批次寫入並定時 flush，讓收發迴圈不必等待磁碟
+"""
+
+import queue
+import threading
+import time
+
+
+class AgentLogWriter:
+    """背景日誌寫入器
+
+    - 有上限的佇列，滿了之後依 overflow 設定丟棄 ("drop") 或等待 ("block")
+    - 單一背景執行緒持有檔案，批次寫入
+    - 每 flush_interval 秒 flush 一次
+    """
+
+    def __init__(self, log_file, echo=True, queue_size=10000, flush_interval=0.5,
+                 batch_size=256, overflow="drop", encoding="utf-8"):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"無效的 overflow 設定: {overflow}")
+
+        self.log_file = log_file
+        self.echo = echo
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.encoding = encoding
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="AgentLogWriter")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def write(self, message):
+        """加入一筆日誌，時間戳記在背景執行緒才格式化"""
+        if self._closed:
+            return
+        item = (time.time(), message)
+        if self.overflow == "block":
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """停止背景執行緒並寫出剩餘日誌"""
+        if self._closed:
+            return
+        self._closed = True
+        # 結束標記一定要放進去，必要時等待佇列空出位置
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _format(self, item):
+        timestamp, message = item
+        return f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))}] {message}"
+
+    def _run(self):
+        try:
+            f = open(self.log_file, "a", encoding=self.encoding)
+        except Exception as e:
+            print(f"日誌寫入失敗: {e}")
+            f = None
+
+        last_flush = time.monotonic()
+        reported_dropped = 0
+        running = True
+
+        while running:
+            # 等待第一筆，再盡量取出同一批
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                batch = batch[:batch.index(None)]
+                running = False
+
+            lines = [self._format(item) for item in batch]
+            if self.dropped != reported_dropped:
+                lines.append(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] ⚠️ 日誌佇列已滿，累計丟棄 {self.dropped} 筆")
+                reported_dropped = self.dropped
+
+            if lines:
+                text = "\n".join(lines) + "\n"
+                if self.echo:
+                    print(text, end="")
+                if f:
+                    try:
+                        f.write(text)
+                    except Exception as e:
+                        print(f"日誌寫入失敗: {e}")
+
+            now = time.monotonic()
+            if f and (not running or now - last_flush >= self.flush_interval):
+                try:
+                    f.flush()
+                except Exception as e:
+                    print(f"日誌寫入失敗: {e}")
+                last_flush = now
+
+        if f:
+            f.close()
@@ -1,21 +1,36 @@
 #!/usr/bin/env python3
 """
-AgentMaker - 使用 Q CLI 生成 AutoTestAgent 的工具
-根據 GameSetting.md 和 Protobuf Schema 生成專屬的遊戲控制程式
+AgentMaker - 生成 AutoTestAgent 的工具
+根據 GameSetting.md 和 Protobuf Schema 生成專屬的遊戲控制程式；預設由模板產生，--backend qcli 改用 Q CLI
 """
 
 import os
+import re
 import sys
 import json
-import subprocess
+import time
+import string
+import difflib
+import argparse
 from pathlib import Path
 
+from QCliCache import QCliCache
+from QCliRunner import QCliRunner, DEFAULT_TIMEOUT
+from BuildManifest import BuildManifest, text_digest
+from GameSettingParser import load_game_spec, to_enum_suffix
+
 class AgentMaker:
-    def __init__(self):
+    def __init__(self, use_cache=True, timeout=DEFAULT_TIMEOUT, force=False, backend="template", log_file=None):
         self.project_root = Path(__file__).parent
         self.game_setting_path = self.project_root / "GameSetting" / "AutoTest_Game_Setting.md"
         self.proto_schema_path = self.project_root / "ProtoSchema"
-        self.log_file = self.project_root / "AgentMaker.log"
+        self.log_file = Path(log_file) if log_file else self.project_root / "AgentMaker.log"
+        self.agent_path = self.project_root / "AutoTestAgent.py"
+        self.input_configuration_path = self.proto_schema_path / "InputConfiguration.pb"
+        
+        # 生成後端：template 由模板與解析結果直接產生 (離線、可重現)，qcli 交給 Q CLI 生成
+        self.backend = backend
+        self.template_path = self.project_root / "Templates" / "AutoTestAgent.py.template"
         
         # 功能需求規格要求的輸入文件
         self.required_files = {
@@ -26,6 +41,17 @@ class AgentMaker:
             "InputCommand_pb2.py": self.proto_schema_path / "InputCommand_pb2.py"
         }
         
+        # Q CLI 生成快取：鍵包含提示詞與上列輸入文件內容
+        self.cache = QCliCache() if use_cache else None
+        self.cache_key = None
+        self.cache_hit = False
+        # Q CLI 呼叫的時間上限 (秒)，0 為不限
+        self.timeout = timeout
+        
+        # 增量建置清單：輸入與產物都未變更時不重新生成
+        self.manifest = BuildManifest(self.project_root / "AgentMaker_Manifest.json", self.project_root)
+        self.force = force
+        
     def validate_input_files(self):
         """驗證所有必要的輸入文件是否存在"""
         self.log("📋 檢查輸入文件...")
@@ -56,21 +82,67 @@ class AgentMaker:
         if not self.game_setting_path.exists():
             raise FileNotFoundError(f"找不到 GameSetting 文件: {self.game_setting_path}")
             
-        with open(self.game_setting_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
+        # 共用的 GameSetting.md 模型 (依內容雜湊快取)
+        spec = load_game_spec(self.game_setting_path)
+        
         # 提取關鍵資訊
         game_config = {
-            "states": self._extract_states(content),
-            "keys": self._extract_keys(content),
-            "blocked_keys": self._extract_blocked_keys(content), "udp_config": self._extract_udp_config(content)
+            "states": spec.states,
+            "keys": spec.keys,
+            "blocked_keys": self._map_blocked_keys(spec.blocked_keys), "udp_config": spec.udp_config,
+            "flow_operations": spec.flow_operations()
         }
         
         self.log(f"✅ 發現 {len(game_config['states'])} 個遊戲狀態")
         self.log(f"✅ 發現 {len(game_config['keys'])} 個按鍵定義")
+        self.log(f"✅ 發現 {len(game_config['flow_operations'])} 個需要操作的流程")
         
         return game_config
     
+    def _to_enum_suffix(self, name):
+        """將 GameSetting.md 的名稱轉成 proto 枚舉後綴，例: CoinPage -> COIN_PAGE"""
+        return to_enum_suffix(name)
+    
+    def compile_input_configuration(self, game_config):
+        """將各流程的按鍵操作編譯成 InputConfiguration 並序列化到 ProtoSchema"""
+        try:
+            sys.path.insert(0, str(self.project_root))
+            from ProtoSchema.GameFlowData_pb2 import EGameFlowState
+            from ProtoSchema.InputCommand_pb2 import InputConfiguration, EInputKeyType
+        except ImportError as e:
+            self.log(f"⚠️ 無法導入 Protobuf 模組，略過按鍵表編譯: {e}")
+            return None
+        
+        blocked = {self._to_enum_suffix(key) for key in game_config['blocked_keys']}
+        state_values = {value.name: value.number for value in EGameFlowState.DESCRIPTOR.values}
+        key_values = {value.name: value.number for value in EInputKeyType.DESCRIPTOR.values}
+        
+        configuration = InputConfiguration()
+        for flow, keys in game_config['flow_operations'].items():
+            state_name = f"GAME_FLOW_{self._to_enum_suffix(flow)}"
+            if state_name not in state_values:
+                self.log(f"⚠️ 找不到對應的流程狀態: {flow}")
+                continue
+            
+            mapping = configuration.state_mappings.add()
+            mapping.applicable_state = state_values[state_name]
+            mapping.description = flow
+            for key in keys:
+                key_suffix = self._to_enum_suffix(key)
+                key_name = f"INPUT_KEY_{key_suffix}"
+                if key_suffix in blocked:
+                    continue
+                if key_name not in key_values:
+                    self.log(f"⚠️ 找不到對應的按鍵: {flow} / {key}")
+                    continue
+                mapping.available_keys.append(key_values[key_name])
+        
+        with open(self.input_configuration_path, 'wb') as f:
+            f.write(configuration.SerializeToString())
+        
+        self.log(f"✅ 按鍵表已編譯: {self.input_configuration_path} ({len(configuration.state_mappings)} 個流程)")
+        return configuration
+    
     def analyze_protobuf_schema(self):
         """分析 Protobuf Schema"""
         self.log("🔍 分析 Protobuf Schema...")
@@ -103,13 +175,39 @@ class AgentMaker:
             self.log("🐧 檢測到 Unix 環境，直接執行 Q CLI...")
             return ["q", "chat", "--no-interactive", "--trust-all-tools"]
     
+    def render_agent_template(self, game_config):
+        """以模板產生 AutoTestAgent 程式碼，只替換屏蔽按鍵與 UDP 設定，其餘由 agent 執行時依 Schema 動態分析"""
+        self.log("🧩 使用模板生成程式碼...")
+        start = time.perf_counter()
+        with open(self.template_path, 'r', encoding='utf-8') as f:
+            template = string.Template(f.read())
+        try:
+            agent_code = template.substitute(
+                blocked_keys=json.dumps(game_config['blocked_keys']),
+                udp_host=json.dumps(game_config['udp_config']['host']),
+                udp_port=int(game_config['udp_config']['port'])
+            )
+        except (KeyError, ValueError) as e:
+            self.log(f"❌ 模板替換失敗: {e}")
+            return None
+        self.log(f"✅ 模板生成完成 ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return agent_code
+    
     def generate_agent_code(self, game_config, schema_info):
         """使用 Q CLI 生成 AutoTestAgent 程式碼"""
-        self.log("🤖 呼叫 Q CLI 生成程式碼...")
-        
         # 準備 Q CLI 指令
         prompt = self._build_generation_prompt(game_config, schema_info)
         
+        # 相同提示詞與輸入文件直接使用快取
+        self.cache_key = self.cache.key(prompt, self.required_files.values()) if self.cache else None
+        cached_code = self.cache.get(self.cache_key) if self.cache_key else None
+        self.cache_hit = cached_code is not None
+        if self.cache_hit:
+            self.log(f"📦 快取命中 ({self.cache_key[:12]})，略過 Q CLI")
+            return cached_code
+        
+        self.log("🤖 呼叫 Q CLI 生成程式碼...")
+        
         # 檢測執行環境並選擇適當的命令
         base_command = self._get_q_command()
         
@@ -119,21 +217,20 @@ class AgentMaker:
             if platform.system() == "Windows":
                 # Windows + WSL 格式，設定正確的編碼
                 full_command = f"q chat --no-interactive --trust-all-tools '{prompt}'"
-                result = subprocess.run(
-                    base_command + [full_command], 
-                    capture_output=True, text=True, 
-                    cwd=self.project_root,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
+                command = base_command + [full_command]
+                errors = 'ignore'
             else:
                 # Linux/macOS 格式
-                result = subprocess.run(
-                    base_command + [prompt], 
-                    capture_output=True, text=True, 
-                    cwd=self.project_root,
-                    encoding='utf-8'
-                )
+                command = base_command + [prompt]
+                errors = 'replace'
+            
+            # 串流讀取輸出，看到完整模組就提早結束，逾時則中止 Q CLI
+            result = QCliRunner(self.project_root, timeout=self.timeout, log=self.log, errors=errors).run(command)
+            if result.timed_out:
+                self.log(f"⏱️ Q CLI 超過 {self.timeout:g} 秒，已中止")
+                return None
+            if result.stopped_early:
+                self.log(f"✂️ 已取得完整程式碼，提早結束 Q CLI ({result.elapsed:.1f} 秒)")
             
             self.log(f"Q CLI 返回碼: {result.returncode}")
             if result.stdout:
@@ -165,142 +262,28 @@ class AgentMaker:
             self.log(f"❌ 執行 Q CLI 時發生異常: {e}")
             return None
     
-    def _extract_states(self, content):
-        """從內容中提取遊戲狀態"""
-        states = []
-        lines = content.split('\n')
-        in_enum = False
-        
-        for line in lines:
-            # 動態識別包含 "Flow" 或 "State" 的 enum
-            if 'enum' in line and ('Flow' in line or 'State' in line):
-                in_enum = True
-                continue
-            if in_enum and '}' in line:
-                in_enum = False
-                continue
-            if in_enum and '=' in line:
-                state_name = line.strip().split('=')[0].strip().rstrip(',')
-                if state_name and not state_name.startswith('//'):
-                    states.append(state_name)
-                    
-        return states
-    
-    def _extract_keys(self, content):
-        """從內容中提取按鍵定義"""
-        keys = []
-        lines = content.split('\n')
-        in_enum = False
-        
-        for line in lines:
-            # 動態識別包含 "Key" 或 "Input" 的 enum
-            if 'enum' in line and ('Key' in line or 'Input' in line):
-                in_enum = True
-                continue
-            if in_enum and '}' in line:
-                in_enum = False
-                continue
-            if in_enum and '=' in line:
-                key_name = line.strip().split('=')[0].strip().rstrip(',')
-                if key_name and not key_name.startswith('//'):
-                    keys.append(key_name)
-                    
-        return keys
-    
-    def _extract_blocked_keys(self, content):
-        """從 GameSetting.md 提取屏蔽按鍵列表，並自動對應到實際的枚舉名稱"""
-        blocked_keys = []
-        lines = content.split('\n')
-        
-        # 先獲取實際的按鍵枚舉名稱
+    def _map_blocked_keys(self, names):
+        """將 GameSetting.md 的屏蔽按鍵名稱對應到實際的枚舉名稱，例: LeftLeg -> LEFT_LEG、SeatDetact -> SEAT_DETECT"""
         try:
-            import sys
             sys.path.insert(0, str(self.project_root))
             from ProtoSchema.InputCommand_pb2 import EInputKeyType
-            
-            # 建立名稱對應表 (GameSetting中的名稱 -> 實際枚舉名稱)
-            name_mapping = {}
-            for enum_value in EInputKeyType.DESCRIPTOR.values:
-                if enum_value.name.startswith('INPUT_KEY_') and enum_value.name != 'INPUT_KEY_MAX':
-                    actual_name = enum_value.name.replace('INPUT_KEY_', '')
-                    # 建立多種可能的對應
-                    name_mapping[actual_name.lower()] = actual_name  # emergency -> EMERGENCY
-                    name_mapping[actual_name] = actual_name          # EMERGENCY -> EMERGENCY
-                    
-                    # 特殊對應規則
-                    if 'LEG' in actual_name:
-                        # LEFT_LEG -> LeftLeg, RightLeg
-                        camel_case = actual_name.replace('_', '').title()
-                        name_mapping[camel_case.lower()] = actual_name
-                        name_mapping[camel_case] = actual_name
-                    elif 'DETECT' in actual_name:
-                        # SEAT_DETECT -> SeatDetact (處理拼寫差異)
-                        name_mapping['seatdetact'] = actual_name
-                        name_mapping['SeatDetact'] = actual_name
-                    
+            actual_names = [value.name.replace('INPUT_KEY_', '') for value in EInputKeyType.DESCRIPTOR.values
+                            if value.name != 'INPUT_KEY_MAX']
         except ImportError:
             self.log("⚠️ 無法導入 InputCommand_pb2，使用預設名稱對應")
-            name_mapping = {}
-        
-        for line in lines:
-            line = line.strip()
-            # 檢查各種屏蔽按鍵格式
-            if ('BLOCKED_EInputKeyType' in line or 'BLOCKED_EInputVrType' in line or
-                'BLOCKED_DIGITAL_KEYS' in line or 'BLOCKED_VR_KEYS' in line or 
-                'BLOCKED_KEYS' in line):
-                continue
-            elif '"' in line and '//' in line and ',' in line:
-                # 提取按鍵名稱
-                try:
-                    key_name = line.split('"')[1]
-                    if key_name:
-                        # 嘗試對應到實際的枚舉名稱
-                        actual_key = name_mapping.get(key_name, name_mapping.get(key_name.lower(), key_name))
-                        if actual_key not in blocked_keys:
-                            blocked_keys.append(actual_key)
-                except IndexError:
-                    continue
+            actual_names = []
         
+        blocked_keys = []
+        for name in names:
+            actual_key = self._to_enum_suffix(name)
+            if actual_names and actual_key not in actual_names:
+                # 拼寫差異取最接近的枚舉名稱
+                close = difflib.get_close_matches(actual_key, actual_names, n=1, cutoff=0.8)
+                actual_key = close[0] if close else actual_key
+            if actual_key not in blocked_keys:
+                blocked_keys.append(actual_key)
         return blocked_keys
     
-    def _extract_udp_config(self, content):
-        """從內容中提取 UDP 配置"""
-        lines = content.split('\n')
-        config = {"host": "127.0.0.1", "port": 8587}  # 預設值
-        
-        for line in lines:
-            line = line.strip()
-            # 查找 UDP 相關配置
-            if 'UDPSOCKET_URL' in line and '=' in line:
-                url = line.split('=')[1].strip().strip('"\'')
-                # 解析 udp://host:port 格式
-                if url.startswith('udp://'):
-                    host_port = url[6:]  # 移除 udp://
-                    # 檢查是否為模板格式
-                    if '[IP_ADDRESS]' in host_port or '[PORT]' in host_port:
-                        print("⚠️ 發現模板格式的UDP配置，使用預設值")
-                        continue
-                    if ':' in host_port:
-                        host, port = host_port.split(':', 1)
-                        try:
-                            config["host"] = host
-                            config["port"] = int(port)
-                        except ValueError:
-                            print(f"⚠️ 無效的端口號: {port}，使用預設值")
-            elif 'UDP_HOST' in line and '=' in line:
-                host = line.split('=')[1].strip().strip('"\'')
-                if '[IP_ADDRESS]' not in host:
-                    config["host"] = host
-            elif 'UDP_PORT' in line and '=' in line:
-                port_str = line.split('=')[1].strip().strip('"\'')
-                if '[PORT]' not in port_str:
-                    try:
-                        config["port"] = int(port_str)
-                    except ValueError:
-                        print(f"⚠️ 無效的端口號: {port_str}，使用預設值")
-                
-        return config
-    
         """根據 GameSetting.md「2. 需要操作的流程」中的操作邏輯生成替代輸入代碼"""
         code_lines = [
             "        # 重要：根據 GameSetting.md「2. 需要操作的流程」中的操作邏輯生成替代輸入",
@@ -470,6 +453,9 @@ except ImportError as e:
 
 5. **隨機按鍵選擇**:
 使用可用按鍵列表（排除屏蔽按鍵）: {available_keys_str}
+啟動時若存在 ProtoSchema/InputConfiguration.pb，以 InputConfiguration 載入各流程的按鍵表
+(applicable_state → available_keys)，該流程只從表中的按鍵隨機選擇：
+{game_config['flow_operations']}
 
 6. 必須包含完整的日誌系統：
 - 同時輸出到控制台和 AutoTestAgent.log
@@ -507,6 +493,33 @@ except ImportError as e:
 只輸出完整的Python程式碼，從#!/usr/bin/env python3開始。"""
         return prompt
     
+    def _needs_build(self, artifact, inputs, recipe=None):
+        """依建置清單判斷產物是否需要重新生成，--force 時一律重新生成"""
+        name = Path(artifact).name
+        if self.force:
+            self.log(f"🔄 {name}: 強制重新生成")
+            return True
+        reasons = self.manifest.outdated(artifact, inputs, recipe)
+        if reasons:
+            self.log(f"🔄 {name}: {'；'.join(reasons)}")
+            return True
+        self.log(f"⏭️ {name}: 已是最新")
+        return False
+    
+    def check_agent(self):
+        """以模板重新產生並與 AutoTestAgent.py 比對，不寫入檔案；AutoTestAgent.py 只能由模板產生，不可直接修改"""
+        agent_code = self.render_agent_template(self.analyze_game_setting())
+        try:
+            with open(self.agent_path, 'r', encoding='utf-8') as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if agent_code is None or agent_code != current:
+            self.log("❌ AutoTestAgent.py 與模板不一致，請修改 Templates/AutoTestAgent.py.template 後執行 python AgentMaker.py")
+            return False
+        self.log("✅ AutoTestAgent.py 與模板一致")
+        return True
+    
     def run(self):
         """執行 AgentMaker"""
         # 清空日誌檔
@@ -523,12 +536,33 @@ except ImportError as e:
             game_config = self.analyze_game_setting()
             schema_info = self.analyze_protobuf_schema()
             
-            # 2. 生成程式碼
-            agent_code = self.generate_agent_code(game_config, schema_info)
+            # 2. 預先編譯各流程的按鍵表，agent 啟動時直接載入 (GameSetting.md 與 pb2 未變更時略過)
+            pb_inputs = [self.required_files[name] for name in
+                         ("GameSetting.md", "GameFlowData_pb2.py", "InputCommand_pb2.py")]
+            if self._needs_build(self.input_configuration_path, pb_inputs):
+                configuration = self.compile_input_configuration(game_config)
+                self.manifest.record(self.input_configuration_path, pb_inputs, valid=configuration is not None)
+                self.manifest.save()
+            
+            # 3. 生成程式碼 (輸入文件、模板或提示詞未變更且上次通過品質檢查時略過)
+            output_path = self.agent_path
+            agent_inputs = list(self.required_files.values())
+            if self.backend == "template":
+                agent_inputs.append(self.template_path)
+                recipe = text_digest(f"template\0{json.dumps(game_config, sort_keys=True)}")
+            else:
+                recipe = text_digest(f"qcli\0{self._build_generation_prompt(game_config, schema_info)}")
+            if not self._needs_build(output_path, agent_inputs, recipe):
+                self.log("✅ AutoTestAgent 無需重新生成")
+                return
+            
+            if self.backend == "template":
+                agent_code = self.render_agent_template(game_config)
+            else:
+                agent_code = self.generate_agent_code(game_config, schema_info)
             
             if agent_code:
                 # 先儲存程式碼，再檢查品質
-                output_path = self.project_root / "AutoTestAgent.py"
                 with open(output_path, 'w', encoding='utf-8') as f:
                     f.write(agent_code)
                 
@@ -536,10 +570,18 @@ except ImportError as e:
                 self.log(f"📄 程式碼已儲存: {output_path} ({file_size} bytes)")
                 
                 # 檢查程式碼品質
-                if self._validate_generated_code(agent_code):
+                valid = self._validate_generated_code(agent_code)
+                if valid:
                     self.log("✅ AutoTestAgent 生成完成，品質檢查通過")
+                    # 只有通過品質檢查的程式碼寫入快取
+                    if self.cache_key and not self.cache_hit:
+                        self.cache.put(self.cache_key, agent_code)
+                        self.log(f"📦 已寫入快取 ({self.cache_key[:12]})")
                 else:
                     self.log("⚠️ AutoTestAgent 已生成，但品質檢查未通過")
+                # 未通過品質檢查的結果也記錄，下次執行會重新生成
+                self.manifest.record(output_path, agent_inputs, recipe, valid)
+                self.manifest.save()
             else:
                 self.log("❌ 程式碼生成失敗")
                 
@@ -548,7 +590,23 @@ except ImportError as e:
             sys.exit(1)
 
 if __name__ == "__main__":
-    maker = AgentMaker()
+    parser = argparse.ArgumentParser(description='AgentMaker - 生成 AutoTestAgent')
+    parser.add_argument('--backend', choices=['template', 'qcli'], default='template',
+                        help='生成後端：template 由模板產生 (預設，離線)，qcli 呼叫 Q CLI')
+    parser.add_argument('--no-cache', action='store_true', help='不使用 Q CLI 生成快取')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Q CLI 呼叫的時間上限 (秒，預設 {DEFAULT_TIMEOUT:g}，0 為不限)')
+    parser.add_argument('--force', action='store_true', help='忽略建置清單，重新生成所有產物')
+    parser.add_argument('--check', action='store_true',
+                        help='只檢查 AutoTestAgent.py 是否與模板產生的結果一致 (不寫入檔案與日誌)，不一致時返回 1')
+    args = parser.parse_args()
+    
+    if args.check:
+        maker = AgentMaker(backend="template", log_file=os.devnull)
+        sys.exit(0 if maker.check_agent() else 1)
+    
+    maker = AgentMaker(use_cache=not args.no_cache, timeout=args.timeout, force=args.force,
+                       backend=args.backend)
     maker.run()
     
     # 在 Windows 下保持視窗開啟
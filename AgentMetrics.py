@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgentMetrics - AutoTestAgent 的效能量測
+以 HDR 風格的對數分桶直方圖記錄每個 frame 的各段耗時，並提供摘要日誌與本機 HTTP 文字端點
+"""
+
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Histogram:
+    """對數線性分桶直方圖 (單位: 奈秒)
+
+    每個 2 的次方區間切成 2^(sub_bits-1) 個子桶，相對誤差約 1/2^(sub_bits-1)
+    """
+
+    def __init__(self, sub_bits=5):
+        self.sub_bits = sub_bits
+        self._half = 1 << (sub_bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        shift = max(value.bit_length() - self.sub_bits, 0)
+        return (shift << (self.sub_bits - 1)) + (value >> shift)
+
+    def _bucket_value(self, index):
+        """回傳桶的中間值"""
+        if index < 2 * self._half:
+            return index
+        shift = (index >> (self.sub_bits - 1)) - 1
+        return ((index - shift * self._half) << shift) + (1 << (shift - 1))
+
+    def record(self, seconds):
+        value = round(seconds * 1e9)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """合併另一個直方圖 (多機台彙整用)"""
+        for index, count in dict(other.counts).items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, ratio):
+        """回傳百分位數 (秒)"""
+        counts = dict(self.counts)
+        total = sum(counts.values())
+        if not total:
+            return 0.0
+        target = ratio * total
+        seen = 0
+        for index in sorted(counts):
+            seen += counts[index]
+            if seen >= total:
+                # 最高的桶含有最大值，直接回傳實際的最大值
+                return self.max / 1e9
+            if seen >= target:
+                return min(max(self._bucket_value(index), self.min or 0), self.max) / 1e9
+        return self.max / 1e9
+
+    def mean(self):
+        return self.total / self.count / 1e9 if self.count else 0.0
+
+
+class AgentMetrics:
+    """收集單一 agent 的 frame 耗時、fps、重連與流程停留時間"""
+
+    HISTOGRAMS = ("latency", "parse", "decide", "send", "outage")
+
+    def __init__(self, state_names=None):
+        self.state_names = state_names or {}
+        self.histograms = {name: Histogram() for name in self.HISTOGRAMS}
+        self.frames = 0
+        self.dropped = 0
+        self.unchanged = 0
+        self.reconnects = 0
+        self.state_time = {}
+        self.started = time.monotonic()
+
+        self._current_state = None
+        self._state_since = None
+        self._ever_connected = False
+        self._outage_start = None
+        self._last_frames = 0
+        self._last_summary = self.started
+
+    def record_parse(self, seconds, flow_state):
+        self.histograms["parse"].record(seconds)
+        now = time.monotonic()
+        if self._current_state is not None:
+            self.state_time[self._current_state] = self.state_time.get(self._current_state, 0.0) + now - self._state_since
+        self._current_state = flow_state
+        self._state_since = now
+
+    def record_decision(self, decide_seconds, send_seconds):
+        self.histograms["decide"].record(decide_seconds)
+        self.histograms["send"].record(send_seconds)
+
+    def record_frame(self, seconds=None):
+        """記錄處理完一個 frame；seconds 為收到封包到送出指令的總耗時 (排程模式送出時另以 record_latency 記錄)"""
+        if seconds is not None:
+            self.histograms["latency"].record(seconds)
+        self.frames += 1
+
+    def record_latency(self, seconds):
+        """記錄收到封包到送出對應指令的總耗時"""
+        self.histograms["latency"].record(seconds)
+
+    def record_dropped(self, count):
+        """記錄積壓時略過未處理的 frame 數"""
+        self.dropped += count
+
+    def record_unchanged(self):
+        """記錄與上一個封包相同、走快速路徑的 frame"""
+        self.unchanged += 1
+
+    def mark_disconnected(self):
+        if self._outage_start is None:
+            self._outage_start = time.monotonic()
+
+    def mark_connected(self):
+        if self._outage_start is not None and self._ever_connected:
+            self.reconnects += 1
+            self.histograms["outage"].record(time.monotonic() - self._outage_start)
+        self._outage_start = None
+        self._ever_connected = True
+
+    def _state_label(self, state):
+        return self.state_names.get(state, str(state))
+
+    def summary(self):
+        """單行摘要，fps 以上次摘要之後的區間計算"""
+        now = time.monotonic()
+        fps = (self.frames - self._last_frames) / max(now - self._last_summary, 1e-9)
+        self._last_frames = self.frames
+        self._last_summary = now
+        latency = self.histograms["latency"]
+        return (f"📊 fps={fps:.1f} frames={self.frames} "
+                f"延遲 p50={latency.percentile(0.5) * 1000:.3f}ms p99={latency.percentile(0.99) * 1000:.3f}ms "
+                f"解析 p99={self.histograms['parse'].percentile(0.99) * 1000:.3f}ms "
+                f"決策 p99={self.histograms['decide'].percentile(0.99) * 1000:.3f}ms "
+                f"發送 p99={self.histograms['send'].percentile(0.99) * 1000:.3f}ms "
+                f"丟棄={self.dropped} 重連={self.reconnects}")
+
+    def render(self):
+        """輸出完整文字報表 (HTTP 端點使用)"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        lines = [
+            f"agent_uptime_seconds {elapsed:.3f}",
+            f"agent_frames_total {self.frames}",
+            f"agent_dropped_frames_total {self.dropped}",
+            f"agent_unchanged_frames_total {self.unchanged}",
+            f"agent_fps_average {self.frames / elapsed:.3f}",
+            f"agent_reconnects_total {self.reconnects}",
+        ]
+        for name, histogram in self.histograms.items():
+            lines.append(f"agent_{name}_count {histogram.count}")
+            lines.append(f"agent_{name}_mean_seconds {histogram.mean():.9f}")
+            for ratio in (0.5, 0.9, 0.99, 0.999):
+                lines.append(f'agent_{name}_seconds{{quantile="{ratio}"}} {histogram.percentile(ratio):.9f}')
+            lines.append(f"agent_{name}_max_seconds {histogram.max / 1e9:.9f}")
+        for state, seconds in sorted(dict(self.state_time).items()):
+            lines.append(f'agent_state_seconds{{state="{self._state_label(state)}"}} {seconds:.3f}')
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """在背景執行緒啟動 HTTP 端點，GET 任意路徑回傳文字報表"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever, name="AgentMetricsHTTP")
+        thread.daemon = True
+        thread.start()
+        return server
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgentPolicy - AutoTestAgent 的決策插件
+策略是 decide(game_data) -> InputCommand 的 callable，回傳 None 時交回 agent 的預設選鍵；
+可從 Python 模組載入，或由宣告式規則檔 (JSON) 在載入時編譯成以 EGameFlowState 為鍵的查表
+"""
+
+import os
+import sys
+import json
+import random
+import importlib
+import importlib.util
+
+from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState
+from ProtoSchema.InputCommand_pb2 import InputCommand, EInputKeyType
+
+
+class RulePolicy:
+    """規則檔格式:
+
+    {
+      "description": "每次都選拉斯維加斯",
+      "rules": [
+        {"state": "GAME_FLOW_SELECT_SCENE", "when": {"selected_track": "TRACK_LAS_VEGAS"}, "keys": ["START"]},
+        {"state": "GAME_FLOW_SELECT_SCENE", "keys": ["RIGHT"]}
+      ]
+    }
+
+    同一個狀態的規則依序比對，第一個 when 條件全部符合的規則生效，keys 有多個時隨機選一個
+
+    選項規則 {"state": ..., "select": {"field": "selected_track", "value": "TRACK_LAS_VEGAS",
+    "prev": "LEFT", "next": "RIGHT"}} 在欄位不等於目標時往目標方向按 prev/next，已選中則交給下一條規則
+    """
+
+    def __init__(self, rules, description=""):
+        self.description = description
+        self.table = self.compile(rules)
+
+    @staticmethod
+    def _enum_value(enum_type, name, prefix=""):
+        if isinstance(name, int):
+            return name
+        for candidate in (name, prefix + name):
+            value = enum_type.values_by_name.get(candidate)
+            if value is not None:
+                return value.number
+        raise ValueError(f"未知的 {enum_type.name} 值: {name}")
+
+    @classmethod
+    def compile(cls, rules):
+        """編譯成 {狀態: [(條件, 按鍵列表, 選項)]}，名稱錯誤在載入時就報錯"""
+        table = {}
+        fields = GameFlowData.DESCRIPTOR.fields_by_name
+        for index, rule in enumerate(rules):
+            try:
+                state = cls._enum_value(EGameFlowState.DESCRIPTOR, rule["state"], "GAME_FLOW_")
+                conditions = []
+                for name, value in rule.get("when", {}).items():
+                    field = fields.get(name)
+                    if field is None or field.message_type is not None:
+                        raise ValueError(f"不支援的條件欄位: {name}")
+                    if field.enum_type is not None:
+                        value = cls._enum_value(field.enum_type, value)
+                    conditions.append((name, value))
+                select = cls._compile_select(rule["select"]) if "select" in rule else None
+                keys = [cls._enum_value(EInputKeyType.DESCRIPTOR, key, "INPUT_KEY_") for key in rule.get("keys", [])]
+                if not keys and select is None:
+                    raise ValueError("keys 不可為空")
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"規則 #{index + 1} 錯誤: {e}") from e
+            table.setdefault(state, []).append((tuple(conditions), keys, select))
+        return table
+
+    @classmethod
+    def _compile_select(cls, select):
+        field = GameFlowData.DESCRIPTOR.fields_by_name.get(select["field"])
+        if field is None or field.enum_type is None:
+            raise ValueError(f"選項欄位必須是枚舉: {select['field']}")
+        return (select["field"],
+                cls._enum_value(field.enum_type, select["value"]),
+                cls._enum_value(EInputKeyType.DESCRIPTOR, select["prev"], "INPUT_KEY_"),
+                cls._enum_value(EInputKeyType.DESCRIPTOR, select["next"], "INPUT_KEY_"))
+
+    def __call__(self, game_data):
+        for conditions, keys, select in self.table.get(game_data.current_flow_state, ()):
+            for name, value in conditions:
+                if getattr(game_data, name) != value:
+                    break
+            else:
+                if select is not None:
+                    name, target, prev_key, next_key = select
+                    current = getattr(game_data, name)
+                    if current == target:
+                        continue
+                    keys = [next_key if current < target else prev_key]
+                input_command = InputCommand()
+                input_command.key_inputs.append(random.choice(keys))
+                input_command.is_key_down = True
+                return input_command
+        return None
+
+
+def load_rules(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return RulePolicy(data.get("rules", []), data.get("description", ""))
+
+
+def load_module_policy(source):
+    """從 .py 檔或模組名稱載入 decide(game_data)"""
+    if source.endswith(".py"):
+        name = os.path.splitext(os.path.basename(source))[0]
+        spec = importlib.util.spec_from_file_location(name, source)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(source)
+
+    decide = getattr(module, "decide", None)
+    if not callable(decide):
+        raise ValueError(f"策略模組缺少 decide(game_data): {source}")
+    return decide
+
+
+def load_policy(source):
+    """依副檔名載入策略：.json 為規則檔，其餘為 Python 模組"""
+    if source.endswith(".json"):
+        return load_rules(source)
+    return load_module_policy(source)
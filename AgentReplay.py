@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AgentReplay - 以錄製的 GameFlowData 離線驅動 AutoTestAgent
+來源可以是 FrameRecorder 錄製檔或 AutoTestAgent.log 文字日誌，不需要遊戲即可量測決策吞吐量並比較版本
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from collections import Counter
+from datetime import datetime
+
+from AutoTestAgent import AutoTestAgent
+from FrameRecorder import FrameReader, MAGIC, RECORD_RECEIVED
+from ProtoSchema.GameFlowData_pb2 import GameFlowData
+from ProtoSchema.InputCommand_pb2 import InputCommand, ComplexInputCommand, EInputKeyType
+from ProtoSchema import BACKEND as PROTOBUF_BACKEND
+
+LOG_LINE = re.compile(r'^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.*)$')
+
+
+def load_frames_from_capture(path):
+    """從錄製檔讀出 (時間戳記, 原始封包)"""
+    return [(timestamp, payload) for record_type, timestamp, payload in FrameReader(path).records()
+            if record_type == RECORD_RECEIVED]
+
+
+def _build_frame(fields, race_data_lines):
+    from google.protobuf import text_format
+
+    game_data = GameFlowData()
+    for name, value in fields:
+        field = game_data.DESCRIPTOR.fields_by_name.get(name)
+        if field is None:
+            continue
+        if field.message_type is not None:
+            text = "\n".join([value] + race_data_lines).strip()
+            if text:
+                text_format.Merge(text, getattr(game_data, name))
+        elif field.type == field.TYPE_BOOL:
+            setattr(game_data, name, value == "True")
+        elif field.type in (field.TYPE_FLOAT, field.TYPE_DOUBLE):
+            setattr(game_data, name, float(value))
+        else:
+            setattr(game_data, name, int(value))
+    return game_data.SerializeToString()
+
+
+def load_frames_from_log(path):
+    """從 AutoTestAgent.log 的文字格式重建 GameFlowData 封包
+
+    --change-only 的日誌只記錄變更的欄位，以上一個 frame 補齊；只有送出指令的行視為未變化的 frame
+    """
+    frames = []
+    fields = None
+    race_data_lines = []
+    frame_time = 0.0
+    change_only = False
+    previous_fields = {}
+    previous_race_data_lines = []
+
+    def finish():
+        nonlocal previous_fields, previous_race_data_lines
+        if not fields:
+            return
+        merged = dict(previous_fields) if change_only else {}
+        merged.update(fields)
+        lines = race_data_lines
+        if change_only and "race_data" not in dict(fields):
+            lines = previous_race_data_lines
+        frames.append((frame_time, _build_frame(merged.items(), lines)))
+        previous_fields, previous_race_data_lines = merged, lines
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for raw in f:
+            line = raw.rstrip('\n')
+            match = LOG_LINE.match(line)
+            if not match:
+                # race_data 有內容時會以多行 text format 接在欄位後面
+                if fields and fields[-1][0] == "race_data" and line.strip():
+                    race_data_lines.append(line.strip())
+                continue
+
+            stamp, message = match.groups()
+            if message.startswith("📥 接收遊戲數據"):
+                finish()
+                fields = []
+                race_data_lines = []
+                frame_time = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp()
+            elif fields is not None and message.startswith("   ") and ":" in message:
+                name, value = message.strip().split(":", 1)
+                fields.append((name.strip(), value.strip()))
+            elif fields is not None:
+                finish()
+                fields = None
+            elif message.startswith("🎮 AutoTestAgent 啟動"):
+                change_only = False
+                previous_fields, previous_race_data_lines = {}, []
+            elif message.startswith("🧮 只處理變化"):
+                change_only = True
+            elif change_only and message.startswith("📤 發送") and frames:
+                frames.append((datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp(), frames[-1][1]))
+    finish()
+    return frames
+
+
+def load_frames(path):
+    with open(path, 'rb') as f:
+        is_capture = f.read(len(MAGIC)) == MAGIC
+    return load_frames_from_capture(path) if is_capture else load_frames_from_log(path)
+
+
+class ReplayAgent(AutoTestAgent):
+    """不建立 socket，只收集 agent 產生的 InputCommand"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = []
+
+    def send_command(self, command_data):
+        self.commands.append(command_data)
+
+
+def replay(agent, frames, speed=0.0):
+    """依序餵入 frame；speed 為 0 時全速，1.0 時依原始時間間隔"""
+    agent.running = True
+    start = time.perf_counter()
+    first_timestamp = frames[0][0] if frames else 0.0
+
+    for timestamp, data in frames:
+        if speed > 0:
+            delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        try:
+            agent.handle_frame(data)
+        except Exception as e:
+            agent.log(f"❌ 數據接收錯誤: {e}")
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AgentReplay - 以錄製資料離線驅動 AutoTestAgent')
+    parser.add_argument('source', help='FrameRecorder 錄製檔或 AutoTestAgent.log')
+    parser.add_argument('--speed', type=float, default=0.0, help='播放速度 (0 = 全速，1 = 原始時間)')
+    parser.add_argument('--seed', type=int, help='隨機種子，固定後可比較不同版本的輸出')
+    parser.add_argument('--output', help='將收發內容寫成錄製檔 (可用 FrameRecorder.py 展開)')
+    parser.add_argument('--log-file', default='AgentReplay.log', help='replay 過程的 agent 日誌')
+    parser.add_argument('--report', help='輸出 JSON 報告 (CI 比較用)')
+    parser.add_argument('--input-format', choices=['simple', 'complex'], default='simple', help='agent 的輸入格式')
+    parser.add_argument('--policy', help='決策策略：規則檔 (.json) 或提供 decide(game_data) 的 Python 模組')
+    args = parser.parse_args()
+
+    frames = load_frames(args.source)
+    if not frames:
+        print(f"❌ 找不到任何 GameFlowData frame: {args.source}")
+        sys.exit(1)
+    print(f"📂 載入 {len(frames)} 個 frame: {args.source} (Protobuf 後端: {PROTOBUF_BACKEND})")
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    agent = ReplayAgent(
+        log_file=args.log_file,
+        record_mode="binary" if args.output else "text",
+        capture_file=args.output or "AutoTestAgent.capture",
+        echo=False,
+        metrics_interval=0,
+        input_format=args.input_format,
+        policy=args.policy
+    )
+    elapsed = replay(agent, frames, args.speed)
+    summary = agent.metrics.summary()
+    agent.stop()
+
+    keys = Counter()
+    for command_data in agent.commands:
+        if args.input_format == "complex":
+            complex_command = ComplexInputCommand()
+            complex_command.ParseFromString(command_data)
+            digital_inputs = complex_command.digital_inputs
+        else:
+            input_command = InputCommand()
+            input_command.ParseFromString(command_data)
+            digital_inputs = [input_command]
+        for command in digital_inputs:
+            if command.is_key_down:
+                for key in command.key_inputs:
+                    keys[EInputKeyType.Name(key).replace("INPUT_KEY_", "")] += 1
+
+    print(f"✅ replay 完成: {len(frames)} frames / {elapsed:.3f}s = {len(frames) / max(elapsed, 1e-9):.1f} fps")
+    print(f"📤 產生 {len(agent.commands)} 個 InputCommand")
+    print(summary)
+    for key, count in keys.most_common():
+        print(f"   {key}: {count}")
+
+    if args.report:
+        report = {
+            "source": args.source,
+            "protobuf_backend": PROTOBUF_BACKEND,
+            "frames": len(frames),
+            "commands": len(agent.commands),
+            "elapsed_seconds": elapsed,
+            "fps": len(frames) / max(elapsed, 1e-9),
+            "latency_p50_seconds": agent.metrics.histograms["latency"].percentile(0.5),
+            "latency_p99_seconds": agent.metrics.histograms["latency"].percentile(0.99),
+            "decide_p99_seconds": agent.metrics.histograms["decide"].percentile(0.99),
+            "keys": dict(keys),
+        }
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📄 報告已儲存: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
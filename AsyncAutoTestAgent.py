@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AsyncAutoTestAgent - 以 asyncio DatagramProtocol 驅動的 AutoTestAgent
+角色註冊、重連退避與收/決策/送都以協程執行，單一事件迴圈即可同時驅動多個遊戲端點
+"""
+
+import time
+import asyncio
+import argparse
+
+from AutoTestAgent import AutoTestAgent
+
+
+class AgentDatagramProtocol(asyncio.DatagramProtocol):
+    """把收到的封包與錯誤轉交給 AsyncAutoTestAgent"""
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    def datagram_received(self, data, addr):
+        # 收到的時間一併放入佇列，延遲從這裡起算而不是從取出佇列時
+        self.agent.datagram_queue.put_nowait((data, time.perf_counter()))
+
+    def error_received(self, exc):
+        # Windows 上遊戲端關閉時會收到 ConnectionResetError
+        self.agent.connection_failed(exc)
+
+    def connection_lost(self, exc):
+        if exc:
+            self.agent.connection_failed(exc)
+
+
+class AsyncAutoTestAgent(AutoTestAgent):
+    """asyncio 版本的 AutoTestAgent，決策與日誌沿用 AutoTestAgent"""
+
+    def __init__(self, *args, reconnect_delay=0.5, reconnect_max_delay=5.0, receive_timeout=5.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.receive_timeout = receive_timeout
+        self.transport = None
+        self.datagram_queue = None
+        self._connection_error = None
+
+    def connection_failed(self, exc):
+        self._connection_error = exc
+        if self.datagram_queue:
+            # 喚醒正在等待封包的協程
+            self.datagram_queue.put_nowait(None)
+
+    async def _get_datagram(self, timeout):
+        """等待下一個佇列項目，逾時時拋出 asyncio.TimeoutError
+
+        不使用 asyncio.wait_for：Python 3.11 的 wait_for 在取得結果的同時被取消會吞掉取消，
+        收包中的 agent 將永遠無法停止；asyncio.wait 被取消時一定會拋出 CancelledError
+        """
+        getter = asyncio.ensure_future(self.datagram_queue.get())
+        try:
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if not done:
+            raise asyncio.TimeoutError()
+        return getter.result()
+
+    def _close_transport(self):
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+    async def connect_to_game(self):
+        loop = asyncio.get_running_loop()
+        delay = self.reconnect_delay
+        self.metrics.mark_disconnected()
+
+        while self.running:
+            try:
+                self.log("🔄 等待遊戲連線...")
+                self.datagram_queue = asyncio.Queue()
+                self._connection_error = None
+                self.transport, _ = await loop.create_datagram_endpoint(
+                    lambda: AgentDatagramProtocol(self),
+                    remote_addr=(self.host, self.port)
+                )
+
+                # 角色註冊
+                self.transport.sendto(b"role:agent")
+                response = await self._get_datagram(self.receive_timeout)
+
+                if response is None:
+                    self.log(f"❌ 連線失敗: {self._connection_error}")
+                elif response[0] == b"ok:agent":
+                    self.log("✅ 遊戲連線成功，開始接收數據")
+                    self.metrics.mark_connected()
+                    return True
+                else:
+                    self.log(f"❌ 角色註冊失敗: {response[0].decode(errors='replace')}")
+
+            except asyncio.TimeoutError:
+                self.log("❌ 連線失敗: 角色註冊逾時")
+            except OSError as e:
+                self.log(f"❌ 連線失敗: {e}")
+
+            self._close_transport()
+
+            if self.running:
+                self.log(f"❌ 遊戲連線中斷，{delay:g}秒後重試...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.reconnect_max_delay)
+
+        return False
+
+    def send_command(self, command_data):
+        self.transport.sendto(command_data)
+
+    async def listen_for_data(self):
+        while self.running:
+            if not self.transport:
+                if not await self.connect_to_game():
+                    continue
+
+            try:
+                # 有積壓時直接取出，不必建立等待的 Task
+                item = self.datagram_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                try:
+                    item = await self._get_datagram(self.receive_timeout)
+                except asyncio.TimeoutError:
+                    continue
+
+            if item is None:
+                self.log(f"❌ 數據接收錯誤: {self._connection_error}")
+                self._close_transport()
+                continue
+
+            items = self.drain_queue(item) if self.coalesce != "off" else [item]
+            if items[-1] is None:
+                items.pop()
+                self.datagram_queue.put_nowait(None)
+
+            # 與同步版相同，積壓的封包一律以最早收到的時間起算
+            received = items[0][1]
+            try:
+                self.handle_frames(self.coalesce_frames([data for data, _ in items]), received)
+            except Exception as e:
+                self.log(f"❌ 數據接收錯誤: {e}")
+
+            # 讓事件迴圈處理收包、取消與其他 agent
+            await asyncio.sleep(0)
+
+    def drain_queue(self, first):
+        """不等待地取出佇列中所有積壓的 (封包, 收到時間)，遇到連線錯誤 (None) 時停止"""
+        packets = [first]
+        while len(packets) < self.max_drain and packets[-1] is not None:
+            try:
+                packets.append(self.datagram_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return packets
+
+    async def _run_input_scheduler(self):
+        while True:
+            if self.transport:
+                try:
+                    self.input_tick(time.monotonic())
+                except Exception as e:
+                    self.log(f"❌ 輸入排程錯誤: {e}")
+            await asyncio.sleep(self.scheduler.tick)
+
+    async def _report_metrics(self):
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            self.log(self.metrics.summary())
+
+    async def run(self):
+        self.running = True
+        reporter = asyncio.create_task(self._report_metrics()) if self.metrics_interval else None
+        scheduler = asyncio.create_task(self._run_input_scheduler()) if self.scheduler else None
+        try:
+            await self.listen_for_data()
+        finally:
+            for task in (reporter, scheduler):
+                if task:
+                    task.cancel()
+            self.stop()
+
+    def stop(self):
+        if not self.running and not self.transport:
+            return
+        self.running = False
+        if self.scheduler and self.transport:
+            try:
+                self.release_held_keys()
+            except OSError:
+                pass
+        self._close_transport()
+        super().stop()
+
+
+async def run_agents(agents):
+    """在同一個事件迴圈中驅動多個 agent，取消時全部優雅停止"""
+    tasks = [asyncio.create_task(agent.run()) for agent in agents]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AsyncAutoTestAgent - asyncio 版遊戲自動測試程式')
+    parser.add_argument('--host', default='127.0.0.1', help='遊戲端 IP')
+    parser.add_argument('--port', type=int, default=8587, help='遊戲端埠號')
+    parser.add_argument('--record', choices=['text', 'binary'], default='text', help='錄製模式 (預設 text)')
+    parser.add_argument('--capture-file', default='AutoTestAgent.capture', help='二進位錄製檔路徑')
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help='效能摘要輸出間隔 (秒，0 表示關閉)')
+    parser.add_argument('--metrics-port', type=int, help='本機效能量測 HTTP 端點埠號')
+    parser.add_argument('--input-format', choices=['simple', 'complex'], default='simple',
+                        help='輸入格式 (complex 為 ComplexInputCommand，遊戲端需相同設定)')
+    parser.add_argument('--race-drive', action='store_true', help='比賽中依 race_data 自動轉向 (需搭配 --input-format complex)')
+    parser.add_argument('--schedule-input', action='store_true', help='以輸入排程取代每個 frame 送一個指令')
+    parser.add_argument('--hold', type=float, default=0.1, help='排程模式按鍵按住秒數')
+    parser.add_argument('--key-rate', type=float, default=5.0, help='排程模式每個按鍵每秒最多按下次數')
+    parser.add_argument('--max-rate', type=float, default=30.0, help='排程模式每秒最多送出的指令數')
+    parser.add_argument('--coalesce', choices=['off', 'latest', 'transitions'], default='off',
+                        help='落後時的積壓處理 (latest 只處理最新 frame，transitions 另保留狀態改變的 frame)')
+    parser.add_argument('--change-only', action='store_true', help='相同的 frame 不解析也不記錄，只記錄變更的欄位')
+    parser.add_argument('--policy', help='決策策略：規則檔 (.json) 或提供 decide(game_data) 的 Python 模組')
+    args = parser.parse_args()
+    if args.race_drive and args.input_format != 'complex':
+        parser.error('--race-drive 需要 --input-format complex')
+
+    agent = AsyncAutoTestAgent(host=args.host, port=args.port,
+                               record_mode=args.record, capture_file=args.capture_file,
+                               metrics_interval=args.metrics_interval, metrics_port=args.metrics_port,
+                               input_format=args.input_format, race_drive=args.race_drive,
+                               schedule_input=args.schedule_input, hold_duration=args.hold,
+                               key_rate=args.key_rate, max_command_rate=args.max_rate,
+                               coalesce=args.coalesce, change_only=args.change_only, policy=args.policy)
+    try:
+        asyncio.run(run_agents([agent]))
+    except KeyboardInterrupt:
+        print("\n收到中斷信號，正在優雅退出...")
+        agent.stop()
+    finally:
+        input("按 Enter 鍵結束...")
+
+
+if __name__ == "__main__":
+    main()
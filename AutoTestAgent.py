@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+# 此檔案由 AgentMaker 依 Templates/AutoTestAgent.py.template 產生，請修改模板後執行 python AgentMaker.py
 
 import sys
 import os
 
-# 確保正確的工作目錄和路徑
+# 確保模組路徑 (工作目錄只在直接執行時切換，避免被匯入時改變呼叫端的相對路徑)
 script_dir = os.path.dirname(os.path.abspath(__file__))
-os.chdir(script_dir)
 sys.path.insert(0, script_dir)
 
 try:
-    from ProtoSchema.GameFlowData_pb2 import GameFlowData
-    from ProtoSchema.InputCommand_pb2 import InputCommand, EInputKeyType
+    from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState
+    from ProtoSchema.InputCommand_pb2 import InputCommand, EInputKeyType, EInputVrType, InputConfiguration
+    from ProtoSchema import BACKEND as PROTOBUF_BACKEND
     print("✅ Protobuf 模組載入成功")
 except ImportError as e:
     print(f"❌ 無法導入 Protobuf 模組: {e}")
@@ -19,18 +20,100 @@ except ImportError as e:
     sys.exit(1)
 
 import socket
+import select
 import threading
 import time
 import random
 import signal
+import argparse
+
+from AgentLogWriter import AgentLogWriter
+from FrameRecorder import FrameRecorder
+from AgentMetrics import AgentMetrics
+from TransitionModel import TransitionModel, FlowPlanner
+from AgentInput import InputFrame, describe_complex
+from RaceController import RaceController
+from InputScheduler import InputScheduler
+from AgentPolicy import load_policy
+
+def peek_flow_state(data):
+    """不解析整個封包，直接讀出 current_flow_state (欄位 1，序列化時排在最前面，值為 0 時省略)"""
+    if not data or data[0] != 0x08:
+        return 0
+    value = shift = 0
+    for byte in data[1:11]:
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return value
 
 class AutoTestAgent:
-    def __init__(self):
-        self.host = "127.0.0.1"
-        self.port = 8587
+    def __init__(self, host="127.0.0.1", port=8587, log_file="AutoTestAgent.log",
+                 record_mode="text", capture_file="AutoTestAgent.capture", echo=True,
+                 metrics_interval=10.0, metrics_port=None, model_file=None, target_state=None,
+                 input_configuration_file=os.path.join(script_dir, "ProtoSchema", "InputConfiguration.pb"),
+                 input_format="simple", race_drive=False, schedule_input=False,
+                 hold_duration=0.1, key_rate=5.0, max_command_rate=30.0, coalesce="off",
+                 change_only=False, policy=None):
+        self.host = host
+        self.port = port
         self.sock = None
         self.running = False
-        self.log_file = "AutoTestAgent.log"
+        self.log_file = log_file
+
+        # 背景日誌設定：佇列滿時 "drop" 丟棄或 "block" 等待
+        self.log_queue_size = 10000
+        self.log_flush_interval = 0.5
+        self.log_overflow = "drop"
+        self.log_writer = AgentLogWriter(
+            self.log_file,
+            echo=echo,
+            queue_size=self.log_queue_size,
+            flush_interval=self.log_flush_interval,
+            overflow=self.log_overflow
+        )
+
+        # 錄製模式："text" 逐欄位文字日誌，"binary" 保存原始封包 (FrameRecorder.py 可離線展開)
+        self.record_mode = record_mode
+        self.recorder = None
+        if record_mode == "binary":
+            self.recorder = FrameRecorder(capture_file)
+
+        # 效能量測：每 metrics_interval 秒輸出摘要，指定 metrics_port 時提供本機 HTTP 文字端點
+        self.metrics = AgentMetrics({value.number: value.name for value in EGameFlowState.DESCRIPTOR.values})
+        self.metrics_interval = metrics_interval
+        self.metrics_port = metrics_port
+
+        # 輸入格式："simple" 每個 frame 一個 InputCommand，
+        # "complex" 將按下、放開與 VR 類比數值合併成一個 ComplexInputCommand (遊戲端需使用相同格式)
+        self.input_format = input_format
+        self.held_keys = []
+        self.race_throttle = 1.0
+
+        # 比賽駕駛：GAME_FLOW_RACE 中依 race_data 計算轉向與油門，以 VR 類比值送出
+        if race_drive and input_format != "complex":
+            raise ValueError("比賽駕駛模式需要 input_format='complex'")
+        self.race_controller = RaceController() if race_drive else None
+
+        # 輸入排程：不再每個 frame 送一個指令，改由獨立的 tick 依最新狀態按下按鍵並在 hold 秒後放開，
+        # 限制每個按鍵的重複頻率與整體每秒指令數
+        self.scheduler = InputScheduler(hold_duration, key_rate, max_command_rate) if schedule_input else None
+        self.latest_game_data = None
+        # 排程模式下尚未送出對應指令的最早 frame 收到時間，送出指令時才結算延遲
+        self.pending_received = None
+
+        # 積壓處理："off" 逐一處理，"latest" 一次讀完積壓的封包只處理最新一個，
+        # "transitions" 另記錄流程狀態改變的封包，但只依最新一個決策；略過的封包計入 dropped
+        self.coalesce = coalesce
+        self.max_drain = 1024
+        self.last_flow_state = None
+
+        # 只處理變化：封包與上一個完全相同時不解析、不記錄欄位，只沿用上一個解析結果做決策；
+        # 有變化時只記錄變更的欄位
+        self.change_only = change_only
+        self.previous_data = None
+        self.previous_game_data = None
 
         # 動態生成按鍵映射
         self.key_mapping = {}
@@ -40,24 +123,67 @@ class AutoTestAgent:
                 self.key_mapping[key_name] = enum_value.number
 
         # 可用按鍵列表（排除屏蔽按鍵）
-        self.available_keys = [key for key in self.key_mapping.keys() if key not in ["EMERGENCY", "TEST", "LEFT_LEG", "RIGHT_LEG", "SERVICE"]]
+        self.available_keys = [key for key in self.key_mapping.keys() if key not in ["EMERGENCY", "TEST", "LEFT_LEG", "RIGHT_LEG", "SEAT_DETECT", "SERVICE"]]
 
         self.log(f"🎮 AutoTestAgent 啟動")
+        self.log(f"🔧 Protobuf 後端: {PROTOBUF_BACKEND}")
+        self.key_names = {number: name for name, number in self.key_mapping.items()}
         self.log(f"📋 可用按鍵: {self.available_keys}")
 
-    def log(self, message):
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {message}"
-        print(log_message)
+        # 各流程按鍵表 (AgentMaker 由 GameSetting.md 預先編譯)，其他流程使用全部可用按鍵
+        self.state_keys = self.load_input_configuration(input_configuration_file)
+
+        # 決策策略：decide(game_data) -> InputCommand，可傳入 callable 或模組/規則檔路徑；回傳 None 時使用預設選鍵
+        self.policy = load_policy(policy) if isinstance(policy, str) else policy
+        if isinstance(policy, str):
+            description = getattr(self.policy, "description", "")
+            self.log(f"📜 決策策略: {policy}" + (f" ({description})" if description else ""))
+
+        # 目標導向選鍵：依學習到的流程轉換圖前往 target_state，其餘情況隨機
+        self.planner = None
+        if model_file and target_state:
+            self.planner = FlowPlanner(TransitionModel.load(model_file), EGameFlowState.Value(target_state),
+                                       allowed_keys=set(self.available_keys))
+            self.log(f"🎯 目標狀態: {target_state}，已規劃 {len(self.planner.policy)} 個狀態")
+        if self.recorder:
+            self.log(f"💾 二進位錄製: {capture_file}")
+        if self.change_only:
+            self.log("🧮 只處理變化: 相同的 frame 不記錄欄位")
+        if self.scheduler:
+            self.log(f"⏱️ 輸入排程: 按住 {hold_duration:g}s，每鍵 {key_rate:g} 次/秒，上限 {max_command_rate:g} 指令/秒")
+        if metrics_port:
+            self.metrics.start_http_server(metrics_port)
+            self.log(f"📊 效能量測端點: http://127.0.0.1:{metrics_port}/")
+
+    def load_input_configuration(self, path):
+        """載入 InputConfiguration，回傳 {流程狀態: [按鍵名稱]}"""
+        state_keys = {}
+        if not path or not os.path.exists(path):
+            return state_keys
 
         try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_message + "\n")
-                f.flush()
+            configuration = InputConfiguration()
+            with open(path, "rb") as f:
+                configuration.ParseFromString(f.read())
         except Exception as e:
-            print(f"日誌寫入失敗: {e}")
+            self.log(f"⚠️ 按鍵表載入失敗，使用全部可用按鍵: {e}")
+            return state_keys
+
+        key_names = self.key_names
+        for mapping in configuration.state_mappings:
+            keys = [key_names[key] for key in mapping.available_keys
+                    if key in key_names and key_names[key] in self.available_keys]
+            if keys:
+                state_keys[mapping.applicable_state] = keys
+                self.log(f"📋 {mapping.description} 按鍵: {keys}")
+        return state_keys
+
+    def log(self, message):
+        # 交給背景執行緒寫入控制台和檔案，不等待磁碟
+        self.log_writer.write(message)
 
     def connect_to_game(self):
+        self.metrics.mark_disconnected()
         while self.running:
             try:
                 self.log("🔄 等待遊戲連線...")
@@ -70,6 +196,7 @@ class AutoTestAgent:
 
                 if response.decode() == "ok:agent":
                     self.log("✅ 遊戲連線成功，開始接收數據")
+                    self.metrics.mark_connected()
                     return True
                 else:
                     self.log(f"❌ 角色註冊失敗: {response.decode()}")
@@ -95,17 +222,12 @@ class AutoTestAgent:
                         continue
 
                 data, addr = self.sock.recvfrom(4096)
-                game_data = GameFlowData()
-                game_data.ParseFromString(data)
-
-                # 記錄接收到的遊戲數據
-                self.log(f"📥 接收遊戲數據:")
-                for field in game_data.DESCRIPTOR.fields:
-                    field_value = getattr(game_data, field.name)
-                    self.log(f"   {field.name}: {field_value}")
-
-                # 處理遊戲狀態並發送輸入
-                self.process_game_state(game_data)
+                # 延遲從收到封包起算；積壓的封包在此之前就已到達，一律以這個時間為準
+                received = time.perf_counter()
+                if self.coalesce == "off":
+                    self.handle_frame(data, received)
+                else:
+                    self.handle_frames(self.coalesce_frames(self.drain_socket(data)), received)
 
             except socket.timeout:
                 continue
@@ -115,27 +237,292 @@ class AutoTestAgent:
                     self.sock.close()
                     self.sock = None
 
-    def process_game_state(self, game_data):
+    def drain_socket(self, first):
+        """不等待地讀出 socket 中所有積壓的封包
+        以 select(0) 確認有資料才讀取，不改變 socket 的 timeout (排程執行緒同時在此 socket 上 sendto)"""
+        packets = [first]
+        while len(packets) < self.max_drain:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            if not readable:
+                break
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except (BlockingIOError, socket.timeout):
+                break
+            packets.append(data)
+        return packets
+
+    def coalesce_frames(self, packets):
+        """依 coalesce 模式從積壓的封包中挑出要處理的 frame，其餘計為丟棄"""
+        if len(packets) == 1:
+            return packets
+        if self.coalesce == "transitions":
+            selected = []
+            previous = self.last_flow_state
+            last = len(packets) - 1
+            for index, data in enumerate(packets):
+                state = peek_flow_state(data)
+                if state != previous or index == last:
+                    selected.append(data)
+                    previous = state
+        else:
+            selected = packets[-1:]
+        self.metrics.record_dropped(len(packets) - len(selected))
+        return selected
+
+    def handle_frames(self, frames, received=None):
+        """處理 coalesce_frames 挑出的 frame：全部記錄，只依最新一個決策並送出指令"""
+        last = len(frames) - 1
+        for index, data in enumerate(frames):
+            self.handle_frame(data, received, decide=index == last)
+
+    def handle_frame(self, data, received=None, decide=True):
+        """解析並記錄一個 GameFlowData 封包，再交給狀態處理
+        received 為收到封包時的 perf_counter，延遲量測到送出指令為止 (未提供時從此處起算)
+        decide 為 False 時只記錄 (transitions 模式保留給錄製與 TransitionModel 的中間 frame)"""
+        start = time.perf_counter()
+        if received is None:
+            received = start
+        if self.change_only and data == self.previous_data:
+            # 與上一個封包位元組完全相同：不解析、不記錄欄位
+            game_data = self.previous_game_data
+            changed = False
+            self.metrics.record_parse(time.perf_counter() - start, game_data.current_flow_state)
+            self.metrics.record_unchanged()
+            if self.recorder:
+                self.recorder.record_received(data)
+        else:
+            game_data = GameFlowData()
+            game_data.ParseFromString(data)
+            self.metrics.record_parse(time.perf_counter() - start, game_data.current_flow_state)
+            self.last_flow_state = game_data.current_flow_state
+
+            # 位元組不同時再逐欄位比較，只有 timestamp 不同也視為未變化
+            changed = True
+            changed_fields = None
+            if self.change_only and self.previous_game_data is not None:
+                previous = self.previous_game_data
+                changed_fields = [field for field in game_data.DESCRIPTOR.fields
+                                  if getattr(game_data, field.name) != getattr(previous, field.name)]
+                changed = any(field.name != "timestamp" for field in changed_fields)
+                if not changed:
+                    self.metrics.record_unchanged()
+
+            # 記錄接收到的遊戲數據
+            if self.recorder:
+                self.recorder.record_received(data)
+            elif changed_fields is not None:
+                if changed:
+                    self.log(f"📥 接收遊戲數據 (變更):")
+                    for field in changed_fields:
+                        self.log(f"   {field.name}: {getattr(game_data, field.name)}")
+            else:
+                self.log(f"📥 接收遊戲數據:")
+                for field in game_data.DESCRIPTOR.fields:
+                    field_value = getattr(game_data, field.name)
+                    self.log(f"   {field.name}: {field_value}")
+
+            if self.change_only:
+                self.previous_data = data
+                self.previous_game_data = game_data
+
+        # 處理遊戲狀態並發送輸入 (排程模式下只保留最新狀態，由 input_tick 決定何時送出)
+        if not decide:
+            self.metrics.record_frame()
+        elif self.scheduler:
+            self.latest_game_data = game_data
+            if self.pending_received is None:
+                self.pending_received = received
+            self.metrics.record_frame()
+        else:
+            self.process_game_state(game_data, changed)
+            self.metrics.record_frame(time.perf_counter() - received)
+
+    def send_command(self, command_data):
+        """發送序列化後的 InputCommand"""
+        self.sock.sendto(command_data, (self.host, self.port))
+
+    def process_game_state(self, game_data, changed=True):
         try:
-            # 隨機選擇按鍵
-            selected_key = random.choice(self.available_keys)
+            start = time.perf_counter()
+            timestamp = int(time.time() * 1000)
+
+            racing = game_data.current_flow_state == EGameFlowState.GAME_FLOW_RACE
+            if self.race_controller and not racing and self.race_controller.previous_pos is not None:
+                self.race_controller.reset()
+
+            # 策略優先，其次比賽駕駛，最後規劃或隨機選鍵
+            policy_command = self.policy(game_data) if self.policy else None
+            selected_key = None
+            if policy_command is None and not (self.race_controller and racing):
+                selected_key = self.choose_key(game_data)
 
             # 創建輸入指令
-            input_command = InputCommand()
-            input_command.key_inputs.append(self.key_mapping[selected_key])
-            input_command.is_key_down = True
-            input_command.timestamp = int(time.time() * 1000)
+            if policy_command is not None:
+                selected_key = ", ".join(self.key_names.get(key, str(key)) for key in policy_command.key_inputs)
+                if self.input_format == "complex":
+                    input_command = self.build_complex_command(game_data, policy_command.key_inputs, timestamp)
+                else:
+                    input_command = policy_command
+                    if not input_command.timestamp:
+                        input_command.timestamp = timestamp
+            elif selected_key is None:
+                input_command = self.build_drive_command(game_data, timestamp)
+            elif self.input_format == "complex":
+                input_command = self.build_complex_command(game_data, [self.key_mapping[selected_key]], timestamp)
+            else:
+                input_command = InputCommand()
+                input_command.key_inputs.append(self.key_mapping[selected_key])
+                input_command.is_key_down = True
+                input_command.timestamp = timestamp
 
             # 發送輸入指令
             command_data = input_command.SerializeToString()
-            self.sock.sendto(command_data, (self.host, self.port))
-
-            self.log(f"📤 發送輸入指令: {selected_key}")
-            self.log("=" * 50)
+            decided = time.perf_counter()
+            self.send_command(command_data)
+            self.metrics.record_decision(decided - start, time.perf_counter() - decided)
+
+            if self.recorder:
+                self.recorder.record_sent(command_data, complex_command=self.input_format == "complex")
+            else:
+                if self.input_format == "complex":
+                    self.log(f"📤 發送複合指令: {describe_complex(input_command)}")
+                else:
+                    self.log(f"📤 發送輸入指令: {selected_key}")
+                # 未變化的 frame 只記錄送出的指令
+                if changed:
+                    self.log("=" * 50)
 
         except Exception as e:
             self.log(f"❌ 處理遊戲狀態錯誤: {e}")
 
+    def choose_key(self, game_data):
+        """依規劃選擇按鍵，沒有規劃時從該流程的按鍵表隨機選擇"""
+        selected_key = self.planner.choose(game_data.current_flow_state) if self.planner else None
+        if selected_key is None:
+            selected_key = random.choice(self.state_keys.get(game_data.current_flow_state, self.available_keys))
+        return selected_key
+
+    def input_tick(self, now):
+        """排程模式下每個 tick 呼叫一次：依最新狀態排入按鍵，送出到期的按下與放開"""
+        scheduler = self.scheduler
+        if not scheduler.ready(now):
+            return
+
+        start = time.perf_counter()
+        game_data = self.latest_game_data
+        axes = {}
+        if game_data is not None:
+            racing = game_data.current_flow_state == EGameFlowState.GAME_FLOW_RACE
+            policy_command = self.policy(game_data) if self.policy else None
+            if policy_command is None and self.race_controller and racing:
+                steer, throttle = self.race_controller.update(game_data.race_data)
+                axes = {EInputVrType.INPUT_VR_STEER: steer, EInputVrType.INPUT_VR_THROTTLE: throttle}
+            else:
+                if self.race_controller and self.race_controller.previous_pos is not None:
+                    self.race_controller.reset()
+                if racing and self.input_format == "complex":
+                    axes = {EInputVrType.INPUT_VR_THROTTLE: self.race_throttle}
+                # 放開由排程負責，策略回傳的放開指令略過
+                if policy_command is None:
+                    scheduler.press(self.key_mapping[self.choose_key(game_data)], now)
+                elif policy_command.is_key_down:
+                    for key in policy_command.key_inputs:
+                        scheduler.press(key, now)
+
+        releases, presses = scheduler.due(now)
+        if not (releases or presses or axes):
+            return
+        commands = self.build_scheduled_commands(releases, presses, axes, int(time.time() * 1000))
+
+        decided = time.perf_counter()
+        self.send_commands(commands)
+        scheduler.take(len(commands))
+        sent = time.perf_counter()
+        self.metrics.record_decision(decided - start, sent - decided)
+        received, self.pending_received = self.pending_received, None
+        if received is not None:
+            self.metrics.record_latency(sent - received)
+
+    def build_scheduled_commands(self, releases, presses, axes, timestamp):
+        """complex 格式合併成一個 ComplexInputCommand；simple 格式放開與按下各一個 InputCommand"""
+        if self.input_format == "complex":
+            input_frame = InputFrame()
+            for key in releases:
+                input_frame.release(key)
+            for key in presses:
+                input_frame.press(key)
+            for vr_type, value in axes.items():
+                input_frame.set_axis(vr_type, value)
+            return [input_frame.to_complex(timestamp)]
+
+        commands = []
+        for keys, is_key_down in ((releases, False), (presses, True)):
+            if keys:
+                input_command = InputCommand()
+                input_command.key_inputs.extend(keys)
+                input_command.is_key_down = is_key_down
+                input_command.timestamp = timestamp
+                commands.append(input_command)
+        return commands
+
+    def send_commands(self, commands):
+        """送出並記錄排程產生的指令"""
+        is_complex = self.input_format == "complex"
+        for input_command in commands:
+            command_data = input_command.SerializeToString()
+            self.send_command(command_data)
+            if self.recorder:
+                self.recorder.record_sent(command_data, complex_command=is_complex)
+                continue
+            if is_complex:
+                self.log(f"📤 發送複合指令: {describe_complex(input_command)}")
+            else:
+                keys = ", ".join(self.key_names[key] for key in input_command.key_inputs)
+                self.log(f"📤 發送輸入指令: {keys}" if input_command.is_key_down else f"📤 放開按鍵: {keys}")
+            self.log("=" * 50)
+
+    def release_held_keys(self):
+        """停止前放開排程中仍按著的按鍵，避免遊戲端卡鍵"""
+        keys = self.scheduler.release_all()
+        if keys:
+            self.send_commands(self.build_scheduled_commands(keys, [], {}, int(time.time() * 1000)))
+
+    def input_loop(self):
+        while self.running:
+            try:
+                if self.sock:
+                    self.input_tick(time.monotonic())
+            except Exception as e:
+                self.log(f"❌ 輸入排程錯誤: {e}")
+            time.sleep(self.scheduler.tick)
+
+    def build_complex_command(self, game_data, keys, timestamp):
+        """放開上一個 frame 按下的鍵、按下新鍵，比賽中加上油門，合併成一個 ComplexInputCommand"""
+        input_frame = InputFrame()
+        for key in self.held_keys:
+            input_frame.release(key)
+        for key in keys:
+            input_frame.press(key)
+        self.held_keys = list(keys)
+
+        if game_data.current_flow_state == EGameFlowState.GAME_FLOW_RACE:
+            input_frame.set_axis(EInputVrType.INPUT_VR_THROTTLE, self.race_throttle)
+
+        return input_frame.to_complex(timestamp)
+
+    def build_drive_command(self, game_data, timestamp):
+        """比賽中放開所有按鍵，只送轉向與油門"""
+        input_frame = InputFrame()
+        for key in self.held_keys:
+            input_frame.release(key)
+        self.held_keys = []
+
+        steer, throttle = self.race_controller.update(game_data.race_data)
+        input_frame.set_axis(EInputVrType.INPUT_VR_STEER, steer)
+        input_frame.set_axis(EInputVrType.INPUT_VR_THROTTLE, throttle)
+        return input_frame.to_complex(timestamp)
+
     def start(self):
         self.running = True
 
@@ -144,18 +531,38 @@ class AutoTestAgent:
         listen_thread.daemon = True
         listen_thread.start()
 
+        if self.scheduler:
+            input_thread = threading.Thread(target=self.input_loop)
+            input_thread.daemon = True
+            input_thread.start()
+
         try:
+            last_summary = time.monotonic()
             while self.running:
                 time.sleep(1)
+                if self.metrics_interval and time.monotonic() - last_summary >= self.metrics_interval:
+                    self.log(self.metrics.summary())
+                    last_summary = time.monotonic()
         except KeyboardInterrupt:
             self.stop()
 
     def stop(self):
         self.log("🛑 正在停止程式...")
+        self.log(self.metrics.summary())
+        if self.race_controller and self.race_controller.overruns:
+            self.log(f"⚠️ 轉向控制超出每 frame 預算 {self.race_controller.overruns} 次")
         self.running = False
+        if self.scheduler and self.sock:
+            try:
+                self.release_held_keys()
+            except OSError:
+                pass
         if self.sock:
             self.sock.close()
+        if self.recorder:
+            self.recorder.close()
         self.log("程式已停止")
+        self.log_writer.close()
 
 def signal_handler(signum, frame):
     print("\n收到中斷信號，正在優雅退出...")
@@ -163,10 +570,40 @@ def signal_handler(signum, frame):
     sys.exit(0)
 
 if __name__ == "__main__":
+    os.chdir(script_dir)
+    parser = argparse.ArgumentParser(description='AutoTestAgent - 遊戲自動測試程式')
+    parser.add_argument('--log-file', default='AutoTestAgent.log', help='日誌檔路徑')
+    parser.add_argument('--record', choices=['text', 'binary'], default='text', help='錄製模式 (預設 text)')
+    parser.add_argument('--capture-file', default='AutoTestAgent.capture', help='二進位錄製檔路徑')
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help='效能摘要輸出間隔 (秒，0 表示關閉)')
+    parser.add_argument('--metrics-port', type=int, help='本機效能量測 HTTP 端點埠號')
+    parser.add_argument('--model', help='TransitionModel.py 學習的流程轉換圖')
+    parser.add_argument('--target', help='目標狀態，例如 GAME_FLOW_RACE (需搭配 --model)')
+    parser.add_argument('--input-format', choices=['simple', 'complex'], default='simple',
+                        help='輸入格式 (complex 為 ComplexInputCommand，遊戲端需相同設定)')
+    parser.add_argument('--race-drive', action='store_true', help='比賽中依 race_data 自動轉向 (需搭配 --input-format complex)')
+    parser.add_argument('--schedule-input', action='store_true', help='以輸入排程取代每個 frame 送一個指令')
+    parser.add_argument('--hold', type=float, default=0.1, help='排程模式按鍵按住秒數')
+    parser.add_argument('--key-rate', type=float, default=5.0, help='排程模式每個按鍵每秒最多按下次數')
+    parser.add_argument('--max-rate', type=float, default=30.0, help='排程模式每秒最多送出的指令數')
+    parser.add_argument('--coalesce', choices=['off', 'latest', 'transitions'], default='off',
+                        help='落後時的積壓處理 (latest 只處理最新 frame，transitions 另保留狀態改變的 frame)')
+    parser.add_argument('--change-only', action='store_true', help='相同的 frame 不解析也不記錄，只記錄變更的欄位')
+    parser.add_argument('--policy', help='決策策略：規則檔 (.json) 或提供 decide(game_data) 的 Python 模組')
+    args = parser.parse_args()
+    if args.race_drive and args.input_format != 'complex':
+        parser.error('--race-drive 需要 --input-format complex')
+
     signal.signal(signal.SIGINT, signal_handler)
 
     try:
-        agent = AutoTestAgent()
+        agent = AutoTestAgent(log_file=args.log_file, record_mode=args.record, capture_file=args.capture_file,
+                              metrics_interval=args.metrics_interval, metrics_port=args.metrics_port,
+                              model_file=args.model, target_state=args.target,
+                              input_format=args.input_format, race_drive=args.race_drive,
+                              schedule_input=args.schedule_input, hold_duration=args.hold,
+                              key_rate=args.key_rate, max_command_rate=args.max_rate,
+                              coalesce=args.coalesce, change_only=args.change_only, policy=args.policy)
         agent.start()
     except KeyboardInterrupt:
         agent.stop()
@@ -2,23 +2,67 @@
 # -*- coding: utf-8 -*-
 """
 AutoTestBuilder - 定制化測試工具建置器
-使用 Q CLI 根據用戶指令和 GameSetting.md 生成定制化的 AutoTestAgent
+使用 Q CLI 根據用戶指令和 GameSetting.md 生成定制化的 AutoTestAgent；
+「每次都選首爾」這類選項指令直接比對 GameSetting.md 的枚舉編譯成規則表，不需呼叫 Q CLI
 """
 
 import os
+import re
 import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from QCliCache import QCliCache
+from QCliRunner import QCliRunner, DEFAULT_TIMEOUT
+from CodeRepair import is_split_by_char, reformat_joined_code, repair_split_lines
+from GameSettingParser import game_spec_from_content, to_enum_suffix
+
+# 規則快速路徑：指令需有選擇意圖，且不是隨機或依序這類需要程式邏輯的指令
+SELECT_WORDS = re.compile(r'選|select|choose|pick', re.IGNORECASE)
+DYNAMIC_WORDS = re.compile(r'隨機|依序|輪流|random|cycle', re.IGNORECASE)
+
+# 多候選生成：匯入檢查與連線 GameSimulator 冒煙測試的時間上限 (秒)
+IMPORT_CHECK_TIMEOUT = 15
+SMOKE_REGISTER_TIMEOUT = 5
+SMOKE_TEST_SECONDS = 3
+SMOKE_TEST_RATE = 30
+# 生成的 agent 必須優先使用這兩個環境變數 (提示詞中要求)，冒煙測試藉此指定模擬器埠號與各候選的日誌檔
+ENV_UDP_PORT = "AUTOTEST_UDP_PORT"
+ENV_LOG_FILE = "AUTOTEST_LOG_FILE"
+
+
 class AutoTestBuilder:
-    def __init__(self):
+    def __init__(self, force_qcli=False, use_cache=True, candidates=1, timeout=DEFAULT_TIMEOUT, log_file=None):
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
         self.base_agent_path = os.path.join(self.script_dir, "AutoTestAgent.py")
         self.output_path = os.path.join(self.script_dir, "AutoTestAgent_Custom.py")
-        self.log_file = os.path.join(self.script_dir, "AutoTestBuilder.log")
+        self.rules_path = os.path.join(self.script_dir, "AutoTestAgent_Custom.json")
+        self.force_qcli = force_qcli
+        self.candidates = max(1, candidates)
+        self.timeout = timeout
+        
+        # 執行中的 Q CLI 呼叫，多候選模式選出結果後中止其餘呼叫
+        self._runners = set()
+        self._process_lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.log_file = log_file or os.path.join(self.script_dir, "AutoTestBuilder.log")
         self.game_setting_path = os.path.join(self.script_dir, "GameSetting", "AutoTest_Game_Setting.md")
         
+        # Q CLI 生成快取：提示詞之外，GameSetting 與 Schema 變更也會使快取失效
+        self.cache = QCliCache() if use_cache else None
+        self.cache_inputs = [
+            self.game_setting_path,
+            os.path.join(self.script_dir, "ProtoSchema", "GameFlowData.proto"),
+            os.path.join(self.script_dir, "ProtoSchema", "InputCommand.proto"),
+        ]
+        
         # 清空日誌文件
         with open(self.log_file, 'w', encoding='utf-8') as f:
             pass
@@ -54,25 +98,21 @@ class AutoTestBuilder:
     def build_qcli_prompt(self, user_command, game_setting_content, base_agent_content):
         """建構 Q CLI 提示詞 - 動態提取配置"""
         
-        # 動態提取遊戲狀態
-        states = self._extract_states(game_setting_content)
+        # 共用的 GameSetting.md 模型 (依內容雜湊快取)
+        spec = game_spec_from_content(game_setting_content)
+        states = spec.states
+        keys = spec.keys
+        udp_config = spec.udp_config
         
-        # 動態提取按鍵定義
-        keys = self._extract_keys(game_setting_content)
-        
-        # 動態提取 UDP 配置
-        udp_config = self._extract_udp_config(game_setting_content)
-        
-        # 生成按鍵映射代碼
+        # 生成按鍵映射代碼 (排除屏蔽按鍵)
+        usable_keys = [to_enum_suffix(key) for key in keys if key not in spec.blocked_keys]
         key_mapping_code = "self.key_mapping = {\n"
-        for key in keys[:8]:  # 限制前8個常用按鍵
-            key_name = key.replace('INPUT_KEY_', '') if key.startswith('INPUT_KEY_') else key
+        for key_name in usable_keys[:8]:  # 限制前8個常用按鍵
             key_mapping_code += f'            "{key_name}": EInputKeyType.INPUT_KEY_{key_name},\n'
         key_mapping_code += "        }"
         
         # 生成可用按鍵列表
-        available_keys = [key.replace('INPUT_KEY_', '') if key.startswith('INPUT_KEY_') else key for key in keys[:5]]
-        available_keys_str = str(available_keys)
+        available_keys_str = str(usable_keys[:5])
         
         prompt = f"""只需要生成純Python程式碼，不要任何說明文字或格式化。
 
@@ -108,7 +148,8 @@ except ImportError as e:
 
 3. 定制化邏輯：
 - 檔案開頭註解: # 定制化指令: {user_command}
-- 日誌檔名: AutoTestAgent_Custom.log
+- 日誌檔名: 優先使用環境變數 {ENV_LOG_FILE}，未設定時為 AutoTestAgent_Custom.log
+- UDP 埠號: 優先使用環境變數 {ENV_UDP_PORT} (整數)，未設定時為 {udp_config['port']}
 - 根據用戶指令在特定遊戲狀態執行特定操作
 - 其他狀態使用隨機輸入
 
@@ -127,71 +168,112 @@ except ImportError as e:
         
         return prompt
     
-    def _extract_states(self, content):
-        """從內容中提取遊戲狀態"""
-        states = []
-        lines = content.split('\n')
-        in_enum = False
-        
-        for line in lines:
-            # 動態識別包含 "Flow" 或 "State" 的 enum
-            if 'enum' in line and ('Flow' in line or 'State' in line):
-                in_enum = True
-                continue
-            if in_enum and '}' in line:
-                in_enum = False
-                continue
-            if in_enum and '=' in line:
-                state_name = line.strip().split('=')[0].strip().rstrip(',')
-                if state_name and not state_name.startswith('//'):
-                    states.append(state_name)
-                    
-        return states
-    
-    def _extract_keys(self, content):
-        """從內容中提取按鍵定義"""
-        keys = []
-        lines = content.split('\n')
-        in_enum = False
-        
-        for line in lines:
-            # 動態識別包含 "Key" 或 "Input" 的 enum
-            if 'enum' in line and ('Key' in line or 'Input' in line):
-                in_enum = True
-                continue
-            if in_enum and '}' in line:
-                in_enum = False
+    def _find_option_targets(self, command, options):
+        """在指令中找出各枚舉的目標選項；同一枚舉比對到多個選項時視為無法判斷"""
+        matches = []
+        for enum_name, items in options.items():
+            for item in items:
+                if item.is_sentinel:
+                    continue
+                number, name = item.number, item.name
+                for alias in item.aliases:
+                    if alias.isascii():
+                        pattern = r'(?<![A-Za-z0-9])' + re.escape(alias) + r'(?![A-Za-z0-9])'
+                    else:
+                        pattern = re.escape(alias)
+                    for found in re.finditer(pattern, command, re.IGNORECASE):
+                        matches.append((found.start(), found.end(), enum_name, number, name))
+
+        # 較短的別名被較長的別名涵蓋時 (面罩 ⊂ 漫畫面罩) 以較長者為準
+        matches = [m for m in matches
+                   if not any(o[0] <= m[0] and m[1] <= o[1] and o[1] - o[0] > m[1] - m[0] for o in matches)]
+        targets = {}
+        for _, _, enum_name, number, name in matches:
+            if targets.setdefault(enum_name, (number, name)) != (number, name):
+                return None
+        return targets
+
+    def compile_rule_command(self, command, game_setting_content):
+        """把選項指令編譯成 AgentPolicy 規則，無法比對時回傳 None 交給 Q CLI"""
+        if not SELECT_WORDS.search(command) or DYNAMIC_WORDS.search(command):
+            return None
+        try:
+            sys.path.insert(0, self.script_dir)
+            from ProtoSchema.GameFlowData_pb2 import GameFlowData
+        except ImportError as e:
+            self.log(f"⚠️ 無法載入 Protobuf 模組，改用 Q CLI: {e}")
+            return None
+
+        spec = game_spec_from_content(game_setting_content)
+        flow_enums = {enum_name for flow in spec.option_flows for enum_name, _, _ in flow.options}
+        targets = self._find_option_targets(
+            command, {name: spec.enums[name].items for name in flow_enums if name in spec.enums})
+        if not targets:
+            return None
+
+        fields = {field.enum_type.name: field for field in GameFlowData.DESCRIPTOR.fields
+                  if field.enum_type is not None}
+        rules = []
+        for flow in spec.option_flows:
+            flow_name, keys, logic = flow.name, flow.keys, flow.options
+            state = "GAME_FLOW_" + to_enum_suffix(flow_name)
+            selects = []
+            for enum_name, prev_key, next_key in logic:
+                if enum_name not in targets:
+                    continue
+                number, name = targets[enum_name]
+                field = fields.get(enum_name)
+                value = field and field.enum_type.values_by_number.get(number)
+                if value is None:
+                    self.log(f"⚠️ GameFlowData 沒有對應 {enum_name}::{name} 的欄位或值")
+                    return None
+                selects.append({"state": state, "select": {
+                    "field": field.name, "value": value.name,
+                    "prev": to_enum_suffix(prev_key), "next": to_enum_suffix(next_key)}})
+                self.log(f"🎯 {flow_name}: {enum_name}::{name} → {field.name}={value.name}")
+            if not selects:
                 continue
-            if in_enum and '=' in line:
-                key_name = line.strip().split('=')[0].strip().rstrip(',')
-                if key_name and not key_name.startswith('//'):
-                    keys.append(key_name)
-                    
-        return keys
-    
-    def _extract_udp_config(self, content):
-        """從內容中提取 UDP 配置"""
-        lines = content.split('\n')
-        config = {"host": "127.0.0.1", "port": 8587}  # 預設值
-        
-        for line in lines:
-            line = line.strip()
-            # 查找 UDP 相關配置
-            if 'UDPSOCKET_URL' in line and '=' in line:
-                url = line.split('=')[1].strip().strip('"\'')
-                # 解析 udp://host:port 格式
-                if url.startswith('udp://'):
-                    host_port = url[6:]  # 移除 udp://
-                    if ':' in host_port:
-                        host, port = host_port.split(':', 1)
-                        try:
-                            config["host"] = host
-                            config["port"] = int(port)
-                        except ValueError:
-                            pass
-                
-        return config
-    
+            rules.extend(selects)
+            used = {key for _, prev_key, next_key in logic for key in (prev_key, next_key)}
+            confirm = [to_enum_suffix(key) for key in keys if key not in used]
+            if confirm:
+                rules.append({"state": state, "keys": confirm[:1]})
+        return rules
+
+    def write_rule_agent(self, command, rules):
+        """輸出規則檔與以 --policy 啟動 AutoTestAgent 的定制化入口"""
+        with open(self.rules_path, 'w', encoding='utf-8') as f:
+            json.dump({"description": command, "rules": rules}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+        rules_name = os.path.basename(self.rules_path)
+        log_name = os.path.splitext(os.path.basename(self.output_path))[0] + ".log"
+        launcher = f'''#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 定制化指令: {command}
+"""
+AutoTestAgent_Custom - 由 AutoTestBuilder 規則快速路徑產生
+以 {rules_name} 規則表作為決策策略啟動 AutoTestAgent
+"""
+
+import os
+import sys
+import runpy
+
+# 確保正確的工作目錄和路徑
+script_dir = os.path.dirname(os.path.abspath(__file__))
+os.chdir(script_dir)
+sys.path.insert(0, script_dir)
+
+if "--policy" not in sys.argv:
+    sys.argv[1:1] = ["--policy", os.path.join(script_dir, "{rules_name}")]
+if "--log-file" not in sys.argv:
+    sys.argv[1:1] = ["--log-file", os.environ.get("{ENV_LOG_FILE}", "{log_name}")]
+runpy.run_path(os.path.join(script_dir, "AutoTestAgent.py"), run_name="__main__")
+'''
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write(launcher)
+
     def _get_q_command(self):
         """根據執行環境選擇適當的 Q CLI 命令"""
         import platform
@@ -206,7 +288,7 @@ except ImportError as e:
             return ["q", "chat", "--no-interactive", "--trust-all-tools"]
     
     def call_qcli(self, prompt):
-        """呼叫 Q CLI 生成程式碼"""
+        """呼叫 Q CLI 生成程式碼，超過 self.timeout 秒 (0 為不限) 或被 cancel_qcli 中止時回傳 None"""
         try:
             self.log("🤖 呼叫 Q CLI 進行程式碼生成...")
             
@@ -218,21 +300,31 @@ except ImportError as e:
             if platform.system() == "Windows":
                 # Windows + WSL 格式，設定正確的編碼
                 full_command = f"q chat --no-interactive --trust-all-tools '{prompt}'"
-                result = subprocess.run(
-                    base_command + [full_command], 
-                    capture_output=True, text=True, 
-                    cwd=self.script_dir,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
+                command = base_command + [full_command]
+                errors = 'ignore'
             else:
                 # Linux/macOS 格式
-                result = subprocess.run(
-                    base_command + [prompt], 
-                    capture_output=True, text=True, 
-                    cwd=self.script_dir,
-                    encoding='utf-8'
-                )
+                command = base_command + [prompt]
+                errors = 'replace'
+            
+            # 串流讀取輸出，看到完整模組就提早結束，逾時或被中止時連同子行程一起結束
+            runner = QCliRunner(self.script_dir, timeout=self.timeout, log=self.log, errors=errors)
+            with self._process_lock:
+                self._runners.add(runner)
+            if self._cancelled.is_set():
+                runner.cancel()
+            try:
+                result = runner.run(command)
+            finally:
+                with self._process_lock:
+                    self._runners.discard(runner)
+            if result.cancelled:
+                return None
+            if result.timed_out:
+                self.log(f"⏱️ Q CLI 超過 {self.timeout:g} 秒，已中止")
+                return None
+            if result.stopped_early:
+                self.log(f"✂️ 已取得完整程式碼，提早結束 Q CLI ({result.elapsed:.1f} 秒)")
             
             self.log(f"Q CLI 返回碼: {result.returncode}")
             if result.stdout:
@@ -264,6 +356,109 @@ except ImportError as e:
             self.log(f"❌ 執行 Q CLI 時發生異常: {e}")
             return None
     
+    def cancel_qcli(self):
+        """中止所有執行中的 Q CLI 呼叫"""
+        self._cancelled.set()
+        with self._process_lock:
+            runners = list(self._runners)
+        for runner in runners:
+            runner.cancel()
+    
+    def generate_candidates(self, prompt, game_setting_content):
+        """同時發出 N 個 Q CLI 生成，依完成順序驗證，回傳第一個通過驗證的程式碼並中止其餘呼叫"""
+        self.log(f"🎲 同時生成 {self.candidates} 個候選程式碼" +
+                 (f" (每個上限 {self.timeout:g} 秒)" if self.timeout else ""))
+        self._cancelled.clear()
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.candidates)
+        try:
+            futures = {executor.submit(self.call_qcli, prompt): index + 1 for index in range(self.candidates)}
+            for future in as_completed(futures):
+                index = futures[future]
+                output = future.result()
+                if not output:
+                    self.log(f"❌ 候選 #{index} 生成失敗")
+                    continue
+                code = self._clean_generated_code(self.extract_python_code(output))
+                if self._check_candidate(code, index):
+                    self.log(f"🏆 採用候選 #{index} ({time.perf_counter() - start:.1f} 秒)")
+                    return code
+        finally:
+            self.cancel_qcli()
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.log(f"❌ {self.candidates} 個候選皆未通過驗證")
+        return None
+    
+    def _check_candidate(self, code, index):
+        """語法、匯入與冒煙測試；候選檔暫存在專案目錄，讓生成程式碼的路徑修正找得到 ProtoSchema"""
+        if not self._validate_generated_code(code):
+            self.log(f"❌ 候選 #{index} 未通過語法檢查")
+            return False
+        
+        fd, path = tempfile.mkstemp(prefix=f".candidate_{index}_", suffix=".py", dir=self.script_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(code)
+            if not self._import_check(path, index):
+                return False
+            return self._smoke_test(path, index)
+        finally:
+            os.remove(path)
+    
+    def _import_check(self, path, index):
+        """在子行程匯入候選模組 (不執行 __main__)"""
+        loader = ("import importlib.util, sys\n"
+                  "spec = importlib.util.spec_from_file_location('candidate', sys.argv[1])\n"
+                  "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n")
+        try:
+            result = subprocess.run([sys.executable, "-c", loader, path], cwd=self.script_dir,
+                                    stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                                    encoding='utf-8', errors='ignore', timeout=IMPORT_CHECK_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.log(f"❌ 候選 #{index} 匯入超過 {IMPORT_CHECK_TIMEOUT} 秒")
+            return False
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            self.log(f"❌ 候選 #{index} 匯入失敗: {error[-1] if error else result.returncode}")
+            return False
+        self.log(f"✅ 候選 #{index} 匯入檢查通過")
+        return True
+    
+    def _smoke_test(self, path, index):
+        """以本機 GameSimulator 取代遊戲端，確認候選會註冊並回送可解析的 InputCommand
+        埠號與日誌檔以環境變數傳入 (不修改候選程式碼)，多個候選的冒煙測試互不干擾"""
+        from GameSimulator import SimulatorServer
+        
+        server = SimulatorServer(port=0)
+        port = server.sock.getsockname()[1]
+        log_dir = tempfile.mkdtemp(prefix=f"candidate_{index}_")
+        log_path = os.path.join(log_dir, "AutoTestAgent_Custom.log")
+        env = dict(os.environ, **{ENV_UDP_PORT: str(port), ENV_LOG_FILE: log_path})
+        
+        process = subprocess.Popen([sys.executable, path], cwd=self.script_dir, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not server.wait_for_agents(1, timeout=SMOKE_REGISTER_TIMEOUT):
+                self.log(f"❌ 候選 #{index} 冒煙測試: {SMOKE_REGISTER_TIMEOUT} 秒內未註冊 (需使用 {ENV_UDP_PORT})")
+                return False
+            frames, commands = server.run(SMOKE_TEST_RATE, SMOKE_TEST_SECONDS)
+        finally:
+            process.kill()
+            process.wait()
+            server.close()
+            log_written = os.path.exists(log_path)
+            shutil.rmtree(log_dir, ignore_errors=True)
+        
+        if commands == 0:
+            self.log(f"❌ 候選 #{index} 冒煙測試: 送出 {frames} 個 frame 未收到可解析的指令 "
+                     f"(無法解析 {server.bad_packets} 個)")
+            return False
+        if not log_written:
+            self.log(f"❌ 候選 #{index} 冒煙測試: 未寫入 {ENV_LOG_FILE} 指定的日誌檔")
+            return False
+        self.log(f"✅ 候選 #{index} 冒煙測試通過: frame={frames} 指令={commands}")
+        return True
+    
     def _remove_ansi_codes(self, text):
         """移除 ANSI 顏色代碼"""
         import re
@@ -277,23 +472,10 @@ except ImportError as e:
         
         # 檢測 WSL 格式問題：每個字符分行
         lines = clean_output.split('\n')
-        if len(lines) > 100:  # 如果行數異常多
-            # 檢查是否大部分行都是單字符
-            single_char_lines = [line for line in lines if len(line.strip()) == 1]
-            if len(single_char_lines) > len(lines) * 0.7:  # 70% 以上是單字符行
-                self.log("🔧 檢測到嚴重的 WSL 格式問題，重組程式碼...")
-                # 直接連接所有非空行
-                rejoined = ''.join(line.strip() for line in lines if line.strip())
-                # 在關鍵位置插入換行
-                rejoined = rejoined.replace('#!/usr/bin/env python3', '#!/usr/bin/env python3\n')
-                rejoined = rejoined.replace('# -*- coding: utf-8 -*-', '\n# -*- coding: utf-8 -*-\n')
-                rejoined = rejoined.replace('import ', '\nimport ')
-                rejoined = rejoined.replace('from ', '\nfrom ')
-                rejoined = rejoined.replace('class ', '\n\nclass ')
-                rejoined = rejoined.replace('def ', '\n    def ')
-                rejoined = rejoined.replace('if __name__', '\n\nif __name__')
-                clean_output = rejoined
-                self.log(f"🔧 WSL 格式修復完成")
+        if len(lines) > 100 and is_split_by_char(lines):  # 行數異常多且 70% 以上是單字符行
+            self.log("🔧 檢測到嚴重的 WSL 格式問題，重組程式碼...")
+            clean_output = repair_split_lines(lines)
+            self.log(f"🔧 WSL 格式修復完成")
         
         # 如果已經是純程式碼，直接返回
         if clean_output.strip().startswith('#!/usr/bin/env python3'):
@@ -396,45 +578,8 @@ except ImportError as e:
         return '\n'.join(clean_lines)
     
     def _reformat_python_code(self, joined_code):
-        """重新格式化被 WSL 破壞的 Python 程式碼"""
-        # 基本的 Python 關鍵字和結構
-        keywords = [
-            '#!/usr/bin/env python3',
-            '# -*- coding: utf-8 -*-',
-            'import ', 'from ', 'class ', 'def ', 'if ', 'else:', 'elif ', 'try:', 'except',
-            'for ', 'while ', 'return ', 'self.', 'print(', '__init__', '__name__'
-        ]
-        
-        result = []
-        i = 0
-        current_line = ""
-        
-        while i < len(joined_code):
-            # 檢查是否匹配關鍵字
-            matched = False
-            for keyword in keywords:
-                if joined_code[i:].startswith(keyword):
-                    if current_line.strip():
-                        result.append(current_line)
-                        current_line = ""
-                    current_line = keyword
-                    i += len(keyword)
-                    matched = True
-                    break
-            
-            if not matched:
-                current_line += joined_code[i]
-                i += 1
-                
-            # 檢查是否應該換行
-            if current_line.endswith(':') or current_line.endswith('"""') or len(current_line) > 80:
-                result.append(current_line)
-                current_line = ""
-        
-        if current_line.strip():
-            result.append(current_line)
-            
-        return '\n'.join(result)
+        """重新格式化被 WSL 破壞的 Python 程式碼 (線性時間，見 CodeRepair)"""
+        return reformat_joined_code(joined_code)
     
     def process_command(self, command):
         """統一的指令處理流程"""
@@ -448,23 +593,54 @@ except ImportError as e:
             self.log("❌ 無法載入必要文件")
             return False
         
+        # 規則快速路徑：選項指令直接編譯成規則表
+        if not self.force_qcli:
+            start = time.perf_counter()
+            rules = self.compile_rule_command(command, game_setting_content)
+            if rules:
+                self.write_rule_agent(command, rules)
+                elapsed = (time.perf_counter() - start) * 1000
+                self.log(f"⚡ 規則快速路徑: {len(rules)} 條規則 ({elapsed:.1f} ms)，不需呼叫 Q CLI")
+                self.log(f"✅ 規則檔已生成: {self.rules_path}")
+                self.log(f"✅ 定制化 AutoTestAgent 已生成: {self.output_path}")
+                return True
+            self.log("ℹ️ 指令無法對應到選項規則，改用 Q CLI 生成")
+        
         # 建構 Q CLI 提示詞
         prompt = self.build_qcli_prompt(command, game_setting_content, base_agent_content)
         
-        # 呼叫 Q CLI
-        qcli_output = self.call_qcli(prompt)
-        if not qcli_output:
-            return False
-        
-        # 提取程式碼
-        custom_code = self.extract_python_code(qcli_output)
-        
-        # 清理程式碼
-        custom_code = self._clean_generated_code(custom_code)
-        
-        # 驗證程式碼品質
-        if not self._validate_generated_code(custom_code):
-            self.log("⚠️ 程式碼驗證失敗，但仍會儲存")
+        # 相同提示詞與輸入檔直接使用快取
+        cache_key = self.cache.key(prompt, self.cache_inputs) if self.cache else None
+        custom_code = self.cache.get(cache_key) if cache_key else None
+        if custom_code:
+            self.log(f"📦 快取命中 ({cache_key[:12]})，略過 Q CLI")
+        elif self.candidates > 1:
+            # 多候選：只儲存通過驗證與冒煙測試的程式碼
+            custom_code = self.generate_candidates(prompt, game_setting_content)
+            if not custom_code:
+                return False
+            if cache_key:
+                self.cache.put(cache_key, custom_code)
+                self.log(f"📦 已寫入快取 ({cache_key[:12]})")
+        else:
+            # 呼叫 Q CLI
+            qcli_output = self.call_qcli(prompt)
+            if not qcli_output:
+                return False
+            
+            # 提取程式碼
+            custom_code = self.extract_python_code(qcli_output)
+            
+            # 清理程式碼
+            custom_code = self._clean_generated_code(custom_code)
+            
+            # 驗證程式碼品質，只有通過驗證的程式碼寫入快取
+            if self._validate_generated_code(custom_code):
+                if cache_key:
+                    self.cache.put(cache_key, custom_code)
+                    self.log(f"📦 已寫入快取 ({cache_key[:12]})")
+            else:
+                self.log("⚠️ 程式碼驗證失敗，但仍會儲存")
         
         # 儲存定制化版本
         with open(self.output_path, 'w', encoding='utf-8') as f:
@@ -506,10 +682,17 @@ def main():
     parser = argparse.ArgumentParser(description='AutoTestBuilder - 定制化測試工具建置器')
     parser.add_argument('--command', help='自然語言測試指令')
     parser.add_argument('--interactive', action='store_true', help='互動模式')
+    parser.add_argument('--qcli', action='store_true', help='略過規則快速路徑，一律呼叫 Q CLI 生成')
+    parser.add_argument('--no-cache', action='store_true', help='不使用 Q CLI 生成快取')
+    parser.add_argument('--candidates', type=int, default=1,
+                        help='同時生成的候選數，採用第一個通過語法、匯入與冒煙測試的候選')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'每次 Q CLI 呼叫的時間上限 (秒，預設 {DEFAULT_TIMEOUT:g}，0 為不限)')
     
     args = parser.parse_args()
     
-    builder = AutoTestBuilder()
+    builder = AutoTestBuilder(force_qcli=args.qcli, use_cache=not args.no_cache,
+                              candidates=args.candidates, timeout=args.timeout)
     
     if args.interactive or (not args.command and len(sys.argv) == 1):
         # 互動模式
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BuildManifest - AgentMaker 的增量建置清單
+記錄每個產物的輸入檔雜湊、生成設定 (recipe) 雜湊、產物雜湊與驗證結果；
+輸入、設定與產物都未變更且上次驗證通過時視為最新，不需重新生成
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+MANIFEST_VERSION = 1
+
+
+def file_digest(path):
+    """檔案內容的 SHA-256，檔案不存在時回傳 None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path, root=None):
+        self.path = str(path)
+        self.root = str(root) if root is not None else os.path.dirname(os.path.abspath(self.path))
+        self.artifacts = {}
+        self._digests = {}
+        self.load()
+
+    def _relative(self, path):
+        return os.path.relpath(str(path), self.root).replace(os.sep, '/')
+
+    def _digest(self, path):
+        """輸入檔雜湊在同一次建置中只計算一次"""
+        key = self._relative(path)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path)
+        return self._digests[key]
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.artifacts = data.get("artifacts", {})
+
+    def save(self):
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "artifacts": self.artifacts}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(temp_path, self.path)
+
+    def outdated(self, artifact, inputs, recipe=None):
+        """回傳需要重新生成的原因列表，空列表表示產物為最新"""
+        record = self.artifacts.get(self._relative(artifact))
+        if record is None:
+            return ["尚無建置記錄"]
+
+        reasons = []
+        recorded_inputs = record.get("inputs", {})
+        current_inputs = {self._relative(path): self._digest(path) for path in inputs}
+        changed = sorted(name for name in set(recorded_inputs) | set(current_inputs)
+                         if recorded_inputs.get(name) != current_inputs.get(name))
+        if changed:
+            reasons.append(f"輸入變更: {', '.join(os.path.basename(name) for name in changed)}")
+        if record.get("recipe") != recipe:
+            reasons.append("生成設定變更")
+
+        output = file_digest(artifact)
+        if output is None:
+            reasons.append("產物不存在")
+        elif output != record.get("output"):
+            reasons.append("產物與記錄不符")
+        if not record.get("valid"):
+            reasons.append("上次驗證未通過")
+        return reasons
+
+    def record(self, artifact, inputs, recipe=None, valid=True):
+        """記錄產物建置結果，產物雜湊在寫入後重新計算；不記錄建置時間，內容相同時清單也不變"""
+        self.artifacts[self._relative(artifact)] = {
+            "inputs": {self._relative(path): self._digest(path) for path in inputs},
+            "recipe": recipe,
+            "output": file_digest(artifact),
+            "valid": bool(valid),
+        }
+
+
+def main():
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AgentMaker_Manifest.json")
+    parser = argparse.ArgumentParser(description='BuildManifest - 檢視增量建置清單 (有過期產物時返回 1)')
+    parser.add_argument('path', nargs='?', default=default_path, help='建置清單路徑')
+    args = parser.parse_args()
+
+    manifest = BuildManifest(args.path)
+    if not manifest.artifacts:
+        print(f"📭 {args.path}: 沒有建置記錄")
+        return
+    stale = 0
+    for artifact, record in sorted(manifest.artifacts.items()):
+        artifact_path = os.path.join(manifest.root, artifact)
+        reasons = manifest.outdated(artifact_path, [os.path.join(manifest.root, name) for name in record["inputs"]],
+                                    record.get("recipe"))
+        status = "✅ 最新" if not reasons else "🔄 " + "；".join(reasons)
+        print(f"{artifact}  ({(record.get('output') or '?')[:12]})  {status}")
+        stale += bool(reasons)
+    if stale:
+        # CI 用：有過期的產物時返回 1，提醒執行 AgentMaker 後一併提交建置清單
+        print(f"❌ {stale} 個產物需要重新生成，請執行 python AgentMaker.py")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CodeRepair - 修復被 WSL 拆成每個字元一行的 Q CLI 輸出
+把所有行接回一個字串後，以單一 alternation regex 找出關鍵字位置重新斷行，
+整體為線性時間；AutoTestBuilder 的程式碼提取與清理共用此引擎
+"""
+
+import os
+import re
+import time
+import argparse
+
+# 依序比對，同一位置以排在前面的關鍵字為準 (與 regex alternation 的語意相同)
+KEYWORDS = [
+    '#!/usr/bin/env python3',
+    '# -*- coding: utf-8 -*-',
+    'import ', 'from ', 'class ', 'def ', 'if ', 'else:', 'elif ', 'try:', 'except',
+    'for ', 'while ', 'return ', 'self.', 'print(', '__init__', '__name__'
+]
+KEYWORD_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in KEYWORDS))
+BREAK_PATTERN = re.compile(r'[:"]')
+MAX_LINE = 80
+
+
+def is_split_by_char(lines, sample=None, threshold=0.7):
+    """大部分行只有一個字元時視為 WSL 拆行 (sample 只檢查前幾行)"""
+    checked = lines[:sample] if sample else lines
+    single_char_lines = sum(1 for line in checked if len(line.strip()) == 1)
+    return single_char_lines > len(checked) * threshold
+
+
+def reformat_joined_code(joined_code):
+    """在關鍵字前斷行，行尾為 ':' 或 '\"\"\"'、或超過 MAX_LINE 字元時也斷行"""
+    lines = []
+    current = ""
+
+    def feed(text):
+        nonlocal current
+        start, end_of_text = 0, len(text)
+        while start < end_of_text:
+            # 目前行最多再接 room 個字元就會超過 MAX_LINE
+            room = MAX_LINE + 1 - len(current)
+            end = min(end_of_text, start + room)
+            search_from = start
+            while True:
+                found = BREAK_PATTERN.search(text, search_from, end)
+                if found is None:
+                    break
+                stop = found.end()
+                if found.group() == ':' or (current + text[start:stop]).endswith('"""'):
+                    break
+                search_from = stop
+            if found is not None:
+                lines.append(current + text[start:stop])
+                current = ""
+                start = stop
+            elif end - start == room:
+                lines.append(current + text[start:end])
+                current = ""
+                start = end
+            else:
+                current += text[start:end]
+                start = end
+
+    position = 0
+    for match in KEYWORD_PATTERN.finditer(joined_code):
+        feed(joined_code[position:match.start()])
+        if current.strip():
+            lines.append(current)
+        # 關鍵字整個放進新的一行後才檢查斷行 ('# -*- coding: utf-8 -*-' 中間的 ':' 不斷行)
+        current = match.group()
+        if current.endswith(':') or current.endswith('"""'):
+            lines.append(current)
+            current = ""
+        position = match.end()
+    feed(joined_code[position:])
+
+    if current.strip():
+        lines.append(current)
+    return '\n'.join(lines)
+
+
+def repair_split_lines(lines):
+    """接回每個字元一行的輸出並重新斷行"""
+    return reformat_joined_code(''.join(line.strip() for line in lines if line.strip()))
+
+
+def _legacy_reformat(joined_code):
+    """原本逐字元比對所有關鍵字的實作，僅供基準測試比對結果與耗時"""
+    result = []
+    i = 0
+    current_line = ""
+    while i < len(joined_code):
+        matched = False
+        for keyword in KEYWORDS:
+            if joined_code[i:].startswith(keyword):
+                if current_line.strip():
+                    result.append(current_line)
+                    current_line = ""
+                current_line = keyword
+                i += len(keyword)
+                matched = True
+                break
+        if not matched:
+            current_line += joined_code[i]
+            i += 1
+        if current_line.endswith(':') or current_line.endswith('"""') or len(current_line) > 80:
+            result.append(current_line)
+            current_line = ""
+    if current_line.strip():
+        result.append(current_line)
+    return '\n'.join(result)
+
+
+def garble(code, size):
+    """產生約 size 字元、每個字元一行的 WSL 拆行輸出"""
+    chars = []
+    total = 0
+    while total < size:
+        for char in code:
+            if char.strip():
+                chars.append(char)
+                total += 2
+                if total >= size:
+                    break
+    return '\n'.join(chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CodeRepair - WSL 拆行修復基準測試')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='拆行輸出的字元數')
+    parser.add_argument('--legacy-limit', type=int, default=100_000,
+                        help='原本實作只測到這個大小 (O(n²)，再大會跑很久)')
+    parser.add_argument('--source', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'AutoTestAgent.py'),
+                        help='用來產生拆行輸出的程式碼')
+    args = parser.parse_args()
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        code = f.read()
+
+    for size in args.sizes:
+        lines = garble(code, size).split('\n')
+        start = time.perf_counter()
+        repaired = repair_split_lines(lines)
+        elapsed = time.perf_counter() - start
+        message = f"📏 {size:>9,} 字元  新={elapsed * 1000:9.1f} ms"
+        if size <= args.legacy_limit:
+            joined = ''.join(line.strip() for line in lines if line.strip())
+            start = time.perf_counter()
+            expected = _legacy_reformat(joined)
+            legacy_elapsed = time.perf_counter() - start
+            status = "✅" if expected == repaired else "❌ 結果不同"
+            message += f"  原本={legacy_elapsed * 1000:9.1f} ms  ({legacy_elapsed / elapsed:.0f}x) {status}"
+        print(message)
+
+
+if __name__ == "__main__":
+    main()
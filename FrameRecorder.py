@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FrameRecorder - AutoTestAgent 二進位錄製格式
+直接保存收到的 GameFlowData 原始封包與送出的 InputCommand，需要時再離線展開成文字日誌
+
+檔案格式：
+    檔頭   MAGIC (8 bytes)
+    紀錄   <B 類型> <d 時間戳記> <I 長度> <payload>
+    類型   1 = 收到的 GameFlowData, 2 = 送出的 InputCommand, 3 = 索引, 4 = 送出的 ComplexInputCommand
+    索引   每 index_interval 個 frame 寫入一次，內容為 (<Q frame 編號> <Q 檔案位移>) 陣列
+"""
+
+import os
+import sys
+import struct
+import time
+import argparse
+import threading
+
+MAGIC = b"ATAFRM01"
+RECORD_HEADER = struct.Struct("<BdI")
+INDEX_ENTRY = struct.Struct("<QQ")
+
+RECORD_RECEIVED = 1
+RECORD_SENT = 2
+RECORD_INDEX = 3
+RECORD_SENT_COMPLEX = 4
+
+
+class FrameRecorder:
+    """將收發封包以長度前綴格式附加到錄製檔"""
+
+    def __init__(self, capture_file, index_interval=1000, buffer_size=1024 * 1024):
+        self.capture_file = capture_file
+        self.index_interval = index_interval
+        self.frame_count = 0
+        self._pending_index = []
+        # 收到的 frame 與送出的指令可能來自不同執行緒 (--schedule-input)，紀錄與索引的寫入需互斥
+        self._lock = threading.RLock()
+
+        is_new = not os.path.exists(capture_file) or os.path.getsize(capture_file) == 0
+        self._file = open(capture_file, "ab", buffering=buffer_size)
+        if is_new:
+            self._file.write(MAGIC)
+        self._offset = self._file.tell()
+
+    def _write(self, record_type, payload, timestamp):
+        # 呼叫端需持有 self._lock；停止程式時監聽執行緒可能還在收尾，關閉後的紀錄直接忽略
+        if self._file.closed:
+            return None
+        offset = self._offset
+        self._file.write(RECORD_HEADER.pack(record_type, timestamp, len(payload)))
+        self._file.write(payload)
+        self._offset += RECORD_HEADER.size + len(payload)
+        return offset
+
+    def record_received(self, data, timestamp=None):
+        """記錄收到的 GameFlowData 原始封包"""
+        with self._lock:
+            offset = self._write(RECORD_RECEIVED, data, time.time() if timestamp is None else timestamp)
+            if offset is None:
+                return
+            self._pending_index.append((self.frame_count, offset))
+            self.frame_count += 1
+            if len(self._pending_index) >= self.index_interval:
+                self.write_index()
+
+    def record_sent(self, data, timestamp=None, complex_command=False):
+        """記錄送出的 InputCommand (或 ComplexInputCommand) 序列化內容"""
+        record_type = RECORD_SENT_COMPLEX if complex_command else RECORD_SENT
+        with self._lock:
+            self._write(record_type, data, time.time() if timestamp is None else timestamp)
+
+    def write_index(self):
+        """寫入索引並 flush，確保中斷時最多遺失一個區段"""
+        with self._lock:
+            if not self._pending_index or self._file.closed:
+                return
+            payload = b"".join(INDEX_ENTRY.pack(frame, offset) for frame, offset in self._pending_index)
+            self._write(RECORD_INDEX, payload, time.time())
+            self._pending_index = []
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self.write_index()
+            self._file.close()
+
+
+class FrameReader:
+    """依序讀取錄製檔的紀錄"""
+
+    def __init__(self, capture_file):
+        self.capture_file = capture_file
+
+    def records(self, include_index=False):
+        """產生 (類型, 時間戳記, payload)，遇到截斷的尾端紀錄時停止"""
+        with open(self.capture_file, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是 AutoTestAgent 錄製檔: {self.capture_file}")
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                record_type, timestamp, length = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+                if record_type == RECORD_INDEX and not include_index:
+                    continue
+                yield record_type, timestamp, payload
+
+    def index(self):
+        """讀出所有索引，回傳 {frame 編號: 檔案位移}"""
+        result = {}
+        for record_type, _, payload in self.records(include_index=True):
+            if record_type != RECORD_INDEX:
+                continue
+            for frame, offset in INDEX_ENTRY.iter_unpack(payload):
+                result[frame] = offset
+        return result
+
+
+def expand_capture(capture_file, output):
+    """將錄製檔展開為 AutoTestAgent.log 的文字格式"""
+    from ProtoSchema.GameFlowData_pb2 import GameFlowData
+    from ProtoSchema.InputCommand_pb2 import InputCommand, ComplexInputCommand, EInputKeyType
+    from AgentInput import describe_complex
+
+    def stamp(timestamp):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+    count = 0
+    for record_type, timestamp, payload in FrameReader(capture_file).records():
+        prefix = f"[{stamp(timestamp)}]"
+        if record_type == RECORD_RECEIVED:
+            game_data = GameFlowData()
+            game_data.ParseFromString(payload)
+            output.write(f"{prefix} 📥 接收遊戲數據:\n")
+            for field in game_data.DESCRIPTOR.fields:
+                output.write(f"{prefix}    {field.name}: {getattr(game_data, field.name)}\n")
+            count += 1
+        elif record_type == RECORD_SENT:
+            input_command = InputCommand()
+            input_command.ParseFromString(payload)
+            keys = ", ".join(EInputKeyType.Name(key).replace("INPUT_KEY_", "") for key in input_command.key_inputs)
+            if input_command.is_key_down:
+                output.write(f"{prefix} 📤 發送輸入指令: {keys}\n")
+            else:
+                output.write(f"{prefix} 📤 放開按鍵: {keys}\n")
+            output.write(f"{prefix} {'=' * 50}\n")
+        elif record_type == RECORD_SENT_COMPLEX:
+            complex_command = ComplexInputCommand()
+            complex_command.ParseFromString(payload)
+            output.write(f"{prefix} 📤 發送複合指令: {describe_complex(complex_command)}\n")
+            output.write(f"{prefix} {'=' * 50}\n")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FrameRecorder - 展開 AutoTestAgent 二進位錄製檔')
+    parser.add_argument('capture_file', help='錄製檔路徑')
+    parser.add_argument('-o', '--output', help='輸出文字日誌路徑 (預設輸出到控制台)')
+
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            count = expand_capture(args.capture_file, f)
+        print(f"✅ 已展開 {count} 個 frame: {args.output}")
+    else:
+        expand_capture(args.capture_file, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GameSettingParser - AutoTest_Game_Setting.md 的單次掃描解析器
+一次讀完文件，產生流程枚舉、按鍵枚舉、屏蔽按鍵、各流程操作、選項枚舉與 UDP 設定的模型；
+模型以文件內容雜湊快取到磁碟，AgentMaker 與 AutoTestBuilder 共用同一份解析結果
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+
+# 解析邏輯變更時遞增，讓舊快取失效
+PARSER_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".game_spec_cache")
+MAX_CACHE_FILES = 16
+
+FLOW_ENUM = "EGameFlowState"
+KEY_ENUM = "EInputKeyType"
+VR_ENUM = "EInputVrType"
+SENTINEL_ITEMS = {"none", "max"}
+
+HEADING = re.compile(r'^#{1,6}\s')
+FLOW_HEADING = re.compile(r'^#{1,6}\s+[\d.]*\s*(.*?)\s*\(' + FLOW_ENUM + r'::(\w+)\)')
+OPTION_LOGIC = re.compile(r'^-\s*(E\w+)\s*[：:]\s*(\w+)\s*、\s*(\w+)')
+ENUM_HEADER = re.compile(r'^enum\s+(?:class\s+)?(\w+)')
+ENUM_ITEM = re.compile(r'^(\w+)\s*(?:=\s*(\d+))?\s*,?\s*(?://\s*(.*))?$')
+BLOCKED_LIST = re.compile(r'^(BLOCKED_\w+)\s*=\s*\[')
+QUOTED = re.compile(r'"([^"]+)"')
+UDP_SETTING = re.compile(r'^(UDPSOCKET_URL|UDP_HOST|UDP_PORT)\s*=\s*(.+)$')
+
+
+def to_enum_suffix(name):
+    """GameSetting.md 的名稱轉成 proto 枚舉後綴，例: CoinPage → COIN_PAGE、UELogo → UE_LOGO"""
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', '_', name).upper().replace('__', '_')
+
+
+class EnumItem:
+    def __init__(self, number, name, aliases):
+        self.number = number
+        self.name = name
+        # 名稱與中文註解，供指令比對
+        self.aliases = aliases
+
+    @property
+    def is_sentinel(self):
+        return self.name.lower() in SENTINEL_ITEMS
+
+
+class EnumSpec:
+    def __init__(self, name, items=None):
+        self.name = name
+        self.items = items or []
+
+    def add(self, name, number=None, aliases=()):
+        if number is None:
+            number = self.items[-1].number + 1 if self.items else 0
+        self.items.append(EnumItem(number, name, [name] + list(aliases)))
+
+    def names(self):
+        """不含 None/MAX 的選項名稱"""
+        return [item.name for item in self.items if not item.is_sentinel]
+
+
+class FlowSpec:
+    """「需要操作的流程」中的一個流程"""
+
+    def __init__(self, name, title="", keys=None, options=None):
+        self.name = name
+        self.title = title
+        # 按鍵操作
+        self.keys = keys or []
+        # 操作邏輯: [(枚舉名稱, 上一個按鍵, 下一個按鍵)]
+        self.options = options or []
+
+    def add_keys(self, keys):
+        for key in keys:
+            if key and key not in self.keys:
+                self.keys.append(key)
+
+
+class GameSpec:
+    def __init__(self, enums=None, flows=None, blocked=None, udp_config=None):
+        self.enums = enums or {}
+        self.flows = flows or []
+        # {清單名稱: [按鍵名稱]}，例: BLOCKED_DIGITAL_KEYS
+        self.blocked = blocked or {}
+        self.udp_config = udp_config or {"host": "127.0.0.1", "port": 8587}
+
+    def enum_names(self, name):
+        enum = self.enums.get(name)
+        return enum.names() if enum else []
+
+    @property
+    def states(self):
+        return self.enum_names(FLOW_ENUM)
+
+    @property
+    def keys(self):
+        return self.enum_names(KEY_ENUM)
+
+    @property
+    def vr_keys(self):
+        return self.enum_names(VR_ENUM)
+
+    def _blocked(self, vr):
+        names = []
+        for list_name, keys in self.blocked.items():
+            if ('vr' in list_name.lower()) == vr:
+                names.extend(key for key in keys if key not in names)
+        return names
+
+    @property
+    def blocked_keys(self):
+        """所有數位按鍵屏蔽清單的聯集"""
+        return self._blocked(vr=False)
+
+    @property
+    def blocked_vr_keys(self):
+        return self._blocked(vr=True)
+
+    @property
+    def option_flows(self):
+        return [flow for flow in self.flows if flow.options]
+
+    def flow_operations(self):
+        """{流程名稱: [按鍵名稱]}"""
+        return {flow.name: list(flow.keys) for flow in self.flows if flow.keys}
+
+    def to_dict(self):
+        return {
+            "version": PARSER_VERSION,
+            "enums": {name: [[item.number, item.name, item.aliases] for item in enum.items]
+                      for name, enum in self.enums.items()},
+            "flows": [{"name": flow.name, "title": flow.title, "keys": flow.keys,
+                       "options": [list(option) for option in flow.options]} for flow in self.flows],
+            "blocked": self.blocked,
+            "udp_config": self.udp_config,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        enums = {name: EnumSpec(name, [EnumItem(*item) for item in items])
+                 for name, items in data["enums"].items()}
+        flows = [FlowSpec(flow["name"], flow["title"], flow["keys"], [tuple(option) for option in flow["options"]])
+                 for flow in data["flows"]]
+        return cls(enums, flows, data["blocked"], data["udp_config"])
+
+
+def _setting_value(text):
+    return text.split('#')[0].strip().strip('"\'')
+
+
+def parse_game_setting(content):
+    """單次掃描 GameSetting.md，回傳 GameSpec"""
+    spec = GameSpec()
+    in_code_block = False
+    flow = None
+    block = None
+    enum = None
+    comments = []
+    in_block_comment = False
+    blocked_list = None
+
+    for line in content.split('\n'):
+        line = line.strip()
+
+        if enum is not None:
+            # 枚舉內容：註解成為下一個項目的別名
+            if in_block_comment or line.startswith('/*'):
+                in_block_comment = not line.endswith('*/')
+                text = line.strip('/* ')
+                if text:
+                    comments.append(text)
+            elif line.startswith('//'):
+                comments.append(line[2:].strip())
+            elif line.startswith('}'):
+                enum = None
+            else:
+                item = ENUM_ITEM.match(line)
+                if item:
+                    name, number, trailing = item.groups()
+                    enum.add(name, int(number) if number else None,
+                             comments + ([trailing.strip()] if trailing else []))
+                    comments = []
+            continue
+
+        if blocked_list is not None:
+            if not line.startswith('//'):
+                spec.blocked[blocked_list].extend(QUOTED.findall(line.split('//')[0]))
+            if ']' in line:
+                blocked_list = None
+            continue
+
+        if line.startswith('```'):
+            in_code_block = not in_code_block
+            continue
+
+        if not in_code_block and HEADING.match(line):
+            heading = FLOW_HEADING.match(line)
+            flow = FlowSpec(heading.group(2), heading.group(1)) if heading else None
+            if flow:
+                spec.flows.append(flow)
+            block = None
+            continue
+
+        header = ENUM_HEADER.match(line)
+        if header:
+            enum = spec.enums.setdefault(header.group(1), EnumSpec(header.group(1)))
+            comments = []
+            continue
+
+        blocked = BLOCKED_LIST.match(line)
+        if blocked:
+            blocked_list = blocked.group(1)
+            spec.blocked[blocked_list] = QUOTED.findall(line[blocked.end():].split('//')[0])
+            if ']' in line[blocked.end():]:
+                blocked_list = None
+            continue
+
+        setting = UDP_SETTING.match(line)
+        if setting:
+            name, value = setting.group(1), _setting_value(setting.group(2))
+            if '[' in value:
+                # 模板格式 ([IP_ADDRESS]/[PORT]) 沿用預設值
+                continue
+            if name == "UDPSOCKET_URL" and value.startswith('udp://') and ':' in value[6:]:
+                host, port = value[6:].split(':', 1)
+                if port.isdigit():
+                    spec.udp_config = {"host": host, "port": int(port)}
+            elif name == "UDP_HOST":
+                spec.udp_config["host"] = value
+            elif name == "UDP_PORT" and value.isdigit():
+                spec.udp_config["port"] = int(value)
+            continue
+
+        if flow is None:
+            continue
+        if line.startswith('**'):
+            block = "keys" if '按鍵操作' in line else "logic" if '操作邏輯' in line else None
+        elif line.startswith('-') and block == "keys":
+            flow.add_keys(key.strip() for key in re.split(r'[、,，]', line[1:]))
+        elif block == "logic":
+            option = OPTION_LOGIC.match(line)
+            if option:
+                flow.options.append(option.groups())
+
+    return spec
+
+
+_memo = {}
+
+
+def game_spec_from_content(content, cache_dir=DEFAULT_CACHE_DIR):
+    """依內容雜湊取得 GameSpec：行程內記憶 → 磁碟快取 → 重新解析並寫入快取"""
+    digest = hashlib.sha256(f"{PARSER_VERSION}\0{content}".encode('utf-8')).hexdigest()
+    spec = _memo.get(digest)
+    if spec is not None:
+        return spec
+
+    path = os.path.join(cache_dir, digest + ".json") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                spec = GameSpec.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            spec = None
+
+    if spec is None:
+        spec = parse_game_setting(content)
+        if path:
+            _write_cache(path, spec)
+    _memo[digest] = spec
+    return spec
+
+
+def _write_cache(path, spec):
+    cache_dir = os.path.dirname(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(spec.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        # 只保留最近的幾份，GameSetting.md 改版後舊的解析結果不再需要
+        files = sorted((os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".json")),
+                       key=os.path.getmtime)
+        for old_path in files[:-MAX_CACHE_FILES]:
+            os.remove(old_path)
+    except OSError:
+        pass
+
+
+def load_game_spec(path, cache_dir=DEFAULT_CACHE_DIR):
+    with open(path, 'r', encoding='utf-8') as f:
+        return game_spec_from_content(f.read(), cache_dir)
+
+
+def main():
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "GameSetting", "AutoTest_Game_Setting.md")
+    parser = argparse.ArgumentParser(description='GameSettingParser - 解析 GameSetting.md 並顯示模型摘要')
+    parser.add_argument('path', nargs='?', default=default_path, help='GameSetting.md 路徑')
+    parser.add_argument('--json', action='store_true', help='輸出完整模型 JSON')
+    args = parser.parse_args()
+
+    spec = load_game_spec(args.path)
+    if args.json:
+        print(json.dumps(spec.to_dict(), ensure_ascii=False, indent=2))
+        return
+
+    print(f"🎮 遊戲狀態: {len(spec.states)} 個")
+    print(f"⌨️ 按鍵: {', '.join(spec.keys)}")
+    print(f"🕹️ VR 輸入: {', '.join(spec.vr_keys)}")
+    print(f"🚫 屏蔽按鍵: {', '.join(spec.blocked_keys)}")
+    print(f"🔌 UDP: {spec.udp_config['host']}:{spec.udp_config['port']}")
+    for flow in spec.flows:
+        options = "、".join(f"{name}({prev_key}/{next_key})" for name, prev_key, next_key in flow.options)
+        print(f"   {flow.name} {flow.title}: {'、'.join(flow.keys)}" + (f"  選項: {options}" if options else ""))
+
+
+if __name__ == "__main__":
+    main()
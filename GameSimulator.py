@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GameSimulator - 模擬遊戲端的 UDP 伺服器
+使用與遊戲相同的協定 ("role:agent" → "ok:agent"，推送 GameFlowData，接收 InputCommand)，
+依 EGameFlowState 流程圖切換狀態，可用可調的 frame rate 對單一 agent 或整個 AgentFleet 做壓力測試
+"""
+
+import os
+import sys
+import math
+import time
+import socket
+import argparse
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState  # noqa: E402
+from ProtoSchema.InputCommand_pb2 import InputCommand, ComplexInputCommand, EInputKeyType, EInputVrType  # noqa: E402
+from ProtoSchema import BACKEND as PROTOBUF_BACKEND  # noqa: E402
+
+S = EGameFlowState
+K = EInputKeyType
+
+# 自動前進的流程：狀態 → (下一個狀態, 停留秒數)
+AUTO_TRANSITIONS = {
+    S.GAME_FLOW_COPYRIGHT: (S.GAME_FLOW_WARNING, 1.0),
+    S.GAME_FLOW_WARNING: (S.GAME_FLOW_LOGO, 1.0),
+    S.GAME_FLOW_LOGO: (S.GAME_FLOW_AGENT_LOGO, 1.0),
+    S.GAME_FLOW_AGENT_LOGO: (S.GAME_FLOW_UE_LOGO, 1.0),
+    S.GAME_FLOW_UE_LOGO: (S.GAME_FLOW_CRIWARE_LOGO, 1.0),
+    S.GAME_FLOW_CRIWARE_LOGO: (S.GAME_FLOW_PV, 1.0),
+    S.GAME_FLOW_PV: (S.GAME_FLOW_COIN_PAGE, 2.0),
+    S.GAME_FLOW_M23_READ: (S.GAME_FLOW_SELECT_MODE, 1.0),
+    S.GAME_FLOW_LOAD_GAME: (S.GAME_FLOW_RIDE_SHOW, 1.0),
+    S.GAME_FLOW_RIDE_SHOW: (S.GAME_FLOW_RACE, 2.0),
+    S.GAME_FLOW_RACE: (S.GAME_FLOW_RACE_FINISH_SHOW, 30.0),
+    S.GAME_FLOW_RACE_FINISH_SHOW: (S.GAME_FLOW_LOAD_RACE_RESULT, 1.0),
+    S.GAME_FLOW_LOAD_RACE_RESULT: (S.GAME_FLOW_RACE_END, 1.0),
+    S.GAME_FLOW_RACE_END: (S.GAME_FLOW_RANKING, 2.0),
+    S.GAME_FLOW_RANKING: (S.GAME_FLOW_GAME_OVER, 2.0),
+    S.GAME_FLOW_GAME_OVER: (S.GAME_FLOW_COIN_PAGE, 1.0),
+}
+
+# 按鍵觸發的流程：(狀態, 按鍵) → 下一個狀態
+KEY_TRANSITIONS = {
+    (S.GAME_FLOW_SELECT_MODE, K.INPUT_KEY_START): S.GAME_FLOW_PHOTO_AUTH,
+    (S.GAME_FLOW_PHOTO_AUTH, K.INPUT_KEY_START): S.GAME_FLOW_SELECT_SCENE,
+    (S.GAME_FLOW_SELECT_SCENE, K.INPUT_KEY_START): S.GAME_FLOW_SELECT_BIKE,
+    (S.GAME_FLOW_SELECT_BIKE, K.INPUT_KEY_START): S.GAME_FLOW_LOAD_GAME,
+}
+
+# 選項切換：狀態 → [(欄位, 選項數, 上一個按鍵, 下一個按鍵), ...]
+OPTION_KEYS = {
+    S.GAME_FLOW_SELECT_MODE: [("selected_mode", 2, K.INPUT_KEY_LEFT, K.INPUT_KEY_RIGHT)],
+    S.GAME_FLOW_PHOTO_AUTH: [("selected_photo", 12, K.INPUT_KEY_LEFT, K.INPUT_KEY_RIGHT)],
+    S.GAME_FLOW_SELECT_SCENE: [("selected_track", 11, K.INPUT_KEY_LEFT, K.INPUT_KEY_RIGHT),
+                               ("route_direction", 2, K.INPUT_KEY_UP, K.INPUT_KEY_DOWN)],
+    S.GAME_FLOW_SELECT_BIKE: [("selected_vehicle", 8, K.INPUT_KEY_LEFT, K.INPUT_KEY_RIGHT)],
+}
+
+# 比賽賽道：中心線 y = 振幅 * sin(2π x / 波長)，偏離超過半寬時減速
+RACE_SPEED = 10.0
+TURN_RATE = 1.5
+TRACK_AMPLITUDE = 10.0
+TRACK_WAVELENGTH = 80.0
+TRACK_HALF_WIDTH = 4.0
+OFF_TRACK_SPEED = 0.3
+LOOKAHEAD = 10.0
+
+
+def track_center(x):
+    return TRACK_AMPLITUDE * math.sin(2.0 * math.pi * x / TRACK_WAVELENGTH)
+
+
+class GameSimulator:
+    """單一遊戲實例的狀態機"""
+
+    def __init__(self, race_duration=30.0, input_format="simple", race_length=200.0):
+        self.input_format = input_format
+        self.race_length = race_length
+        self.throttle = 1.0
+        self.steer = 0.0
+        self.race_position = (0.0, 0.0)
+        self.race_heading = 0.0
+        self.races_finished = 0
+        self.last_tick = time.monotonic()
+        self.game_data = GameFlowData()
+        self.game_data.current_flow_state = S.GAME_FLOW_COPYRIGHT
+        self.state_since = time.monotonic()
+        self.auto_transitions = dict(AUTO_TRANSITIONS)
+        self.auto_transitions[S.GAME_FLOW_RACE] = (S.GAME_FLOW_RACE_FINISH_SHOW, race_duration)
+        self.transitions = 0
+
+    @property
+    def state(self):
+        return self.game_data.current_flow_state
+
+    def set_state(self, state):
+        if state != self.game_data.current_flow_state:
+            self.game_data.current_flow_state = state
+            self.state_since = time.monotonic()
+            self.transitions += 1
+            self.game_data.ClearField("race_data")
+            self.race_position = (0.0, 0.0)
+            self.race_heading = 0.0
+            self.steer = 0.0
+
+    def tick(self):
+        """依停留時間推進自動流程，並更新比賽中的位置"""
+        now = time.monotonic()
+        delta = now - self.last_tick
+        self.last_tick = now
+        auto = self.auto_transitions.get(self.state)
+        if auto and now - self.state_since >= auto[1]:
+            self.set_state(auto[0])
+        if self.state == S.GAME_FLOW_RACE:
+            self._drive(delta)
+
+    def _drive(self, delta):
+        """依油門與轉向推進車輛，抵達終點即完賽；沒有轉向時會偏離賽道，只能等比賽時間結束"""
+        x, y = self.race_position
+        speed = RACE_SPEED * self.throttle
+        if abs(y - track_center(x)) > TRACK_HALF_WIDTH:
+            speed *= OFF_TRACK_SPEED
+        self.race_heading -= self.steer * TURN_RATE * delta
+        x += math.cos(self.race_heading) * speed * delta
+        y += math.sin(self.race_heading) * speed * delta
+        self.race_position = (x, y)
+
+        race_data = self.game_data.race_data
+        race_data.current_pos_x = x
+        race_data.current_pos_y = y
+        race_data.target_position_x = x + LOOKAHEAD
+        race_data.target_position_y = track_center(x + LOOKAHEAD)
+        race_data.normal_z = 1.0
+
+        if x >= self.race_length:
+            self.races_finished += 1
+            self.set_state(S.GAME_FLOW_RACE_FINISH_SHOW)
+
+    def press(self, key):
+        state = self.state
+        if state == S.GAME_FLOW_COIN_PAGE:
+            if key == K.INPUT_KEY_COIN:
+                self.game_data.player_coins += 1
+            elif key in (K.INPUT_KEY_START, K.INPUT_KEY_NITRO) and self.game_data.player_coins > 0:
+                self.game_data.player_coins -= 1
+                self.set_state(S.GAME_FLOW_M23_READ)
+            return
+
+        for field, count, prev_key, next_key in OPTION_KEYS.get(state, []):
+            if key in (prev_key, next_key):
+                step = 1 if key == next_key else -1
+                setattr(self.game_data, field, (getattr(self.game_data, field) + step) % count)
+
+        next_state = KEY_TRANSITIONS.get((state, key))
+        if next_state is not None:
+            self.set_state(next_state)
+
+    def apply_input(self, data):
+        """套用 agent 送來的 InputCommand (或 ComplexInputCommand)，只處理按下"""
+        if self.input_format == "complex":
+            complex_command = ComplexInputCommand()
+            complex_command.ParseFromString(data)
+            digital_inputs = complex_command.digital_inputs
+            for analog in complex_command.analog_inputs:
+                if analog.vr_type == EInputVrType.INPUT_VR_THROTTLE:
+                    self.throttle = max(0.0, min(analog.value, 1.0))
+                elif analog.vr_type == EInputVrType.INPUT_VR_STEER:
+                    self.steer = max(-1.0, min(analog.value, 1.0))
+        else:
+            input_command = InputCommand()
+            input_command.ParseFromString(data)
+            digital_inputs = [input_command]
+
+        for command in digital_inputs:
+            if command.is_key_down:
+                for key in command.key_inputs:
+                    self.press(key)
+
+    def frame(self):
+        return self.game_data.SerializeToString()
+
+
+class SimulatorServer:
+    """UDP 伺服器，每個註冊的 agent 各自擁有一個 GameSimulator"""
+
+    def __init__(self, host="127.0.0.1", port=8587, race_duration=30.0, input_format="simple",
+                 race_length=200.0):
+        self.host = host
+        self.port = port
+        self.race_duration = race_duration
+        self.input_format = input_format
+        self.race_length = race_length
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind((host, port))
+        self.clients = {}
+        self.frames_sent = 0
+        self.commands_received = 0
+        self.bad_packets = 0
+
+    def _receive(self, timeout):
+        self.sock.settimeout(max(timeout, 0.0))
+        try:
+            data, addr = self.sock.recvfrom(4096)
+        except (socket.timeout, BlockingIOError):
+            return False
+        except ConnectionResetError:
+            # Windows 上 agent 離線時會收到 ICMP 錯誤
+            return True
+
+        if data == b"role:agent":
+            self.sock.sendto(b"ok:agent", addr)
+            if addr not in self.clients:
+                self.clients[addr] = GameSimulator(self.race_duration, self.input_format, self.race_length)
+                print(f"✅ agent 註冊: {addr[0]}:{addr[1]}")
+            return True
+
+        simulator = self.clients.get(addr)
+        if simulator is None:
+            return True
+        try:
+            simulator.apply_input(data)
+            self.commands_received += 1
+        except Exception:
+            self.bad_packets += 1
+        return True
+
+    def run(self, rate, duration=None):
+        """以 rate Hz 推送 frame，回傳本次送出 frame 數與收到指令數"""
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        next_frame = start
+        frames_start, commands_start = self.frames_sent, self.commands_received
+
+        while duration is None or time.perf_counter() - start < duration:
+            now = time.perf_counter()
+            if now < next_frame:
+                # 下一個 frame 之前先處理收到的指令
+                self._receive(next_frame - now)
+                continue
+
+            for addr, simulator in list(self.clients.items()):
+                simulator.tick()
+                try:
+                    self.sock.sendto(simulator.frame(), addr)
+                    self.frames_sent += 1
+                except OSError:
+                    pass
+            next_frame += interval
+            # 落後太多時不追趕，避免瞬間暴衝
+            if next_frame < now - interval * 10:
+                next_frame = now
+
+            # 清空已到的指令但不等待
+            while self._receive(0):
+                pass
+
+        return self.frames_sent - frames_start, self.commands_received - commands_start
+
+    def wait_for_agents(self, count, timeout=None):
+        start = time.monotonic()
+        while len(self.clients) < count:
+            if timeout is not None and time.monotonic() - start > timeout:
+                break
+            self._receive(0.5)
+        return len(self.clients)
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GameSimulator - 模擬遊戲端 UDP 伺服器')
+    parser.add_argument('--host', default='127.0.0.1', help='綁定 IP')
+    parser.add_argument('--port', type=int, default=8587, help='綁定埠號')
+    parser.add_argument('--rate', type=float, action='append', help='每秒推送 frame 數 (可重複，用於逐步加壓)')
+    parser.add_argument('--duration', type=float, help='每個 rate 的測試秒數 (未指定時持續執行)')
+    parser.add_argument('--agents', type=int, default=1, help='開始推送前等待的 agent 數量')
+    parser.add_argument('--race-duration', type=float, default=30.0, help='比賽時間上限 (秒)')
+    parser.add_argument('--race-length', type=float, default=200.0, help='賽道長度 (抵達終點即完賽)')
+    parser.add_argument('--input-format', choices=['simple', 'complex'], default='simple',
+                        help='agent 送來的輸入格式 (需與 agent 的 --input-format 相同)')
+    args = parser.parse_args()
+
+    rates = args.rate or [60.0]
+    server = SimulatorServer(args.host, args.port, args.race_duration, args.input_format,
+                             args.race_length)
+    print(f"🎮 GameSimulator 啟動: udp://{args.host}:{args.port}，等待 {args.agents} 個 agent... "
+          f"(Protobuf 後端: {PROTOBUF_BACKEND})")
+
+    try:
+        server.wait_for_agents(args.agents)
+        for rate in rates:
+            frames, commands = server.run(rate, args.duration)
+            ratio = commands / frames if frames else 0.0
+            status = "✅" if ratio >= 0.99 else "⚠️"
+            print(f"{status} rate={rate:g}Hz  送出 frame={frames}  收到指令={commands}  回應率={ratio:.1%}")
+            states = ", ".join(EGameFlowState.Name(sim.state) for sim in server.clients.values())
+            print(f"   目前狀態: {states}")
+            finished = sum(sim.races_finished for sim in server.clients.values())
+            print(f"   完賽次數: {finished}")
+    except KeyboardInterrupt:
+        print("\n收到中斷信號，正在優雅退出...")
+    finally:
+        server.close()
+        print("程式已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+InputScheduler - 與 frame 解耦的按鍵排程
+以時間輪排程按下與對應的放開，限制每個按鍵的最大重複頻率與整體每秒指令數
+"""
+
+import time
+
+
+class TimerWheel:
+    """雜湊時間輪：每格 tick 秒 (精度為一個 tick)，超過一圈的事件記錄剩餘圈數，排入與取出皆為常數時間"""
+
+    def __init__(self, tick=0.005, slots=512, start=0.0):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current_tick = int(start / tick)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, at, item):
+        target = max(int(at / self.tick), self.current_tick)
+        rounds = (target - self.current_tick) // len(self.slots)
+        self.slots[target % len(self.slots)].append([rounds, item])
+        self.count += 1
+
+    def advance(self, now):
+        """推進到 now，依到期順序回傳到期的項目"""
+        now_tick = int(now / self.tick)
+        if self.count == 0:
+            # 沒有排程的項目：閒置後直接跳到 now，不必逐格走過錯過的 tick
+            self.current_tick = max(self.current_tick, now_tick + 1)
+            return []
+
+        if now_tick - self.current_tick >= len(self.slots):
+            due = self._catch_up(now_tick)
+        else:
+            due = []
+            while self.current_tick <= now_tick:
+                slot = self.slots[self.current_tick % len(self.slots)]
+                if slot:
+                    waiting = []
+                    for entry in slot:
+                        if entry[0] == 0:
+                            due.append(entry[1])
+                        else:
+                            entry[0] -= 1
+                            waiting.append(entry)
+                    slot[:] = waiting
+                self.current_tick += 1
+        self.count -= len(due)
+        return due
+
+    def _catch_up(self, now_tick):
+        """落後超過一圈時每格只走一次，依這一格經過的次數一次扣除剩餘圈數"""
+        size = len(self.slots)
+        expired = []
+        for offset in range(size):
+            first = self.current_tick + offset
+            slot = self.slots[first % size]
+            if not slot:
+                continue
+            visits = (now_tick - first) // size + 1
+            waiting = []
+            for entry in slot:
+                if entry[0] < visits:
+                    # 到期的 tick 與同一格內的順序決定回傳順序
+                    expired.append((first + entry[0] * size, len(expired), entry[1]))
+                else:
+                    entry[0] -= visits
+                    waiting.append(entry)
+            slot[:] = waiting
+        self.current_tick = now_tick + 1
+        expired.sort(key=lambda item: item[:2])
+        return [item for _, _, item in expired]
+
+
+class InputScheduler:
+    """按鍵按下/放開排程器
+
+    hold       按下後多久放開 (秒)
+    key_rate   同一個按鍵每秒最多按下次數
+    max_rate   整體每秒最多送出的指令數 (token bucket)
+    """
+
+    def __init__(self, hold=0.1, key_rate=5.0, max_rate=30.0, tick=0.005, slots=512, clock=time.monotonic):
+        self.hold = hold
+        self.key_interval = 1.0 / key_rate if key_rate > 0 else 0.0
+        self.max_rate = max_rate
+        self.tick = tick
+        self.clock = clock
+
+        now = clock()
+        self.wheel = TimerWheel(tick, slots, now)
+        self.burst = max(1.0, max_rate * 0.05)
+        self.tokens = self.burst
+        self._refilled = now
+
+        self.held = set()
+        self.last_press = {}
+        self.sent = 0
+        self.rejected = 0
+
+    def press(self, key, now, hold=None):
+        """排入按下與 hold 秒後的放開；按鍵仍按著或超過重複頻率時回傳 False"""
+        if key in self.held or now - self.last_press.get(key, float("-inf")) < self.key_interval:
+            self.rejected += 1
+            return False
+        self.held.add(key)
+        self.last_press[key] = now
+        self.wheel.schedule(now, (key, True))
+        self.wheel.schedule(now + (self.hold if hold is None else hold), (key, False))
+        return True
+
+    def due(self, now):
+        """回傳到期的 (放開按鍵列表, 按下按鍵列表)"""
+        releases, presses = [], []
+        for key, is_key_down in self.wheel.advance(now):
+            if is_key_down:
+                presses.append(key)
+            else:
+                releases.append(key)
+                self.held.discard(key)
+        return releases, presses
+
+    def release_all(self):
+        """停止時立即放開所有按著的按鍵，回傳按鍵列表"""
+        keys = list(self.held)
+        self.held.clear()
+        self.wheel = TimerWheel(self.tick, len(self.wheel.slots), self.clock())
+        return keys
+
+    def ready(self, now):
+        """補充 token，回傳是否還能送出指令"""
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled) * self.max_rate)
+        self._refilled = now
+        return self.tokens >= 1.0
+
+    def take(self, count=1):
+        self.tokens -= count
+        self.sent += count
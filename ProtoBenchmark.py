@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ProtoBenchmark - protobuf 後端解析/序列化效能測試
+在各個後端 (python / upb / cpp) 下重複解析 GameFlowData、序列化 InputCommand，比較每個 frame 的耗時
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import warnings
+
+BACKENDS = ["python", "upb", "cpp"]
+
+
+def load_payloads(capture_file=None, limit=10000):
+    """載入 GameFlowData/InputCommand 封包，沒有錄製檔時產生與實際日誌相近的樣本"""
+    from ProtoSchema.GameFlowData_pb2 import GameFlowData
+    from ProtoSchema.InputCommand_pb2 import InputCommand
+
+    frames, commands = [], []
+    if capture_file:
+        from FrameRecorder import FrameReader, RECORD_RECEIVED, RECORD_SENT
+        for record_type, _, payload in FrameReader(capture_file).records():
+            if record_type == RECORD_RECEIVED and len(frames) < limit:
+                frames.append(payload)
+            elif record_type == RECORD_SENT and len(commands) < limit:
+                commands.append(payload)
+
+    if not frames:
+        for i in range(1000):
+            game_data = GameFlowData()
+            game_data.current_flow_state = (31, 16, 4, 14, 13, 6, 5, 7)[i % 8]
+            game_data.selected_track = 2
+            game_data.selected_vehicle = 2
+            game_data.player_coins = i % 3
+            game_data.race_data.current_pos_x = i * 0.5
+            game_data.race_data.target_position_x = i * 0.5 + 10.0
+            game_data.timestamp = 1757254000000 + i
+            frames.append(game_data.SerializeToString())
+
+    if not commands:
+        for i in range(1000):
+            input_command = InputCommand()
+            input_command.key_inputs.append(i % 9)
+            input_command.is_key_down = True
+            input_command.timestamp = 1757254000000 + i
+            commands.append(input_command.SerializeToString())
+
+    return frames, commands
+
+
+def run_worker(backend, capture_file, iterations):
+    """在目前行程內量測，後端需在導入 protobuf 之前設定"""
+    os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = backend
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        from google.protobuf.internal import api_implementation
+        actual = api_implementation.Type()
+    if actual != backend or any("not available" in str(w.message) for w in caught):
+        return {"backend": backend, "available": False}
+
+    import ProtoSchema  # noqa: F401
+    from ProtoSchema.GameFlowData_pb2 import GameFlowData
+    from ProtoSchema.InputCommand_pb2 import InputCommand
+
+    frames, commands = load_payloads(capture_file)
+
+    game_data = GameFlowData()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for data in frames:
+            game_data.ParseFromString(data)
+    parse_time = time.perf_counter() - start
+
+    parsed_commands = []
+    for data in commands:
+        input_command = InputCommand()
+        input_command.ParseFromString(data)
+        parsed_commands.append(input_command)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for input_command in parsed_commands:
+            input_command.SerializeToString()
+    serialize_time = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "available": True,
+        "parse_us": parse_time / (iterations * len(frames)) * 1e6,
+        "serialize_us": serialize_time / (iterations * len(parsed_commands)) * 1e6,
+        "frames": len(frames),
+        "commands": len(parsed_commands),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ProtoBenchmark - protobuf 後端效能測試')
+    parser.add_argument('--capture', help='FrameRecorder 錄製檔 (未指定時使用產生的樣本)')
+    parser.add_argument('--iterations', type=int, default=20, help='每個後端重複次數')
+    parser.add_argument('--backend', choices=BACKENDS, action='append', help='只測試指定後端 (可重複)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, script_dir)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.backend[0], args.capture, args.iterations)))
+        return
+
+    # 每個後端在獨立行程中執行，避免 protobuf 後端在同一行程內互相影響
+    results = []
+    for backend in args.backend or BACKENDS:
+        command = [sys.executable, os.path.abspath(__file__), '--worker',
+                   '--backend', backend, '--iterations', str(args.iterations)]
+        if args.capture:
+            command += ['--capture', os.path.abspath(args.capture)]
+        result = subprocess.run(command, capture_output=True, text=True, cwd=script_dir, encoding='utf-8')
+        lines = result.stdout.strip().splitlines()
+        if result.returncode != 0 or not lines:
+            print(f"❌ {backend} 測試失敗: {result.stderr.strip()}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    baseline = next((r for r in results if r["backend"] == "python" and r["available"]), None)
+    print(f"{'後端':<8} {'解析 (µs/frame)':>16} {'序列化 (µs/cmd)':>16} {'加速':>8}")
+    for r in results:
+        if not r["available"]:
+            print(f"{r['backend']:<8} {'無法使用':>16}")
+            continue
+        speedup = f"{baseline['parse_us'] / r['parse_us']:.1f}x" if baseline else "-"
+        print(f"{r['backend']:<8} {r['parse_us']:>16.2f} {r['serialize_us']:>16.2f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ProtoBuilder - 由 GameSetting.md 產生 .proto 與 _pb2.py
+依 GameSettingParser 解析的 C++ 枚舉填入 Templates/*.proto.template，再於行程內以 grpc_tools.protoc 編譯
+(grpcio-tools 為建議安裝的相依套件)；未安裝時才退回內建編譯：以 protobuf 的 descriptor_pb2 建立 FileDescriptorProto
+並輸出與 protoc 相同格式的 _pb2.py (只支援本專案用到的 proto3 子集，由測試確認與提交的 _pb2.py 逐位元組一致)；
+結果依輸入雜湊快取，不需要 protoc.exe、WSL 或 Q CLI
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import string
+import difflib
+import hashlib
+import argparse
+import tempfile
+import importlib.util
+
+from google.protobuf import descriptor_pb2, descriptor_pool
+
+from GameSettingParser import game_spec_from_content, to_enum_suffix
+
+# 產生邏輯變更時遞增，讓舊快取失效
+GENERATOR_VERSION = 2
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SETTING_PATH = os.path.join(SCRIPT_DIR, "GameSetting", "AutoTest_Game_Setting.md")
+DEFAULT_TEMPLATE_DIR = os.path.join(SCRIPT_DIR, "Templates")
+DEFAULT_OUTPUT_DIR = os.path.join(SCRIPT_DIR, "ProtoSchema")
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIR, ".proto_cache")
+MAX_CACHE_FILES = 16
+PROTO_FILES = ["GameFlowData.proto", "InputCommand.proto"]
+
+# 既有名稱與新名稱相近時沿用既有名稱 (例: GameSetting.md 的 SeatDetact 沿用 SEAT_DETECT)
+PIN_CUTOFF = 0.8
+
+FieldType = descriptor_pb2.FieldDescriptorProto
+SCALAR_TYPES = {
+    'double': FieldType.TYPE_DOUBLE, 'float': FieldType.TYPE_FLOAT,
+    'int64': FieldType.TYPE_INT64, 'uint64': FieldType.TYPE_UINT64,
+    'int32': FieldType.TYPE_INT32, 'uint32': FieldType.TYPE_UINT32,
+    'sint32': FieldType.TYPE_SINT32, 'sint64': FieldType.TYPE_SINT64,
+    'fixed32': FieldType.TYPE_FIXED32, 'fixed64': FieldType.TYPE_FIXED64,
+    'sfixed32': FieldType.TYPE_SFIXED32, 'sfixed64': FieldType.TYPE_SFIXED64,
+    'bool': FieldType.TYPE_BOOL, 'string': FieldType.TYPE_STRING, 'bytes': FieldType.TYPE_BYTES,
+}
+TOKEN = re.compile(r'(?P<skip>\s+|//[^\n]*|/\*.*?\*/)|(?P<token>[A-Za-z_][\w.]*|-?\d+|"[^"]*"|[{}=;<>,])|(?P<error>.)',
+                   re.S)
+# 內建解析器只支援本專案用到的 proto3 子集，其餘語法直接報錯，避免輸出缺少內容的 descriptor
+UNSUPPORTED_SYNTAX = {'import', 'option', 'service', 'extend', 'message', 'enum', 'oneof', 'reserved',
+                      'extensions', 'optional', 'required', 'group', 'stream', 'rpc'}
+ENUM_VALUE_COMMENT = re.compile(r'^\s*([A-Z][A-Z0-9_]*)\s*=\s*-?\d+\s*;\s*//\s*(.*?)\s*$', re.M)
+
+
+class ProtoSyntaxError(ValueError):
+    pass
+
+
+def enum_prefix(enum_name):
+    """枚舉值前綴，例: EGameFlowState → GAME_FLOW、EInputKeyType → INPUT_KEY、ETrack → TRACK"""
+    name = to_enum_suffix(enum_name[1:] if re.match(r'E[A-Z]', enum_name) else enum_name)
+    return re.sub(r'_(TYPE|STATE)$', '', name)
+
+
+# ---------------------------------------------------------------- .proto 產生
+
+def pin_names(names, existing_names):
+    """新名稱不在既有 .proto 中、且與一個已消失的既有名稱相近時沿用既有名稱 (例: SeatDetact 沿用 SEAT_DETECT)；
+    只配對雙方各自獨有的名稱，每個既有名稱最多沿用一次，插入或重新排序枚舉值不會讓名稱錯位"""
+    new_names = set(names)
+    added = [name for name in names if name not in existing_names]
+    removed = [name for name in existing_names if name not in new_names]
+    pairs = sorted(((difflib.SequenceMatcher(None, old_name, name).ratio(), name, old_name)
+                    for name in added for old_name in removed), reverse=True)
+    renames, claimed = {}, set()
+    for ratio, name, old_name in pairs:
+        if ratio < PIN_CUTOFF:
+            break
+        if name not in renames and old_name not in claimed:
+            renames[name] = old_name
+            claimed.add(old_name)
+    return [renames.get(name, name) for name in names]
+
+
+def render_enum(enum, existing_names=(), comments=None):
+    """產生 enum 區塊；existing_names 為既有 .proto 的枚舉值名稱，comments 為既有的 {名稱: 註解}
+    (既有註解優先保留，沒有時才使用 GameSetting.md 的註解)"""
+    prefix = enum_prefix(enum.name)
+    names = pin_names([f"{prefix}_{to_enum_suffix(item.name)}" for item in enum.items], existing_names)
+    rows = []
+    for item, value_name in zip(enum.items, names):
+        comment = (comments or {}).get(value_name) or "、".join(item.aliases[1:])
+        rows.append((f"    {value_name} = {item.number};", comment))
+    width = max(len(code) for code, _ in rows) + 2
+    lines = [f"enum {enum.name} {{"]
+    lines += [f"{code:<{width}}// {comment}" if comment else code for code, comment in rows]
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def existing_enums(path):
+    """既有 .proto 的 ({枚舉: [枚舉值名稱]}, {枚舉值名稱: 行尾註解})，檔案不存在或無法解析時回傳空 dict"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        file_proto = parse_proto(text, os.path.basename(path))
+    except (OSError, ProtoSyntaxError):
+        return {}, {}
+    names = {enum.name: [value.name for value in enum.value] for enum in file_proto.enum_type}
+    comments = dict(ENUM_VALUE_COMMENT.findall(text))
+    return names, comments
+
+
+def render_proto(template_text, spec, pinned=None, comments=None):
+    """將模板中的 ${枚舉名稱} 換成 GameSetting.md 的枚舉定義"""
+    template = string.Template(template_text)
+    names = [match.group('braced') or match.group('named') for match in template.pattern.finditer(template_text)
+             if match.group('braced') or match.group('named')]
+    missing = [name for name in names if name not in spec.enums]
+    if missing:
+        raise ProtoSyntaxError(f"GameSetting.md 缺少枚舉: {', '.join(missing)}")
+    return template.substitute({name: render_enum(spec.enums[name], (pinned or {}).get(name, ()), comments)
+                                for name in names})
+
+
+# ---------------------------------------------------------------- .proto 解析
+
+class _Tokens:
+    def __init__(self, text):
+        self.items = []
+        for match in TOKEN.finditer(text):
+            if match.lastgroup == 'error':
+                line = text.count('\n', 0, match.start()) + 1
+                if match.group() == '[':
+                    self.unsupported("欄位選項 [...]", f"第 {line} 行")
+                raise ProtoSyntaxError(f"第 {line} 行無法辨識的字元: {match.group()!r}")
+            if match.lastgroup == 'token':
+                self.items.append(match.group())
+        self.position = 0
+
+    def peek(self):
+        return self.items[self.position] if self.position < len(self.items) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise ProtoSyntaxError("檔案提早結束")
+        self.position += 1
+        return token
+
+    def unsupported(self, word, where):
+        raise ProtoSyntaxError(f"{where}不支援的語法: {word} (請安裝 grpcio-tools 並使用 --compiler grpc_tools)")
+
+    def expect(self, expected):
+        token = self.next()
+        if token != expected:
+            raise ProtoSyntaxError(f"預期 {expected!r}，實際為 {token!r}")
+
+    def number(self):
+        token = self.next()
+        if not re.fullmatch(r'-?\d+', token):
+            raise ProtoSyntaxError(f"預期數字，實際為 {token!r}")
+        return int(token)
+
+    def string(self):
+        token = self.next()
+        if not token.startswith('"'):
+            raise ProtoSyntaxError(f"預期字串，實際為 {token!r}")
+        return token[1:-1]
+
+
+def _camel_case(name):
+    return ''.join(part[:1].upper() + part[1:] for part in name.split('_'))
+
+
+def _parse_enum(tokens, enum):
+    enum.name = tokens.next()
+    tokens.expect('{')
+    while tokens.peek() != '}':
+        word = tokens.next()
+        if word in UNSUPPORTED_SYNTAX:
+            tokens.unsupported(word, f"enum {enum.name} ")
+        value = enum.value.add()
+        value.name = word
+        tokens.expect('=')
+        value.number = tokens.number()
+        tokens.expect(';')
+    tokens.expect('}')
+
+
+def _parse_message(tokens, message):
+    message.name = tokens.next()
+    tokens.expect('{')
+    while tokens.peek() != '}':
+        word = tokens.next()
+        if word in UNSUPPORTED_SYNTAX:
+            tokens.unsupported(word, f"message {message.name} ")
+        field = message.field.add()
+        if word == 'map':
+            # map<K, V> 展開成 protoc 產生的 XxxEntry 巢狀訊息
+            tokens.expect('<')
+            key_type = tokens.next()
+            if key_type not in SCALAR_TYPES or key_type in ('double', 'float', 'bytes'):
+                raise ProtoSyntaxError(f"message {message.name} 的 map 鍵型別不合法: {key_type}")
+            tokens.expect(',')
+            value_type = tokens.next()
+            tokens.expect('>')
+            field.name = tokens.next()
+            entry = message.nested_type.add()
+            entry.name = _camel_case(field.name) + "Entry"
+            entry.options.map_entry = True
+            for number, (name, type_name) in enumerate((("key", key_type), ("value", value_type)), 1):
+                entry_field = entry.field.add()
+                entry_field.name = name
+                entry_field.number = number
+                entry_field.label = FieldType.LABEL_OPTIONAL
+                entry_field.type_name = type_name
+            field.label = FieldType.LABEL_REPEATED
+            field.type_name = entry.name
+        else:
+            if word == 'repeated':
+                field.label = FieldType.LABEL_REPEATED
+                word = tokens.next()
+            else:
+                field.label = FieldType.LABEL_OPTIONAL
+            field.type_name = word
+            field.name = tokens.next()
+        tokens.expect('=')
+        field.number = tokens.number()
+        tokens.expect(';')
+    tokens.expect('}')
+
+
+def _resolve_types(file_proto):
+    """把欄位的型別名稱換成純量型別或完整名稱 (.package.Message)，依 protobuf 的範圍規則由內而外尋找"""
+    package = f".{file_proto.package}" if file_proto.package else ""
+    kinds = {}
+
+    def collect(messages, scope):
+        for message in messages:
+            full_name = f"{scope}.{message.name}"
+            kinds[full_name] = FieldType.TYPE_MESSAGE
+            collect(message.nested_type, full_name)
+
+    collect(file_proto.message_type, package)
+    for enum in file_proto.enum_type:
+        kinds[f"{package}.{enum.name}"] = FieldType.TYPE_ENUM
+
+    def resolve(messages, scope):
+        for message in messages:
+            full_name = f"{scope}.{message.name}"
+            for field in message.field:
+                name = field.type_name
+                if name in SCALAR_TYPES:
+                    field.type = SCALAR_TYPES[name]
+                    field.ClearField('type_name')
+                    continue
+                if name.startswith('.'):
+                    candidates = [name]
+                else:
+                    candidates = []
+                    search_scope = full_name
+                    while True:
+                        candidates.append(f"{search_scope}.{name}")
+                        if not search_scope:
+                            break
+                        search_scope = search_scope.rsplit('.', 1)[0]
+                resolved = next((candidate for candidate in candidates if candidate in kinds), None)
+                if resolved is None:
+                    raise ProtoSyntaxError(f"{message.name}.{field.name} 的型別未定義: {name}")
+                field.type = kinds[resolved]
+                field.type_name = resolved
+            resolve(message.nested_type, full_name)
+
+    resolve(file_proto.message_type, package)
+
+
+def parse_proto(text, name):
+    """解析本專案使用的 proto3 子集 (頂層的 enum、message，欄位支援 repeated 與 map)，回傳 FileDescriptorProto；
+    巢狀定義、oneof、option、import 等其他語法一律拋出 ProtoSyntaxError"""
+    file_proto = descriptor_pb2.FileDescriptorProto()
+    file_proto.name = name
+    tokens = _Tokens(text)
+    while tokens.peek() is not None:
+        word = tokens.next()
+        if word == 'syntax':
+            tokens.expect('=')
+            file_proto.syntax = tokens.string()
+            if file_proto.syntax != 'proto3':
+                raise ProtoSyntaxError(f"只支援 proto3，實際為 {file_proto.syntax}")
+            tokens.expect(';')
+        elif word == 'package':
+            file_proto.package = tokens.next()
+            tokens.expect(';')
+        elif word == 'enum':
+            _parse_enum(tokens, file_proto.enum_type.add())
+        elif word == 'message':
+            _parse_message(tokens, file_proto.message_type.add())
+        elif word in UNSUPPORTED_SYNTAX:
+            tokens.unsupported(word, "")
+        else:
+            raise ProtoSyntaxError(f"不支援的宣告: {word}")
+    _resolve_types(file_proto)
+    return file_proto
+
+
+# ---------------------------------------------------------------- _pb2.py 輸出
+
+def _hex_escape(data):
+    """與 protoc 的 CHexEscape 相同：\\x 跳脫之後緊接的十六進位字元也要跳脫"""
+    special = {0x0A: '\\n', 0x0D: '\\r', 0x09: '\\t', 0x22: '\\"', 0x27: "\\'", 0x5C: '\\\\'}
+    out = []
+    last_hex = False
+    for byte in data:
+        if byte in special:
+            out.append(special[byte])
+            last_hex = False
+        elif byte < 0x20 or byte >= 0x7F or (last_hex and chr(byte) in string.hexdigits):
+            out.append(f"\\x{byte:02x}")
+            last_hex = True
+        else:
+            out.append(chr(byte))
+            last_hex = False
+    return ''.join(out)
+
+
+def _octal_escape(data):
+    special = {0x0A: '\\n', 0x0D: '\\r', 0x09: '\\t', 0x22: '\\"', 0x27: "\\'", 0x5C: '\\\\'}
+    return ''.join(special.get(byte) or (chr(byte) if 0x20 <= byte < 0x7F else f"\\{byte:03o}") for byte in data)
+
+
+def _read_varint(data, position):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _submessages(data, start, end, field_numbers):
+    """逐一走訪 start~end 間的欄位，回傳指定欄位的 (欄位編號, 內容起點, 內容終點)"""
+    found = []
+    position = start
+    while position < end:
+        key, position = _read_varint(data, position)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            _, position = _read_varint(data, position)
+        elif wire_type == 2:
+            length, position = _read_varint(data, position)
+            if number in field_numbers:
+                found.append((number, position, position + length))
+            position += length
+        elif wire_type == 1:
+            position += 8
+        elif wire_type == 5:
+            position += 4
+        else:
+            raise ValueError(f"不支援的 wire type: {wire_type}")
+    return found
+
+
+def render_pb2(file_proto):
+    """輸出與 protoc --python_out 相同格式的 _pb2.py"""
+    data = file_proto.SerializeToString()
+    module_name = os.path.splitext(file_proto.name)[0] + "_pb2"
+
+    options = []
+    enum_offsets = []
+    message_offsets = []
+    file_fields = _submessages(data, 0, len(data), {4, 5})
+    messages = iter(file_proto.message_type)
+    enums = iter(file_proto.enum_type)
+
+    def visit_message(message, symbol, start, end):
+        if message.HasField('options'):
+            options.append((symbol, _octal_escape(message.options.SerializeToString())))
+        message_offsets.append((symbol, start, end))
+        nested = iter(message.nested_type)
+        for _, nested_start, nested_end in _submessages(data, start, end, {3}):
+            child = next(nested)
+            visit_message(child, f"{symbol}_{child.name.upper()}", nested_start, nested_end)
+
+    for number, start, end in file_fields:
+        if number == 4:
+            message = next(messages)
+            visit_message(message, f"_{message.name.upper()}", start, end)
+        else:
+            enum_offsets.append((f"_{next(enums).name.upper()}", start, end))
+
+    lines = [
+        "# -*- coding: utf-8 -*-",
+        "# Generated by the protocol buffer compiler.  DO NOT EDIT!",
+        f"# source: {file_proto.name}",
+        '"""Generated protocol buffer code."""',
+        "from google.protobuf.internal import builder as _builder",
+        "from google.protobuf import descriptor as _descriptor",
+        "from google.protobuf import descriptor_pool as _descriptor_pool",
+        "from google.protobuf import symbol_database as _symbol_database",
+        "# @@protoc_insertion_point(imports)",
+        "",
+        "_sym_db = _symbol_database.Default()",
+        "", "", "", "",
+        f"DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'{_hex_escape(data)}')",
+        "",
+        "_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())",
+        f"_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, '{module_name}', globals())",
+        "if _descriptor._USE_C_DESCRIPTORS == False:",
+        "",
+        "  DESCRIPTOR._options = None",
+    ]
+    for symbol, serialized in options:
+        lines.append(f"  {symbol}._options = None")
+        lines.append(f"  {symbol}._serialized_options = b'{serialized}'")
+    for symbol, start, end in enum_offsets + message_offsets:
+        lines.append(f"  {symbol}._serialized_start={start}")
+        lines.append(f"  {symbol}._serialized_end={end}")
+    lines.append("# @@protoc_insertion_point(module_scope)")
+    return "\n".join(lines) + "\n"
+
+
+def compile_builtin(proto_texts):
+    """未安裝 grpcio-tools 時的備援編譯：解析 .proto 後載入獨立的 DescriptorPool 驗證，再輸出 _pb2.py"""
+    pool = descriptor_pool.DescriptorPool()
+    outputs = {}
+    for name, text in proto_texts.items():
+        file_proto = parse_proto(text, name)
+        try:
+            pool.AddSerializedFile(file_proto.SerializeToString())
+            pool.FindFileByName(name)
+        except (TypeError, KeyError) as e:
+            # 例: 重複的枚舉值名稱、未定義的型別
+            raise ProtoSyntaxError(f"{name} 驗證失敗: {e}") from e
+        outputs[os.path.splitext(name)[0] + "_pb2.py"] = render_pb2(file_proto)
+    return outputs
+
+
+def compile_grpc_tools(proto_texts):
+    """以 grpc_tools.protoc 在行程內編譯 (需安裝 grpcio-tools)"""
+    from grpc_tools import protoc
+    outputs = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, text in proto_texts.items():
+            with open(os.path.join(work_dir, name), 'w', encoding='utf-8') as f:
+                f.write(text)
+        include_dir = os.path.join(os.path.dirname(protoc.__file__), '_proto')
+        result = protoc.main(['grpc_tools.protoc', f'-I{work_dir}', f'-I{include_dir}',
+                              f'--python_out={work_dir}'] + list(proto_texts))
+        if result != 0:
+            raise ProtoSyntaxError(f"grpc_tools.protoc 編譯失敗 (返回碼 {result})")
+        for name in proto_texts:
+            pb2_name = os.path.splitext(name)[0] + "_pb2.py"
+            with open(os.path.join(work_dir, pb2_name), 'r', encoding='utf-8') as f:
+                outputs[pb2_name] = f.read()
+    return outputs
+
+
+COMPILERS = {"builtin": compile_builtin, "grpc_tools": compile_grpc_tools}
+
+
+def resolve_compiler(compiler):
+    """auto: 優先使用 grpc_tools.protoc，未安裝 grpcio-tools 時才退回內建編譯"""
+    if compiler != "auto":
+        return compiler
+    return "grpc_tools" if importlib.util.find_spec("grpc_tools") else "builtin"
+
+
+# ---------------------------------------------------------------- 建置與快取
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _cache_key(compiler, setting, templates, existing):
+    digest = hashlib.sha256(f"{GENERATOR_VERSION}\0{compiler}\0".encode('utf-8'))
+    digest.update(setting.encode('utf-8'))
+    for name in sorted(templates):
+        digest.update(f"\0{name}\0{templates[name]}".encode('utf-8'))
+    digest.update(json.dumps(existing, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _write_cache(path, outputs):
+    cache_dir = os.path.dirname(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(outputs, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        files = sorted((os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".json")),
+                       key=os.path.getmtime)
+        for old_path in files[:-MAX_CACHE_FILES]:
+            os.remove(old_path)
+    except OSError:
+        pass
+
+
+def generate_outputs(setting_path=DEFAULT_SETTING_PATH, template_dir=DEFAULT_TEMPLATE_DIR,
+                     output_dir=DEFAULT_OUTPUT_DIR, cache_dir=DEFAULT_CACHE_DIR, compiler="auto", log=print):
+    """回傳 {檔名: 內容} (.proto 與 _pb2.py)，相同輸入直接使用快取"""
+    resolved = resolve_compiler(compiler)
+    if compiler == "auto" and resolved == "builtin":
+        log("⚠️ 未安裝 grpcio-tools，改用內建編譯 (只支援本專案用到的 proto3 子集，建議 pip install grpcio-tools)")
+    compiler = resolved
+    setting = _read(setting_path)
+    templates = {name: _read(os.path.join(template_dir, name + ".template")) for name in PROTO_FILES}
+    # 既有 .proto 的枚舉名稱與註解，讓拼寫差異不影響已在使用的名稱
+    existing = {name: existing_enums(os.path.join(output_dir, name)) for name in PROTO_FILES}
+
+    key = _cache_key(compiler, setting, templates, existing)
+    cache_path = os.path.join(cache_dir, key + ".json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            outputs = json.loads(_read(cache_path))
+            os.utime(cache_path)
+            log(f"📦 快取命中 ({key[:12]})")
+            return outputs
+        except (OSError, ValueError):
+            pass
+
+    spec = game_spec_from_content(setting)
+    proto_texts = {}
+    for name in PROTO_FILES:
+        pinned, comments = existing[name]
+        proto_texts[name] = render_proto(templates[name], spec, pinned, comments)
+        for values in pinned.values():
+            for old_name in values:
+                if re.search(rf'\b{old_name}\b', proto_texts[name]) is None:
+                    log(f"⚠️ {name}: 既有枚舉值 {old_name} 已不存在")
+    outputs = dict(proto_texts)
+    outputs.update(COMPILERS[compiler](proto_texts))
+    if cache_path:
+        _write_cache(cache_path, outputs)
+    return outputs
+
+
+def build_protos(output_dir=DEFAULT_OUTPUT_DIR, check=False, log=print, **options):
+    """寫入內容有變更的檔案 (check 時只比對)，回傳有差異的檔名列表"""
+    start = time.perf_counter()
+    outputs = generate_outputs(output_dir=output_dir, log=log, **options)
+    changed = []
+    for name, content in outputs.items():
+        path = os.path.join(output_dir, name)
+        try:
+            current = _read(path)
+        except OSError:
+            current = None
+        if current == content:
+            continue
+        changed.append(name)
+        if not check:
+            with open(path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(content)
+            log(f"📝 已更新 {path}")
+    elapsed = (time.perf_counter() - start) * 1000
+    if not changed:
+        log(f"✅ Proto 已是最新 ({elapsed:.0f} ms)")
+    elif check:
+        log(f"❌ 與 GameSetting.md 不一致: {', '.join(changed)}")
+    else:
+        log(f"✅ Proto 產生完成，更新 {len(changed)} 個檔案 ({elapsed:.0f} ms)")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ProtoBuilder - 由 GameSetting.md 產生 .proto 與 _pb2.py')
+    parser.add_argument('--setting', default=DEFAULT_SETTING_PATH, help='GameSetting.md 路徑')
+    parser.add_argument('--templates', default=DEFAULT_TEMPLATE_DIR, help='.proto 模板目錄')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help='輸出目錄')
+    parser.add_argument('--compiler', choices=['auto'] + sorted(COMPILERS), default='auto',
+                        help='auto 優先使用 grpc_tools.protoc，未安裝 grpcio-tools 時才退回 builtin (預設)；'
+                             'builtin 為備援，以 protobuf 的 descriptor_pb2 編譯，只支援本專案用到的 proto3 子集')
+    parser.add_argument('--no-cache', action='store_true', help='不使用快取')
+    parser.add_argument('--check', action='store_true', help='只檢查輸出是否與 GameSetting.md 一致，不一致時返回 1')
+    args = parser.parse_args()
+
+    try:
+        changed = build_protos(output_dir=args.output, check=args.check, setting_path=args.setting,
+                               template_dir=args.templates, cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR,
+                               compiler=args.compiler)
+    except (OSError, ProtoSyntaxError, ImportError) as e:
+        print(f"❌ Proto 產生失敗: {e}")
+        sys.exit(1)
+    if args.check and changed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,47 @@
 # -*- coding: utf-8 -*-
 """
 ProtoSchema 初始化檔案
-自動設定 protobuf 環境變數以解決版本相容性問題
+自動選擇 protobuf 後端：優先使用 upb/cpp，只有在 _pb2 模組與執行環境版本不相容時才退回純 Python
 """
 
 import os
+import sys
 
-# 設定 protobuf 環境變數（在導入 pb2 檔案之前）
-os.environ['PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'] = 'python'
+BACKEND_ENV = 'PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'
+
+# 版本不相容時 _pb2 載入會拋出的例外
+_VERSION_MISMATCH_ERRORS = (TypeError, ImportError, AttributeError)
+
+
+def _load_pb2_modules():
+    from . import GameFlowData_pb2, InputCommand_pb2  # noqa: F401
+
+
+def _reset_protobuf_modules():
+    """移除已載入的 protobuf 與 _pb2 模組，讓新的後端設定生效"""
+    for name in list(sys.modules):
+        if name == 'google.protobuf' or name.startswith('google.protobuf.') or name.startswith(__name__ + '.'):
+            del sys.modules[name]
+
+
+def _select_backend():
+    # 使用者明確指定後端時直接採用
+    if os.environ.get(BACKEND_ENV):
+        _load_pb2_modules()
+        return
+
+    try:
+        _load_pb2_modules()
+    except _VERSION_MISMATCH_ERRORS as e:
+        print(f"⚠️ _pb2 模組與 protobuf 後端不相容，改用純 Python 後端: {e}")
+        os.environ[BACKEND_ENV] = 'python'
+        _reset_protobuf_modules()
+        _load_pb2_modules()
+
+
+_select_backend()
+
+from google.protobuf.internal import api_implementation  # noqa: E402
+
+# 目前使用的後端名稱 ("upb"、"cpp" 或 "python")，匯入時不輸出，由呼叫端記錄
+BACKEND = api_implementation.Type()
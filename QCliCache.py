@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+QCliCache - Q CLI 生成結果的內容定址快取
+以 提示詞 + GameSetting/Schema 檔案內容 + Q CLI 版本 的 SHA-256 為鍵，只儲存通過驗證的程式碼；
+超過存放期限或總大小上限時，從最久未使用的項目開始淘汰
+"""
+
+import os
+import time
+import hashlib
+import argparse
+import subprocess
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".qcli_cache")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+_tool_version = None
+
+
+def qcli_version():
+    """取得 Q CLI 版本字串 (每個行程只查詢一次)，查詢失敗時回傳 unknown"""
+    global _tool_version
+    if _tool_version is None:
+        import platform
+        if platform.system() == "Windows":
+            command = ["wsl", "-e", "bash", "-c", "q --version"]
+        else:
+            command = ["q", "--version"]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=10,
+                                    encoding='utf-8', errors='ignore')
+            _tool_version = result.stdout.strip() or "unknown"
+        except (OSError, subprocess.SubprocessError):
+            _tool_version = "unknown"
+    return _tool_version
+
+
+class QCliCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def key(self, prompt, input_paths, tool_version=None):
+        """提示詞、輸入檔內容與工具版本的 SHA-256；輸入檔依路徑排序，缺少的檔案也計入"""
+        digest = hashlib.sha256()
+        digest.update((tool_version if tool_version is not None else qcli_version()).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        for path in sorted(str(path) for path in input_paths):
+            digest.update(b'\0' + os.path.basename(path).encode('utf-8') + b'\0')
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+            except OSError:
+                digest.update(b'missing')
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".py")
+
+    def get(self, key):
+        """命中時回傳程式碼並更新最後使用時間，過期或不存在時回傳 None"""
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if self.max_age and stat.st_mtime < time.time() - self.max_age:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                code = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return code
+
+    def put(self, key, code):
+        """寫入暫存檔後以 os.replace 原子替換，避免並行建置讀到寫一半的檔案"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        os.replace(temp_path, path)
+        self.evict()
+
+    def entries(self):
+        """回傳 [(最後使用時間, 大小, 路徑)]，依最後使用時間排序"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """淘汰過期項目，再從最久未使用的開始淘汰到總大小不超過上限，回傳淘汰數量"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        expired_before = time.time() - self.max_age if self.max_age else None
+        removed = 0
+        for mtime, size, path in entries:
+            if not (expired_before is not None and mtime < expired_before) and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        removed = 0
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='QCliCache - 檢視或清除 Q CLI 生成快取')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='快取目錄')
+    parser.add_argument('--clear', action='store_true', help='清除所有快取項目')
+    args = parser.parse_args()
+
+    cache = QCliCache(args.cache_dir)
+    if args.clear:
+        print(f"🧹 已清除 {cache.clear()} 個快取項目")
+        return
+    entries = cache.entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"📦 {args.cache_dir}: {len(entries)} 個項目，共 {total / 1024:.1f} KB "
+          f"(上限 {cache.max_bytes / 1024 / 1024:.0f} MB / {cache.max_age / 86400:.0f} 天)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+QCliRunner - 串流執行 Q CLI
+以 Popen 逐段讀取輸出，邊讀邊移除 ANSI 顏色代碼並偵測 shebang；看到完整模組 (main guard 區塊結束且可編譯)
+就提早結束，超過時間上限時連同子行程一起中止，執行中定期回報進度
+"""
+
+import os
+import re
+import sys
+import time
+import queue
+import codecs
+import signal
+import argparse
+import threading
+import subprocess
+
+DEFAULT_TIMEOUT = 900.0
+PROGRESS_INTERVAL = 10.0
+READ_SIZE = 65536
+SHEBANG = '#!/usr/bin/env python3'
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+
+class StreamingTranscript:
+    """逐段接收輸出，以完整的行為單位移除 ANSI 代碼 (跨段落的跳脫序列不會被切斷)"""
+
+    def __init__(self, errors='replace'):
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors)
+        self.pending = ""
+        self.lines = []
+        self.size = 0
+        self.code_start = None
+        self.main_guard = None
+        self.main_body = False
+        self.end = None
+
+    @property
+    def complete(self):
+        return self.end is not None
+
+    @property
+    def code_lines(self):
+        return 0 if self.code_start is None else (self.end or len(self.lines)) - self.code_start
+
+    def feed(self, data):
+        text = self.pending + self.decoder.decode(data)
+        self.size += len(text) - len(self.pending)
+        *lines, self.pending = text.split('\n')
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, raw):
+        line = ANSI_ESCAPE.sub('', raw).rstrip('\r')
+        self.lines.append(line)
+        if self.complete:
+            return
+
+        stripped = line.strip()
+        if self.code_start is None:
+            if stripped.lstrip('> ').startswith(SHEBANG):
+                self.code_start = len(self.lines) - 1
+            return
+        if not stripped:
+            return
+
+        indented = line[:1].isspace()
+        if self.main_guard is None:
+            if not indented and stripped.startswith('if __name__'):
+                self.main_guard = len(self.lines) - 1
+        elif indented:
+            self.main_body = True
+        elif self.main_body and not stripped.startswith('#') and self._compiles(len(self.lines) - 1):
+            # main guard 區塊之後出現不縮排的非程式碼 (說明文字或 ``` 結尾)，模組已完整
+            self.end = len(self.lines) - 1
+
+    def _compiles(self, end):
+        code = self.lines[self.code_start:end]
+        code[0] = code[0].strip().lstrip('> ')
+        try:
+            compile('\n'.join(code), '<qcli>', 'exec')
+        except (SyntaxError, ValueError):
+            return False
+        return True
+
+    def finish(self):
+        """回傳移除 ANSI 代碼後的輸出；提早結束時不含模組之後的內容"""
+        if self.end is not None:
+            return '\n'.join(self.lines[:self.end])
+        tail = self.pending + self.decoder.decode(b'', final=True)
+        lines = self.lines + ([ANSI_ESCAPE.sub('', tail)] if tail else [])
+        return '\n'.join(lines)
+
+
+class QCliResult:
+    def __init__(self, args, returncode, stdout, stderr, timed_out=False, stopped_early=False,
+                 cancelled=False, elapsed=0.0):
+        self.args = args
+        # 提早結束時行程被中止，視為成功 (0)
+        self.returncode = 0 if stopped_early else returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.stopped_early = stopped_early
+        self.cancelled = cancelled
+        self.elapsed = elapsed
+
+
+class QCliRunner:
+    def __init__(self, cwd=None, timeout=DEFAULT_TIMEOUT, log=print, progress_interval=PROGRESS_INTERVAL,
+                 errors='replace', stop_early=True):
+        self.cwd = cwd
+        self.timeout = timeout
+        self.log = log
+        self.progress_interval = progress_interval
+        self.errors = errors
+        self.stop_early = stop_early
+        self.process = None
+        self._cancelled = threading.Event()
+
+    @staticmethod
+    def _pump(stream, name, chunks):
+        try:
+            while True:
+                data = stream.read1(READ_SIZE)
+                if not data:
+                    break
+                chunks.put((name, data))
+        except (OSError, ValueError):
+            pass
+        finally:
+            chunks.put((name, None))
+
+    def kill(self):
+        """中止整個行程群組，避免 Q CLI 的子行程佔住輸出管線"""
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except OSError:
+            pass
+
+    def cancel(self):
+        self._cancelled.set()
+        self.kill()
+
+    def run(self, command):
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout else None
+        self.process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+            cwd=self.cwd,
+            start_new_session=os.name == 'posix',
+            creationflags=getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+        )
+        if self._cancelled.is_set():
+            self.kill()
+
+        chunks = queue.Queue()
+        readers = [threading.Thread(target=self._pump, args=(stream, name, chunks), daemon=True)
+                   for stream, name in ((self.process.stdout, 'stdout'), (self.process.stderr, 'stderr'))]
+        for reader in readers:
+            reader.start()
+
+        transcript = StreamingTranscript(self.errors)
+        stderr_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        stderr_parts = []
+        open_streams = len(readers)
+        timed_out = stopped_early = False
+        next_progress = start + self.progress_interval if self.progress_interval else None
+
+        try:
+            while open_streams:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    timed_out = True
+                    break
+                if next_progress is not None and now >= next_progress:
+                    message = f"⏳ Q CLI 執行中 {now - start:.0f} 秒，已收到 {transcript.size} 字元"
+                    if transcript.code_start is not None:
+                        message += f"，程式碼 {transcript.code_lines} 行"
+                    self.log(message)
+                    next_progress += self.progress_interval
+
+                waits = [limit - now for limit in (deadline, next_progress) if limit is not None]
+                try:
+                    name, data = chunks.get(timeout=max(min(waits), 0.0) if waits else None)
+                except queue.Empty:
+                    continue
+                if data is None:
+                    open_streams -= 1
+                elif name == 'stderr':
+                    stderr_parts.append(stderr_decoder.decode(data))
+                else:
+                    transcript.feed(data)
+                    if self.stop_early and transcript.complete:
+                        stopped_early = True
+                        break
+        finally:
+            # 提早結束、逾時或讀取過程發生例外時都要中止行程群組並回收讀取執行緒，避免留下孤兒 q chat
+            if open_streams:
+                self.kill()
+            returncode = self.process.wait()
+            for reader in readers:
+                reader.join(timeout=1.0)
+        stderr_parts.append(stderr_decoder.decode(b'', final=True))
+
+        return QCliResult(command, returncode, transcript.finish(), ''.join(stderr_parts),
+                          timed_out=timed_out, stopped_early=stopped_early,
+                          cancelled=self._cancelled.is_set(), elapsed=time.monotonic() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='QCliRunner - 串流執行指令並擷取 Python 模組 (測試用)')
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='要執行的指令，例如 q chat --no-interactive "..."')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='時間上限 (秒)')
+    parser.add_argument('--progress', type=float, default=PROGRESS_INTERVAL, help='進度回報間隔 (秒)')
+    args = parser.parse_args()
+    if not args.command:
+        parser.error("請指定要執行的指令")
+
+    log = lambda message: print(message, file=sys.stderr)
+    result = QCliRunner(timeout=args.timeout, log=log, progress_interval=args.progress).run(args.command)
+    status = "⏱️ 逾時" if result.timed_out else "✂️ 提早結束" if result.stopped_early else f"返回碼 {result.returncode}"
+    print(f"{status}  {result.elapsed:.1f} 秒  輸出 {len(result.stdout)} 字元", file=sys.stderr)
+    print(result.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RaceController - 比賽中的閉迴路轉向控制
+依 GameRaceData 的目前位置、目標位置與法向量計算 STEER (-1~1) 與 THROTTLE (0~1)，
+每個 frame 只做固定次數的浮點運算，並以每 frame 預算限制最壞情況
+"""
+
+import math
+import time
+import random
+import argparse
+
+DEFAULT_BUDGET = 0.001
+MIN_STEP = 1e-4
+
+
+class RaceController:
+    """比例-微分轉向控制，轉向正值代表向右 (繞法向量順時針)"""
+
+    def __init__(self, steer_gain=4.0, damping=1.0, min_throttle=0.35, corner_slowdown=0.6,
+                 budget=DEFAULT_BUDGET):
+        self.steer_gain = steer_gain
+        self.damping = damping
+        self.min_throttle = min_throttle
+        self.corner_slowdown = corner_slowdown
+        self.budget = budget
+        self.overruns = 0
+        self.reset()
+
+    def reset(self):
+        """新比賽開始時清除上一場的狀態"""
+        self.previous_pos = None
+        self.forward = None
+        self.previous_angle = 0.0
+        self.output = (0.0, 1.0)
+        self._skip_next = False
+
+    def update(self, race_data):
+        """回傳 (steer, throttle)
+
+        超出預算的下一個 frame 直接沿用上一個輸出，不再計算，讓平均耗時維持在預算內
+        """
+        if self._skip_next:
+            self._skip_next = False
+            return self.output
+
+        start = time.perf_counter()
+        self.output = self._compute(race_data)
+        if time.perf_counter() - start > self.budget:
+            self.overruns += 1
+            self._skip_next = True
+        return self.output
+
+    def _compute(self, race_data):
+        px, py, pz = race_data.current_pos_x, race_data.current_pos_y, race_data.current_pos_z
+        nx, ny, nz = race_data.normal_x, race_data.normal_y, race_data.normal_z
+        norm = math.sqrt(nx * nx + ny * ny + nz * nz)
+        if norm < MIN_STEP:
+            nx, ny, nz = 0.0, 0.0, 1.0
+        else:
+            nx, ny, nz = nx / norm, ny / norm, nz / norm
+
+        # 朝向以前後兩個 frame 的位移估計，移動太少時沿用上一個朝向
+        if self.previous_pos is not None:
+            fx, fy, fz = px - self.previous_pos[0], py - self.previous_pos[1], pz - self.previous_pos[2]
+            if fx * fx + fy * fy + fz * fz > MIN_STEP * MIN_STEP:
+                self.forward = (fx, fy, fz)
+        self.previous_pos = (px, py, pz)
+
+        dx = race_data.target_position_x - px
+        dy = race_data.target_position_y - py
+        dz = race_data.target_position_z - pz
+        fx, fy, fz = self.forward if self.forward is not None else (dx, dy, dz)
+
+        # 投影到與法向量垂直的平面
+        dot = fx * nx + fy * ny + fz * nz
+        fx, fy, fz = fx - dot * nx, fy - dot * ny, fz - dot * nz
+        dot = dx * nx + dy * ny + dz * nz
+        dx, dy, dz = dx - dot * nx, dy - dot * ny, dz - dot * nz
+
+        # 朝向到目標的有號夾角 (逆時針為正)
+        cross = (fy * dz - fz * dy) * nx + (fz * dx - fx * dz) * ny + (fx * dy - fy * dx) * nz
+        angle = math.atan2(cross, fx * dx + fy * dy + fz * dz)
+
+        steer = -(self.steer_gain * angle + self.damping * (angle - self.previous_angle)) / math.pi
+        self.previous_angle = angle
+        steer = max(-1.0, min(steer, 1.0))
+        throttle = max(self.min_throttle, 1.0 - self.corner_slowdown * abs(steer))
+        return steer, throttle
+
+
+def _benchmark_frames(count, seed):
+    from ProtoSchema.GameFlowData_pb2 import GameRaceData
+
+    rng = random.Random(seed)
+    frames = []
+    x = y = 0.0
+    for _ in range(count):
+        x += rng.uniform(0.05, 0.2)
+        y += rng.uniform(-0.05, 0.05)
+        race_data = GameRaceData()
+        race_data.current_pos_x = x
+        race_data.current_pos_y = y
+        race_data.target_position_x = x + 10.0
+        race_data.target_position_y = rng.uniform(-15.0, 15.0)
+        race_data.normal_z = 1.0
+        frames.append(race_data)
+    return frames
+
+
+def main():
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from AgentMetrics import Histogram
+
+    parser = argparse.ArgumentParser(description='RaceController - 轉向控制器每 frame 耗時基準測試')
+    parser.add_argument('--frames', type=int, default=100000, help='測試 frame 數')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='每 frame 預算 (秒)')
+    parser.add_argument('--seed', type=int, default=1, help='隨機種子')
+    args = parser.parse_args()
+
+    frames = _benchmark_frames(args.frames, args.seed)
+    controller = RaceController(budget=args.budget)
+    histogram = Histogram()
+    for race_data in frames:
+        start = time.perf_counter()
+        controller.update(race_data)
+        histogram.record(time.perf_counter() - start)
+
+    p99 = histogram.percentile(0.99)
+    status = "✅" if p99 < args.budget else "❌"
+    print(f"{status} {args.frames} frames  平均={histogram.mean() * 1e6:.2f}us  "
+          f"p50={histogram.percentile(0.5) * 1e6:.2f}us  p99={p99 * 1e6:.2f}us  "
+          f"最大={histogram.max / 1e3:.2f}us  超出預算={controller.overruns}")
+    sys.exit(0 if p99 < args.budget else 1)
+
+
+if __name__ == "__main__":
+    main()
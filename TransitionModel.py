@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TransitionModel - 從錄製資料學習流程轉換圖，並規劃前往目標狀態的按鍵
+統計 (狀態, 按鍵) → 下一個狀態 的次數，以期望步數最短路徑為每個狀態選出最佳按鍵
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import argparse
+
+LOG_LINE = re.compile(r'^\[[^\]]+\] (.*)$')
+FLOW_STATE_LINE = re.compile(r'^\s+current_flow_state: (\d+)')
+SEND_LINE = re.compile(r'^📤 發送\S*指令: (.+)$')
+
+
+class TransitionModel:
+    def __init__(self):
+        # {(狀態, 按鍵): {下一個狀態: 次數}}
+        self.counts = {}
+
+    def observe(self, state, key, next_state):
+        outcomes = self.counts.setdefault((state, key), {})
+        outcomes[next_state] = outcomes.get(next_state, 0) + 1
+
+    def observe_sequence(self, steps):
+        """steps 為 (狀態, 按鍵或 None) 的序列，按鍵之後的下一個狀態即為結果"""
+        previous = None
+        for state, key in steps:
+            if previous is not None:
+                self.observe(previous[0], previous[1], state)
+            previous = (state, key) if key else None
+
+    def learn_from_capture(self, path):
+        """從 FrameRecorder 錄製檔學習"""
+        from FrameRecorder import FrameReader, RECORD_RECEIVED, RECORD_SENT, RECORD_SENT_COMPLEX
+        from ProtoSchema.GameFlowData_pb2 import GameFlowData
+        from ProtoSchema.InputCommand_pb2 import InputCommand, ComplexInputCommand, EInputKeyType
+
+        steps = []
+        game_data = GameFlowData()
+        input_command = InputCommand()
+        complex_command = ComplexInputCommand()
+        for record_type, _, payload in FrameReader(path).records():
+            if record_type == RECORD_RECEIVED:
+                game_data.ParseFromString(payload)
+                steps.append([game_data.current_flow_state, None])
+                continue
+            if not steps:
+                continue
+            if record_type == RECORD_SENT:
+                input_command.ParseFromString(payload)
+                commands = [input_command]
+            elif record_type == RECORD_SENT_COMPLEX:
+                complex_command.ParseFromString(payload)
+                commands = complex_command.digital_inputs
+            else:
+                continue
+            for command in commands:
+                if command.is_key_down and command.key_inputs:
+                    steps[-1][1] = EInputKeyType.Name(command.key_inputs[0]).replace("INPUT_KEY_", "")
+        self.observe_sequence(steps)
+        return len(steps)
+
+    def learn_from_log(self, path):
+        """從 AutoTestAgent.log 文字日誌學習"""
+        steps = []
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                match = LOG_LINE.match(line.rstrip('\n'))
+                if not match:
+                    continue
+                message = match.group(1)
+                state_match = FLOW_STATE_LINE.match(message)
+                if state_match:
+                    steps.append([int(state_match.group(1)), None])
+                    continue
+                send_match = SEND_LINE.match(message)
+                key = send_match and self._pressed_key(send_match.group(1))
+                if key and steps:
+                    if steps[-1][1] is None:
+                        steps[-1][1] = key
+                    else:
+                        # --change-only 日誌不記錄未變化的 frame，連續送出代表停在同一個狀態
+                        steps.append([steps[-1][0], key])
+        self.observe_sequence(steps)
+        return len(steps)
+
+    @staticmethod
+    def _pressed_key(text):
+        """從送出指令的日誌取第一個按下的按鍵，例: START 或 放開 LEFT / 按下 START / THROTTLE=1.00"""
+        if " / " in text or text.startswith(("按下", "放開")) or "=" in text:
+            pressed = [part[3:] for part in text.split(" / ") if part.startswith("按下 ")]
+            return pressed[0].split(",")[0].strip() if pressed else None
+        return text.split(",")[0].strip()
+
+    def learn(self, path):
+        from FrameRecorder import MAGIC
+        with open(path, 'rb') as f:
+            is_capture = f.read(len(MAGIC)) == MAGIC
+        return self.learn_from_capture(path) if is_capture else self.learn_from_log(path)
+
+    def plan(self, target, allowed_keys=None, iterations=200):
+        """以 value iteration 求每個狀態到 target 的期望步數與最佳按鍵
+
+        自我轉換視為重試：期望步數 = (1 + Σ P(s'|s,k)·d(s')) / (1 - P(s|s,k))
+        回傳 ({狀態: 最佳按鍵}, {狀態: 期望步數})
+        """
+        states = {state for state, _ in self.counts}
+        for outcomes in self.counts.values():
+            states.update(outcomes)
+
+        distance = {state: (0.0 if state == target else float("inf")) for state in states}
+        policy = {}
+        for _ in range(iterations):
+            changed = False
+            for (state, key), outcomes in self.counts.items():
+                if state == target or (allowed_keys is not None and key not in allowed_keys):
+                    continue
+                total = sum(outcomes.values())
+                stay = outcomes.get(state, 0) / total
+                if stay >= 1.0:
+                    continue
+                expected = 1.0
+                for next_state, count in outcomes.items():
+                    if next_state != state:
+                        expected += count / total * distance[next_state]
+                cost = expected / (1.0 - stay)
+                if cost < distance[state] - 1e-9:
+                    distance[state] = cost
+                    policy[state] = key
+                    changed = True
+            if not changed:
+                break
+        return policy, distance
+
+    def save(self, path):
+        data = [{"state": state, "key": key, "next": {str(s): n for s, n in outcomes.items()}}
+                for (state, key), outcomes in sorted(self.counts.items())]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        model = cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                model.counts[(item["state"], item["key"])] = {int(s): n for s, n in item["next"].items()}
+        return model
+
+
+class FlowPlanner:
+    """依預先規劃好的策略為目前狀態選鍵，查表為常數時間"""
+
+    def __init__(self, model, target, allowed_keys=None, explore=0.1):
+        self.target = target
+        self.explore = explore
+        self.policy, self.distance = model.plan(target, allowed_keys)
+
+    def choose(self, state):
+        """回傳規劃的按鍵；未知狀態或探索時回傳 None，交給隨機選鍵"""
+        key = self.policy.get(state)
+        if key is None or random.random() < self.explore:
+            return None
+        return key
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TransitionModel - 學習流程轉換圖並規劃按鍵')
+    parser.add_argument('sources', nargs='*', help='FrameRecorder 錄製檔或 AutoTestAgent.log')
+    parser.add_argument('-o', '--output', default='FlowModel.json', help='模型輸出路徑')
+    parser.add_argument('--target', help='顯示前往目標狀態的規劃，例如 GAME_FLOW_RACE')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from ProtoSchema.GameFlowData_pb2 import EGameFlowState
+
+    if args.sources:
+        model = TransitionModel()
+        for source in args.sources:
+            print(f"📂 {source}: {model.learn(source)} 個 frame")
+        model.save(args.output)
+        print(f"✅ 模型已儲存: {args.output} ({len(model.counts)} 組 (狀態, 按鍵))")
+    else:
+        model = TransitionModel.load(args.output)
+
+    if args.target:
+        target = EGameFlowState.Value(args.target)
+        policy, distance = model.plan(target)
+        print(f"🎯 前往 {args.target} 的規劃:")
+        for state in sorted(distance, key=distance.get):
+            if state in policy:
+                print(f"   {EGameFlowState.Name(state)}: {policy[state]} (期望 {distance[state]:.1f} 步)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""測試共用設定：專案模組都放在根目錄，直接加入 sys.path"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def make_agent(tmp_path):
+    """建立不連線遊戲的 AutoTestAgent：收集日誌與決策呼叫，日誌寫到暫存目錄"""
+    from AutoTestAgent import AutoTestAgent
+
+    class OfflineAgent(AutoTestAgent):
+        def __init__(self, **kwargs):
+            self.messages = []
+            self.decisions = []
+            kwargs.setdefault("input_configuration_file", None)
+            super().__init__(echo=False, metrics_interval=0, **kwargs)
+
+        def log(self, message):
+            self.messages.append(message)
+
+        def process_game_state(self, game_data, changed=True):
+            self.decisions.append((game_data.current_flow_state, changed))
+
+    agents = []
+
+    def make(**kwargs):
+        agent = OfflineAgent(log_file=str(tmp_path / "agent.log"), **kwargs)
+        agents.append(agent)
+        return agent
+
+    yield make
+    for agent in agents:
+        agent.stop()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""AgentFleet 在同一個事件迴圈中驅動多台 GameSimulator，每台機台各自有日誌並回應 frame"""
+
+import os
+import asyncio
+import threading
+
+from AgentFleet import AgentFleet, parse_target, load_targets
+from GameSimulator import SimulatorServer
+
+
+def test_parse_and_load_targets(tmp_path):
+    assert parse_target("10.0.0.2:9000") == ("10.0.0.2", 9000)
+    assert parse_target("8587") == ("127.0.0.1", 8587)
+    targets = tmp_path / "targets.txt"
+    targets.write_text("# 機台清單\n127.0.0.1:8001\n\n:8002  # 第二台\n", encoding="utf-8")
+    assert load_targets(str(targets)) == [("127.0.0.1", 8001), ("127.0.0.1", 8002)]
+
+
+def test_fleet_drives_every_simulator(tmp_path):
+    servers = [SimulatorServer(port=0) for _ in range(2)]
+    results = {}
+
+    def serve(index, server):
+        results[index] = server.run(60, duration=2.5)
+
+    threads = [threading.Thread(target=serve, args=(i, server)) for i, server in enumerate(servers)]
+    for thread in threads:
+        thread.start()
+
+    log_dir = tmp_path / "FleetLogs"
+    targets = [("127.0.0.1", server.sock.getsockname()[1]) for server in servers]
+    fleet = AgentFleet(targets, log_dir=str(log_dir), summary_interval=60)
+    try:
+        asyncio.run(fleet.run(duration=2.0))
+    finally:
+        for thread in threads:
+            thread.join(10)
+        for server in servers:
+            server.close()
+
+    for index, server in enumerate(servers):
+        frames, commands = results[index]
+        assert len(server.clients) == 1
+        assert frames > 0 and commands > 0
+    for host, port in targets:
+        assert os.path.getsize(log_dir / f"AutoTestAgent_{host.replace('.', '_')}_{port}.log") > 0
+    assert all(agent.metrics.frames > 0 for agent in fleet.agents)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""AutoTestAgent 的積壓處理 (peek_flow_state、drain_socket、coalesce_frames) 與只處理變化的 frame"""
+
+import time
+import socket
+
+import pytest
+
+from AutoTestAgent import peek_flow_state
+from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState
+
+
+def frame(state, **fields):
+    return GameFlowData(current_flow_state=state, **fields).SerializeToString()
+
+
+@pytest.mark.parametrize("state", [EGameFlowState.GAME_FLOW_COPYRIGHT, EGameFlowState.GAME_FLOW_RACE,
+                                   EGameFlowState.GAME_FLOW_MAX])
+def test_peek_flow_state_matches_parsed_state(state):
+    assert peek_flow_state(frame(state, player_coins=3, timestamp=123456789)) == state
+
+
+def test_peek_flow_state_handles_empty_and_multibyte_varint():
+    assert peek_flow_state(b"") == 0
+    assert peek_flow_state(frame(0, player_coins=3)) == 0      # 值為 0 時欄位 1 省略
+    assert peek_flow_state(b"\x08\xac\x02") == 300
+
+
+def test_coalesce_latest_keeps_newest_frame(make_agent):
+    agent = make_agent(coalesce="latest")
+    packets = [frame(1, timestamp=i) for i in range(3)]
+    assert agent.coalesce_frames(packets) == packets[-1:]
+    assert agent.coalesce_frames(packets[:1]) == packets[:1]
+    assert agent.metrics.dropped == 2
+
+
+def test_coalesce_transitions_keeps_state_changes_and_newest(make_agent):
+    race, race_end = EGameFlowState.GAME_FLOW_RACE, EGameFlowState.GAME_FLOW_RACE_END
+    agent = make_agent(coalesce="transitions")
+    agent.last_flow_state = race
+    packets = [frame(race, timestamp=0), frame(race, timestamp=1), frame(race_end, timestamp=2),
+               frame(race_end, timestamp=3), frame(race_end, timestamp=4)]
+    assert agent.coalesce_frames(packets) == [packets[2], packets[4]]
+    assert agent.metrics.dropped == 3
+
+
+def test_handle_frames_records_transitions_but_decides_on_newest(make_agent):
+    coin_page, select_mode = EGameFlowState.GAME_FLOW_COIN_PAGE, EGameFlowState.GAME_FLOW_SELECT_MODE
+    agent = make_agent(coalesce="transitions")
+    agent.last_flow_state = EGameFlowState.GAME_FLOW_PV
+    packets = [frame(coin_page, timestamp=0), frame(coin_page, timestamp=1), frame(select_mode, timestamp=2)]
+    agent.handle_frames(agent.coalesce_frames(packets))
+    # 兩個狀態改變的 frame 都記錄，但只有最新一個決策
+    assert agent.messages.count("📥 接收遊戲數據:") == 2
+    assert agent.decisions == [(select_mode, True)]
+    assert agent.metrics.frames == 2 and agent.metrics.histograms["latency"].count == 1
+    assert agent.last_flow_state == select_mode
+
+
+def test_drain_socket_reads_backlog_without_touching_timeout(make_agent):
+    agent = make_agent(coalesce="latest")
+    agent.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    agent.sock.bind(("127.0.0.1", 0))
+    agent.sock.settimeout(5.0)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        packets = [frame(1, timestamp=i) for i in range(5)]
+        for data in packets:
+            sender.sendto(data, agent.sock.getsockname())
+        first, _ = agent.sock.recvfrom(4096)
+        # 本機迴路上的封包已送達，剩下的積壓應一次讀完且不等待
+        drained = agent.drain_socket(first)
+        assert drained == packets
+        assert agent.sock.gettimeout() == 5.0
+        assert agent.drain_socket(b"x") == [b"x"]
+    finally:
+        sender.close()
+
+
+def test_drain_socket_stops_at_max_drain(make_agent):
+    agent = make_agent(coalesce="latest")
+    agent.max_drain = 3
+    agent.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    agent.sock.bind(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for i in range(5):
+            sender.sendto(bytes([i]), agent.sock.getsockname())
+        first, _ = agent.sock.recvfrom(4096)
+        assert agent.drain_socket(first) == [b"\x00", b"\x01", b"\x02"]
+    finally:
+        sender.close()
+
+
+def field_logs(agent):
+    return [message.strip() for message in agent.messages if message.startswith("   ")]
+
+
+def test_change_only_skips_identical_frames(make_agent):
+    agent = make_agent(change_only=True)
+    data = frame(EGameFlowState.GAME_FLOW_COIN_PAGE, player_coins=2, timestamp=1)
+    agent.handle_frame(data)
+    first_logs = field_logs(agent)
+    assert "player_coins: 2" in first_logs
+    agent.handle_frame(data)
+    assert field_logs(agent) == first_logs                 # 相同封包不再記錄欄位
+    assert agent.metrics.unchanged == 1
+    coin_page = EGameFlowState.GAME_FLOW_COIN_PAGE
+    assert agent.decisions == [(coin_page, True), (coin_page, False)]
+
+
+def test_change_only_ignores_timestamp_only_changes(make_agent):
+    agent = make_agent(change_only=True)
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_RACE, player_coins=2, timestamp=1))
+    count = len(agent.messages)
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_RACE, player_coins=2, timestamp=2))
+    assert len(agent.messages) == count
+    assert agent.metrics.unchanged == 1
+    assert agent.decisions[-1] == (EGameFlowState.GAME_FLOW_RACE, False)
+
+
+def test_change_only_logs_only_changed_fields(make_agent):
+    agent = make_agent(change_only=True)
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_COIN_PAGE, player_coins=2, timestamp=1))
+    count = len(agent.messages)
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_SELECT_MODE, player_coins=2, timestamp=2))
+    assert agent.messages[count] == "📥 接收遊戲數據 (變更):"
+    assert [message.split(":")[0].strip() for message in agent.messages[count + 1:]] == \
+        ["current_flow_state", "timestamp"]
+    assert agent.metrics.unchanged == 0
+    assert agent.decisions[-1] == (EGameFlowState.GAME_FLOW_SELECT_MODE, True)
+
+
+def test_without_change_only_every_frame_is_logged_and_changed(make_agent):
+    agent = make_agent()
+    data = frame(EGameFlowState.GAME_FLOW_COIN_PAGE, player_coins=2)
+    agent.handle_frame(data)
+    agent.handle_frame(data)
+    assert agent.messages.count("📥 接收遊戲數據:") == 2
+    assert [changed for _, changed in agent.decisions] == [True, True]
+
+
+def test_latency_starts_at_receive_time(make_agent):
+    agent = make_agent()
+    received = time.perf_counter() - 0.05
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_COIN_PAGE), received)
+    latency = agent.metrics.histograms["latency"]
+    assert latency.count == 1 and latency.min >= 0.05
+
+
+def test_scheduler_latency_closes_when_command_is_sent(make_agent):
+    agent = make_agent(schedule_input=True)
+    sent = []
+    agent.send_command = sent.append
+    received = time.perf_counter() - 0.05
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_COIN_PAGE), received)
+    agent.handle_frame(frame(EGameFlowState.GAME_FLOW_COIN_PAGE), time.perf_counter())
+    latency = agent.metrics.histograms["latency"]
+    # 收到 frame 時只計數，延遲要等排程送出指令才結算，並從最早尚未反應的 frame 起算
+    assert agent.metrics.frames == 2 and latency.count == 0
+
+    agent.input_tick(time.monotonic())
+    assert sent
+    assert latency.count == 1 and latency.min >= 0.05
+    assert agent.pending_received is None
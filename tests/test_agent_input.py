@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""ComplexInputCommand 輸入：同一個封包先放開上一個 frame 按下的鍵再按下新鍵，比賽中附帶油門"""
+
+import random
+
+import pytest
+
+from AgentInput import InputFrame, describe_complex
+from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState
+from ProtoSchema.InputCommand_pb2 import ComplexInputCommand, EInputKeyType, EInputVrType
+
+K = EInputKeyType
+
+
+def test_input_frame_orders_release_press_then_axes():
+    input_frame = InputFrame()
+    input_frame.press(K.INPUT_KEY_START)
+    input_frame.set_axis(EInputVrType.INPUT_VR_THROTTLE, 1.0)
+    input_frame.release(K.INPUT_KEY_LEFT)
+    input_frame.press(K.INPUT_KEY_START)
+    command = input_frame.to_complex(42)
+
+    assert [(list(d.key_inputs), d.is_key_down) for d in command.digital_inputs] == \
+        [([K.INPUT_KEY_LEFT], False), ([K.INPUT_KEY_START], True)]
+    assert [(a.vr_type, a.value) for a in command.analog_inputs] == [(EInputVrType.INPUT_VR_THROTTLE, 1.0)]
+    assert {d.timestamp for d in command.digital_inputs} == {42}
+    assert describe_complex(command) == "放開 LEFT / 按下 START / THROTTLE=1.00"
+    assert InputFrame().is_empty() and not input_frame.is_empty()
+
+
+@pytest.fixture
+def complex_agent(tmp_path):
+    from AutoTestAgent import AutoTestAgent
+
+    class CaptureAgent(AutoTestAgent):
+        def send_command(self, command_data):
+            command = ComplexInputCommand()
+            command.ParseFromString(command_data)
+            self.sent.append(command)
+
+    agent = CaptureAgent(log_file=str(tmp_path / "agent.log"), echo=False, metrics_interval=0,
+                         input_configuration_file=None, input_format="complex")
+    agent.sent = []
+    yield agent
+    agent.stop()
+
+
+def test_agent_releases_previous_key_before_pressing(complex_agent):
+    random.seed(1)
+    for state in (EGameFlowState.GAME_FLOW_SELECT_MODE, EGameFlowState.GAME_FLOW_SELECT_MODE,
+                  EGameFlowState.GAME_FLOW_RACE):
+        complex_agent.process_game_state(GameFlowData(current_flow_state=state))
+
+    first, second, race = complex_agent.sent
+    assert [d.is_key_down for d in first.digital_inputs] == [True]
+    previous_key = list(first.digital_inputs[0].key_inputs)
+    assert [d.is_key_down for d in second.digital_inputs] == [False, True]
+    assert list(second.digital_inputs[0].key_inputs) == previous_key
+    assert not first.analog_inputs and not second.analog_inputs
+
+    assert list(race.digital_inputs[0].key_inputs) == list(second.digital_inputs[1].key_inputs)
+    assert [(a.vr_type, a.value) for a in race.analog_inputs] == \
+        [(EInputVrType.INPUT_VR_THROTTLE, complex_agent.race_throttle)]
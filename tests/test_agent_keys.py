@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""AutoTestAgent 的按鍵篩選：GameSetting.md 屏蔽的按鍵 (含 SeatDetact → SEAT_DETECT) 不會被隨機選到，
+以及 AgentMaker 編譯的 InputConfiguration.pb 按鍵表"""
+
+import os
+import random
+
+from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState
+from ProtoSchema.InputCommand_pb2 import InputConfiguration, EInputKeyType
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT_CONFIGURATION = os.path.join(ROOT, "ProtoSchema", "InputConfiguration.pb")
+BLOCKED = {"EMERGENCY", "TEST", "LEFT_LEG", "RIGHT_LEG", "SEAT_DETECT", "SERVICE"}
+
+
+def test_blocked_keys_are_not_available(make_agent):
+    agent = make_agent()
+    assert set(agent.key_mapping) - set(agent.available_keys) == BLOCKED
+    assert "SEAT_DETECT" in agent.key_mapping
+    assert agent.available_keys == ["UP", "DOWN", "LEFT", "RIGHT", "START", "NITRO", "COIN", "SPEED_UP",
+                                    "LEFT_MACHINE"]
+
+
+def test_state_key_tables_drop_blocked_keys(make_agent):
+    agent = make_agent(input_configuration_file=INPUT_CONFIGURATION)
+    assert agent.state_keys[EGameFlowState.GAME_FLOW_COIN_PAGE] == ["COIN", "NITRO"]
+    for keys in agent.state_keys.values():
+        assert not BLOCKED & set(keys)
+
+
+def test_choose_key_never_picks_blocked_keys(make_agent):
+    agent = make_agent(input_configuration_file=INPUT_CONFIGURATION)
+    random.seed(0)
+    states = [EGameFlowState.GAME_FLOW_RACE, EGameFlowState.GAME_FLOW_COIN_PAGE, EGameFlowState.GAME_FLOW_SELECT_SCENE]
+    chosen = {agent.choose_key(GameFlowData(current_flow_state=state)) for state in states for _ in range(300)}
+    assert chosen and not BLOCKED & chosen
+
+
+def decode_configuration(path):
+    configuration = InputConfiguration()
+    with open(path, "rb") as f:
+        configuration.ParseFromString(f.read())
+    return {EGameFlowState.Name(mapping.applicable_state): (mapping.description,
+            [EInputKeyType.Name(key).replace("INPUT_KEY_", "") for key in mapping.available_keys])
+            for mapping in configuration.state_mappings}
+
+
+def test_committed_input_configuration_decodes_to_flow_keys():
+    mappings = decode_configuration(INPUT_CONFIGURATION)
+    assert mappings["GAME_FLOW_COIN_PAGE"] == ("CoinPage", ["COIN", "NITRO"])
+    assert mappings["GAME_FLOW_SELECT_SCENE"] == ("SelectScene", ["LEFT", "RIGHT", "START", "UP", "DOWN"])
+    assert set(mappings) == {"GAME_FLOW_COIN_PAGE", "GAME_FLOW_SELECT_MODE", "GAME_FLOW_PHOTO_AUTH",
+                             "GAME_FLOW_SELECT_SCENE", "GAME_FLOW_SELECT_BIKE"}
+
+
+def test_compiled_input_configuration_matches_committed(tmp_path):
+    from AgentMaker import AgentMaker
+
+    maker = AgentMaker(use_cache=False, log_file=tmp_path / "AgentMaker.log")
+    maker.input_configuration_path = tmp_path / "InputConfiguration.pb"
+    maker.compile_input_configuration(maker.analyze_game_setting())
+    with open(INPUT_CONFIGURATION, "rb") as f:
+        assert maker.input_configuration_path.read_bytes() == f.read()
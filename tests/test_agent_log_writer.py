@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""AgentLogWriter 背景寫入：close 時寫出並 flush 佇列中剩餘的日誌，佇列滿時依 overflow 設定處理"""
+
+import re
+
+import pytest
+
+from AgentLogWriter import AgentLogWriter
+
+LINE = re.compile(r'^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] ')
+
+
+def read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_close_flushes_pending_lines(tmp_path):
+    path = tmp_path / "agent.log"
+    # flush 間隔很長：檔案內容只能來自 close 時的最後一次 flush
+    writer = AgentLogWriter(str(path), echo=False, flush_interval=60)
+    for index in range(1000):
+        writer.write(f"📥 frame {index}")
+    writer.close()
+
+    lines = read_lines(path)
+    assert len(lines) == 1000
+    assert all(LINE.match(line) for line in lines)
+    assert lines[0].endswith("📥 frame 0") and lines[-1].endswith("📥 frame 999")
+
+
+def test_write_after_close_is_ignored(tmp_path):
+    path = tmp_path / "agent.log"
+    writer = AgentLogWriter(str(path), echo=False)
+    writer.write("第一筆")
+    writer.close()
+    writer.write("關閉後")
+    writer.close()
+    assert [line.split("] ", 1)[1] for line in read_lines(path)] == ["第一筆"]
+
+
+def test_full_queue_drops_and_reports(tmp_path):
+    path = tmp_path / "agent.log"
+    writer = AgentLogWriter(str(path), echo=False, queue_size=1, flush_interval=60)
+    # 背景執行緒來不及取出時後續寫入會被丟棄，丟棄數會寫進日誌
+    for index in range(5000):
+        writer.write(f"line {index}")
+    writer.close()
+    lines = read_lines(path)
+    assert writer.dropped > 0
+    assert len([line for line in lines if "line " in line]) == 5000 - writer.dropped
+    assert lines[-1].endswith(f"⚠️ 日誌佇列已滿，累計丟棄 {writer.dropped} 筆")
+
+
+def test_block_overflow_keeps_every_line(tmp_path):
+    path = tmp_path / "agent.log"
+    writer = AgentLogWriter(str(path), echo=False, queue_size=1, overflow="block")
+    for index in range(2000):
+        writer.write(f"line {index}")
+    writer.close()
+    assert writer.dropped == 0 and len(read_lines(path)) == 2000
+
+
+def test_invalid_overflow_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AgentLogWriter(str(tmp_path / "agent.log"), overflow="wait")
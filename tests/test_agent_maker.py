@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""AgentMaker 模板後端：AutoTestAgent.py 只由模板產生，提交的檔案必須與模板產生的結果一致"""
+
+import os
+
+import pytest
+
+from AgentMaker import AgentMaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def maker(tmp_path):
+    return AgentMaker(use_cache=False, log_file=tmp_path / "AgentMaker.log")
+
+
+def test_committed_agent_matches_template(maker):
+    agent_code = maker.render_agent_template(maker.analyze_game_setting())
+    with open(os.path.join(ROOT, "AutoTestAgent.py"), "r", encoding="utf-8") as f:
+        assert agent_code == f.read(), "AutoTestAgent.py 被直接修改，請修改模板後執行 python AgentMaker.py"
+    assert maker.check_agent()
+
+
+def test_template_substitutes_setting_values(maker):
+    game_config = maker.analyze_game_setting()
+    game_config = dict(game_config, blocked_keys=["TEST"], udp_config={"host": "10.0.0.2", "port": 9000})
+    agent_code = maker.render_agent_template(game_config)
+    assert 'def __init__(self, host="10.0.0.2", port=9000,' in agent_code
+    assert 'if key not in ["TEST"]]' in agent_code
+    assert "${" not in agent_code
+
+
+def test_check_agent_detects_hand_edits(maker, tmp_path):
+    edited = tmp_path / "AutoTestAgent.py"
+    with open(os.path.join(ROOT, "AutoTestAgent.py"), "r", encoding="utf-8") as f:
+        edited.write_text(f.read() + "# 手動修改\n", encoding="utf-8")
+    maker.agent_path = edited
+    assert not maker.check_agent()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""AgentMetrics 的 Histogram：百分位數誤差、合併與平均"""
+
+import random
+
+import pytest
+
+from AgentMetrics import Histogram, AgentMetrics
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) == 0.0
+    assert histogram.mean() == 0.0
+
+
+def test_small_values_are_exact():
+    histogram = Histogram()
+    for nanoseconds in range(1, 31):
+        histogram.record(nanoseconds / 1e9)
+    assert histogram.percentile(0.5) * 1e9 == pytest.approx(15)
+    assert histogram.percentile(1.0) * 1e9 == pytest.approx(30)
+
+
+@pytest.mark.parametrize("sub_bits", [3, 5, 7])
+def test_percentiles_within_bucket_error(sub_bits):
+    rng = random.Random(sub_bits)
+    values = sorted(rng.lognormvariate(-7, 1.5) for _ in range(20000))
+    histogram = Histogram(sub_bits)
+    for value in values:
+        histogram.record(value)
+
+    tolerance = 1.0 / (1 << (sub_bits - 1))
+    for ratio in (0.5, 0.9, 0.99, 0.999):
+        expected = values[int(ratio * len(values)) - 1]
+        assert histogram.percentile(ratio) == pytest.approx(expected, rel=tolerance)
+    assert histogram.percentile(1.0) == pytest.approx(values[-1], abs=1e-9)
+    assert histogram.min == round(values[0] * 1e9)
+    assert histogram.mean() == pytest.approx(sum(values) / len(values), rel=1e-6)
+
+
+def test_percentiles_stay_within_recorded_range():
+    histogram = Histogram()
+    histogram.record(0.001)
+    assert histogram.percentile(0.01) == histogram.percentile(0.99) == pytest.approx(0.001)
+    histogram.record(0.0010005)
+    assert 0.001 <= histogram.percentile(0.5) <= 0.0010005
+
+
+def test_merge_equals_recording_everything():
+    rng = random.Random(7)
+    first, second, combined = Histogram(), Histogram(), Histogram()
+    for index in range(5000):
+        value = rng.expovariate(1000)
+        (first if index % 2 else second).record(value)
+        combined.record(value)
+    first.merge(second)
+    assert first.counts == combined.counts
+    assert (first.count, first.total, first.min, first.max) == \
+        (combined.count, combined.total, combined.min, combined.max)
+    for ratio in (0.5, 0.99):
+        assert first.percentile(ratio) == combined.percentile(ratio)
+
+
+def test_metrics_counts_and_summary():
+    metrics = AgentMetrics({0: "GAME_FLOW_COPYRIGHT"})
+    metrics.record_parse(0.0001, 0)
+    metrics.record_frame(0.002)
+    metrics.record_dropped(3)
+    metrics.record_unchanged()
+    assert (metrics.frames, metrics.dropped, metrics.unchanged) == (1, 3, 1)
+    assert "丟棄=3" in metrics.summary()
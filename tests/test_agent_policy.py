@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""AgentPolicy：規則檔編譯成狀態查表、when 條件、select 選項與載入錯誤"""
+
+import json
+
+import pytest
+
+from AgentPolicy import RulePolicy, load_policy
+from ProtoSchema.GameFlowData_pb2 import GameFlowData, EGameFlowState, ETrack
+from ProtoSchema.InputCommand_pb2 import EInputKeyType
+
+SELECT_SCENE = EGameFlowState.GAME_FLOW_SELECT_SCENE
+
+
+def pressed(command):
+    assert command is not None and command.is_key_down
+    return list(command.key_inputs)
+
+
+def test_compile_resolves_names_into_state_table():
+    table = RulePolicy.compile([
+        {"state": "SELECT_SCENE", "when": {"selected_track": "TRACK_SEOUL"}, "keys": ["START"]},
+        {"state": "GAME_FLOW_SELECT_SCENE", "keys": ["RIGHT", "INPUT_KEY_LEFT"]},
+        {"state": EGameFlowState.GAME_FLOW_RACE, "when": {"player_coins": 2}, "keys": [EInputKeyType.INPUT_KEY_NITRO]},
+    ])
+    assert table == {
+        SELECT_SCENE: [
+            ((("selected_track", ETrack.TRACK_SEOUL),), [EInputKeyType.INPUT_KEY_START], None),
+            ((), [EInputKeyType.INPUT_KEY_RIGHT, EInputKeyType.INPUT_KEY_LEFT], None),
+        ],
+        EGameFlowState.GAME_FLOW_RACE: [((("player_coins", 2),), [EInputKeyType.INPUT_KEY_NITRO], None)],
+    }
+
+
+@pytest.mark.parametrize("rule, message", [
+    ({"state": "NO_SUCH_STATE", "keys": ["START"]}, "EGameFlowState"),
+    ({"state": "RACE", "keys": ["JUMP"]}, "EInputKeyType"),
+    ({"state": "RACE", "keys": []}, "keys 不可為空"),
+    ({"state": "RACE", "when": {"race_data": 1}, "keys": ["START"]}, "不支援的條件欄位"),
+    ({"state": "RACE", "select": {"field": "player_coins", "value": 1, "prev": "LEFT", "next": "RIGHT"}}, "選項欄位必須是枚舉"),
+    ({"keys": ["START"]}, "state"),
+])
+def test_compile_reports_bad_rule(rule, message):
+    with pytest.raises(ValueError, match=r"規則 #2 錯誤") as error:
+        RulePolicy.compile([{"state": "RACE", "keys": ["START"]}, rule])
+    assert message in str(error.value)
+
+
+def test_first_matching_rule_wins_and_unknown_state_falls_through():
+    policy = RulePolicy([
+        {"state": "SELECT_SCENE", "when": {"selected_track": "TRACK_SEOUL"}, "keys": ["START"]},
+        {"state": "SELECT_SCENE", "keys": ["RIGHT"]},
+    ])
+    game_data = GameFlowData(current_flow_state=SELECT_SCENE, selected_track=ETrack.TRACK_SEOUL)
+    assert pressed(policy(game_data)) == [EInputKeyType.INPUT_KEY_START]
+    game_data.selected_track = ETrack.TRACK_BEIJING
+    assert pressed(policy(game_data)) == [EInputKeyType.INPUT_KEY_RIGHT]
+    assert policy(GameFlowData(current_flow_state=EGameFlowState.GAME_FLOW_RACE)) is None
+
+
+def test_select_moves_toward_target_then_hands_over():
+    policy = RulePolicy([
+        {"state": "SELECT_SCENE",
+         "select": {"field": "selected_track", "value": "TRACK_SEOUL", "prev": "LEFT", "next": "RIGHT"}},
+        {"state": "SELECT_SCENE", "keys": ["START"]},
+    ])
+    game_data = GameFlowData(current_flow_state=SELECT_SCENE, selected_track=ETrack.TRACK_LAS_VEGAS)
+    assert pressed(policy(game_data)) == [EInputKeyType.INPUT_KEY_RIGHT]
+    game_data.selected_track = ETrack.TRACK_CHONGQING
+    assert pressed(policy(game_data)) == [EInputKeyType.INPUT_KEY_LEFT]
+    game_data.selected_track = ETrack.TRACK_SEOUL
+    assert pressed(policy(game_data)) == [EInputKeyType.INPUT_KEY_START]
+
+
+def test_load_policy_from_rule_file_and_module(tmp_path):
+    rule_file = tmp_path / "rules.json"
+    rule_file.write_text(json.dumps({"description": "一律確認", "rules": [{"state": "RACE", "keys": ["START"]}]}),
+                         encoding="utf-8")
+    policy = load_policy(str(rule_file))
+    assert policy.description == "一律確認"
+    assert pressed(policy(GameFlowData(current_flow_state=EGameFlowState.GAME_FLOW_RACE))) == \
+        [EInputKeyType.INPUT_KEY_START]
+
+    module_file = tmp_path / "my_policy.py"
+    module_file.write_text("def decide(game_data):\n    return None\n", encoding="utf-8")
+    assert load_policy(str(module_file))(GameFlowData()) is None
+
+    broken_file = tmp_path / "broken_policy.py"
+    broken_file.write_text("VALUE = 1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="decide"):
+        load_policy(str(broken_file))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""AgentReplay 以同一個 --seed 重播同一份錄製檔時，報告中的決策結果必須相同"""
+
+import os
+import sys
+import json
+import subprocess
+
+from FrameRecorder import FrameRecorder
+from GameSimulator import GameSimulator
+from ProtoSchema.GameFlowData_pb2 import EGameFlowState as S
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATES = [S.GAME_FLOW_COIN_PAGE, S.GAME_FLOW_SELECT_MODE, S.GAME_FLOW_SELECT_SCENE,
+          S.GAME_FLOW_SELECT_BIKE, S.GAME_FLOW_RACE, S.GAME_FLOW_RACE_FINISH_SHOW]
+# 與時間相關的欄位每次執行都不同，不列入比較
+TIMING_FIELDS = {"elapsed_seconds", "fps", "latency_p50_seconds", "latency_p99_seconds", "decide_p99_seconds"}
+
+
+def write_capture(path):
+    simulator = GameSimulator()
+    recorder = FrameRecorder(path)
+    timestamp = 0.0
+    for state in STATES:
+        simulator.set_state(state)
+        for _ in range(20):
+            recorder.record_received(simulator.frame(), timestamp)
+            timestamp += 1 / 60
+    recorder.close()
+
+
+def run_replay(cwd, report, seed):
+    # 以相對路徑執行，匯入 AutoTestAgent 不可改變工作目錄
+    completed = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "AgentReplay.py"), "frames.capture",
+         "--seed", str(seed), "--report", report, "--log-file", "replay.log"],
+        cwd=cwd, capture_output=True, text=True, timeout=60
+    )
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    with open(os.path.join(cwd, report), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def decisions(report):
+    return {key: value for key, value in report.items() if key not in TIMING_FIELDS}
+
+
+def test_same_seed_gives_same_report(tmp_path):
+    write_capture(str(tmp_path / "frames.capture"))
+    first = run_replay(str(tmp_path), "first.json", seed=7)
+    second = run_replay(str(tmp_path), "second.json", seed=7)
+
+    assert first["frames"] == len(STATES) * 20
+    assert first["commands"] > 0 and first["keys"]
+    assert decisions(first) == decisions(second)
+    assert (tmp_path / "replay.log").exists()
+    assert not os.path.exists(os.path.join(ROOT, "first.json"))
+
+
+def test_different_seed_changes_keys(tmp_path):
+    write_capture(str(tmp_path / "frames.capture"))
+    reports = [decisions(run_replay(str(tmp_path), f"seed_{seed}.json", seed=seed)) for seed in (1, 2, 3)]
+    assert any(report["keys"] != reports[0]["keys"] for report in reports[1:])
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""AsyncAutoTestAgent 對 GameSimulator 完成角色註冊、收發封包，遊戲端晚啟動時退避重試直到連上"""
+
+import asyncio
+import socket
+import threading
+import time
+
+from AsyncAutoTestAgent import AsyncAutoTestAgent
+from GameSimulator import SimulatorServer
+
+
+def make_async_agent(tmp_path, port, **kwargs):
+    return AsyncAutoTestAgent(host="127.0.0.1", port=port, log_file=str(tmp_path / "async.log"), echo=False,
+                              metrics_interval=0, input_configuration_file=None, **kwargs)
+
+
+async def run_for(agent, seconds):
+    try:
+        await asyncio.wait_for(agent.run(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+def serve(server, seconds, results, delay=0.0):
+    time.sleep(delay)
+    results.append(server.run(60, duration=seconds))
+
+
+def read_log(tmp_path):
+    with open(tmp_path / "async.log", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_async_agent_answers_every_frame(tmp_path):
+    server = SimulatorServer(port=0)
+    results = []
+    thread = threading.Thread(target=serve, args=(server, 2.0, results))
+    thread.start()
+    agent = make_async_agent(tmp_path, server.sock.getsockname()[1])
+    try:
+        asyncio.run(run_for(agent, 1.5))
+    finally:
+        thread.join(10)
+        server.close()
+
+    frames, commands = results[0]
+    assert frames > 0 and commands > 0
+    assert server.bad_packets == 0
+    assert agent.metrics.frames > 0 and agent.metrics.histograms["latency"].count == agent.metrics.frames
+    assert agent.transport is None and not agent.running
+    assert "✅ 遊戲連線成功，開始接收數據" in read_log(tmp_path)
+
+
+def test_async_agent_retries_until_game_starts(tmp_path):
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    agent = make_async_agent(tmp_path, port, reconnect_delay=0.05, reconnect_max_delay=0.2, receive_timeout=0.2)
+    results = []
+    holder = {}
+
+    def late_server():
+        # 遊戲端晚一點才啟動，agent 期間持續退避重試
+        time.sleep(0.8)
+        holder["server"] = SimulatorServer(port=port)
+        serve(holder["server"], 1.5, results)
+
+    thread = threading.Thread(target=late_server)
+    thread.start()
+    try:
+        asyncio.run(run_for(agent, 2.0))
+    finally:
+        thread.join(10)
+        if "server" in holder:
+            holder["server"].close()
+
+    log = read_log(tmp_path)
+    assert "❌ 遊戲連線中斷" in log
+    assert "✅ 遊戲連線成功，開始接收數據" in log
+    assert results and results[0][1] > 0
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""AutoTestBuilder 的多候選生成：第一個通過驗證的候選勝出並中止其餘呼叫 (以假的 call_qcli 取代 Q CLI)"""
+
+import os
+import sys
+import json
+import threading
+import textwrap
+import subprocess
+
+import pytest
+
+import AutoTestBuilder as builder_module
+from AutoTestBuilder import AutoTestBuilder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 遵守提示詞約定的最小候選：埠號與日誌檔取自環境變數
+CANDIDATE = textwrap.dedent('''\
+    #!/usr/bin/env python3
+    # -*- coding: utf-8 -*-
+    import os
+    import sys
+    import socket
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(script_dir)
+    sys.path.insert(0, script_dir)
+
+    from ProtoSchema.GameFlowData_pb2 import GameFlowData
+    from ProtoSchema.InputCommand_pb2 import InputCommand, EInputKeyType
+
+    class AutoTestAgent:
+        def __init__(self):
+            self.port = int(os.environ.get("AUTOTEST_UDP_PORT", PORT_DEFAULT))
+            self.log_file = os.environ.get("AUTOTEST_LOG_FILE", "AutoTestAgent_Custom.log")
+
+        def log(self, message):
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(message + "\\n")
+
+        def start(self):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.sendto(b"role:agent", ("127.0.0.1", self.port))
+            sock.recvfrom(1024)
+            self.log("connected")
+            while True:
+                data, addr = sock.recvfrom(4096)
+                game_data = GameFlowData()
+                game_data.ParseFromString(data)
+                command = InputCommand(key_inputs=[EInputKeyType.INPUT_KEY_START], is_key_down=True)
+                sock.sendto(command.SerializeToString(), addr)
+
+    if __name__ == "__main__":
+        AutoTestAgent().start()
+    ''')
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    monkeypatch.setattr(builder_module, "SMOKE_TEST_SECONDS", 0.5)
+    monkeypatch.setattr(builder_module, "SMOKE_REGISTER_TIMEOUT", 3)
+    return AutoTestBuilder(use_cache=False, candidates=3, timeout=30, log_file=str(tmp_path / "builder.log"))
+
+
+def candidate(port_default="8587"):
+    return CANDIDATE.replace("PORT_DEFAULT", port_default)
+
+
+def setting():
+    with open(os.path.join(ROOT, "GameSetting", "AutoTest_Game_Setting.md"), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_first_valid_candidate_wins_and_others_are_cancelled(builder):
+    # 埠號由設定以外的方式取得 (8000 + 587) 也能通過，冒煙測試不再改寫程式碼
+    valid = candidate("8000 + 587")
+    calls = []
+    lock = threading.Lock()
+    cancelled = threading.Event()
+    released = threading.Event()
+
+    def fake_call_qcli(prompt):
+        with lock:
+            calls.append(prompt)
+            call = len(calls)
+        if call == 1:
+            return "not python at all"
+        if call == 2:
+            return valid
+        # 第三個呼叫一直等到被 cancel_qcli 中止
+        if builder._cancelled.wait(30):
+            cancelled.set()
+        released.set()
+        return None
+
+    builder.call_qcli = fake_call_qcli
+    result = builder.generate_candidates("prompt", setting())
+    assert result is not None and 'os.environ.get("AUTOTEST_UDP_PORT", 8000 + 587)' in result
+    assert released.is_set() and cancelled.is_set()
+    assert len(calls) == 3
+    with open(builder.log_file, "r", encoding="utf-8") as f:
+        log = f.read()
+    assert "🏆 採用候選 #" in log and "冒煙測試通過" in log
+    assert not os.path.exists(os.path.join(ROOT, "AutoTestAgent_Custom.log"))
+
+
+def test_all_invalid_candidates_return_none(builder):
+    outputs = iter([None, "print('no agent here')", candidate().replace("class AutoTestAgent", "class Other")])
+    lock = threading.Lock()
+
+    def fake_call_qcli(prompt):
+        with lock:
+            return next(outputs)
+
+    builder.call_qcli = fake_call_qcli
+    assert builder.generate_candidates("prompt", setting()) is None
+    with open(builder.log_file, "r", encoding="utf-8") as f:
+        assert "3 個候選皆未通過驗證" in f.read()
+
+
+def test_candidate_ignoring_port_contract_fails_smoke_test(builder):
+    hardcoded = candidate().replace('int(os.environ.get("AUTOTEST_UDP_PORT", 8587))', "8587")
+    assert builder._check_candidate(hardcoded, 1) is False
+
+
+def test_candidate_ignoring_log_contract_fails_smoke_test(builder, tmp_path):
+    other_log = str(tmp_path / "elsewhere.log")
+    ignoring = candidate().replace('os.environ.get("AUTOTEST_LOG_FILE", "AutoTestAgent_Custom.log")', repr(other_log))
+    assert builder._check_candidate(ignoring, 1) is False
+    assert os.path.exists(other_log)
+
+
+def test_prompt_states_the_environment_contract(builder):
+    prompt = builder.build_qcli_prompt("每次都選首爾", setting(), "")
+    assert "AUTOTEST_UDP_PORT" in prompt and "AUTOTEST_LOG_FILE" in prompt
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("每次都選拉斯維加斯", [("GAME_FLOW_SELECT_SCENE", "selected_track", "TRACK_LAS_VEGAS")]),
+    ("選擇首爾", [("GAME_FLOW_SELECT_SCENE", "selected_track", "TRACK_SEOUL")]),
+    ("選上海賽道", [("GAME_FLOW_SELECT_SCENE", "selected_track", "TRACK_SHANGHAI")]),
+    ("選 MAA 車", [("GAME_FLOW_SELECT_BIKE", "selected_vehicle", "VEHICLE_MAA")]),
+    ("選逆時針", [("GAME_FLOW_SELECT_SCENE", "route_direction", "ROUTE_DIRECTION_COUNTER_CLOCK_WISE")]),
+    ("選拉斯維加斯，選MAA，逆時針", [("GAME_FLOW_SELECT_SCENE", "selected_track", "TRACK_LAS_VEGAS"),
+                                 ("GAME_FLOW_SELECT_SCENE", "route_direction", "ROUTE_DIRECTION_COUNTER_CLOCK_WISE"),
+                                 ("GAME_FLOW_SELECT_BIKE", "selected_vehicle", "VEHICLE_MAA")]),
+])
+def test_compile_rule_command(builder, command, expected):
+    rules = builder.compile_rule_command(command, setting())
+    selects = [(rule["state"], rule["select"]["field"], rule["select"]["value"]) for rule in rules if "select" in rule]
+    assert selects == expected
+    # 每個有選擇的流程最後以確認鍵離開
+    for state in {state for state, _, _ in expected}:
+        assert {"state": state, "keys": ["START"]} in rules
+
+
+@pytest.mark.parametrize("command", [
+    "隨機選賽道",
+    "每次隨機選一台車",
+    "依序選每個賽道",
+    "選首爾和上海",
+    "選 MAA 或 MUR 車",
+    "開始遊戲",
+])
+def test_compile_rule_command_rejects(builder, command):
+    assert builder.compile_rule_command(command, setting()) is None
+
+
+def test_rule_launcher_passes_custom_log_file(builder, tmp_path, monkeypatch):
+    builder.output_path = str(tmp_path / "AutoTestAgent_Custom.py")
+    builder.rules_path = str(tmp_path / "AutoTestAgent_Custom.json")
+    builder.write_rule_agent("選擇首爾", builder.compile_rule_command("選擇首爾", setting()))
+    # 以只記錄參數的 AutoTestAgent.py 取代真正的 agent
+    (tmp_path / "AutoTestAgent.py").write_text(
+        "import sys, json\njson.dump(sys.argv[1:], open('argv.json', 'w'))\n", encoding="utf-8")
+
+    def launch(env):
+        subprocess.run([sys.executable, builder.output_path], cwd=str(tmp_path), env=env, check=True, timeout=30)
+        with open(tmp_path / "argv.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    env = {key: value for key, value in os.environ.items() if key != builder_module.ENV_LOG_FILE}
+    argv = launch(env)
+    assert argv[argv.index("--log-file") + 1] == "AutoTestAgent_Custom.log"
+    assert argv[argv.index("--policy") + 1] == builder.rules_path
+
+    argv = launch(dict(env, **{builder_module.ENV_LOG_FILE: "smoke.log"}))
+    assert argv[argv.index("--log-file") + 1] == "smoke.log"
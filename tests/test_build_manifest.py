@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""BuildManifest 與 AgentMaker 的增量建置：輸入、設定、產物都未變更時略過，否則重新生成"""
+
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+from AgentMaker import AgentMaker
+from BuildManifest import BuildManifest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    source = tmp_path / "source.txt"
+    artifact = tmp_path / "artifact.txt"
+    source.write_text("v1", encoding="utf-8")
+    artifact.write_text("built from v1", encoding="utf-8")
+    manifest = BuildManifest(tmp_path / "manifest.json", tmp_path)
+    manifest.record(artifact, [source], recipe="r1", valid=True)
+    manifest.save()
+    return tmp_path, source, artifact
+
+
+def reload(tmp_path):
+    return BuildManifest(tmp_path / "manifest.json", tmp_path)
+
+
+def test_unchanged_inputs_are_up_to_date(workspace):
+    tmp_path, source, artifact = workspace
+    assert reload(tmp_path).outdated(artifact, [source], "r1") == []
+
+
+@pytest.mark.parametrize("change, reason", [
+    (lambda source, artifact: source.write_text("v2", encoding="utf-8"), "輸入變更: source.txt"),
+    (lambda source, artifact: artifact.write_text("hand edited", encoding="utf-8"), "產物與記錄不符"),
+    (lambda source, artifact: artifact.unlink(), "產物不存在"),
+])
+def test_changed_files_need_rebuild(workspace, change, reason):
+    tmp_path, source, artifact = workspace
+    change(source, artifact)
+    assert reason in reload(tmp_path).outdated(artifact, [source], "r1")
+
+
+def test_changed_recipe_or_inputs_need_rebuild(workspace):
+    tmp_path, source, artifact = workspace
+    manifest = reload(tmp_path)
+    assert manifest.outdated(artifact, [source], "r2") == ["生成設定變更"]
+    extra = tmp_path / "extra.txt"
+    extra.write_text("x", encoding="utf-8")
+    assert manifest.outdated(artifact, [source, extra], "r1") == ["輸入變更: extra.txt"]
+    assert manifest.outdated(tmp_path / "other.txt", [source], "r1") == ["尚無建置記錄"]
+
+
+def test_invalid_build_is_rebuilt(workspace):
+    tmp_path, source, artifact = workspace
+    manifest = reload(tmp_path)
+    manifest.record(artifact, [source], recipe="r1", valid=False)
+    assert manifest.outdated(artifact, [source], "r1") == ["上次驗證未通過"]
+
+
+def test_save_is_stable(workspace):
+    tmp_path, source, artifact = workspace
+    before = (tmp_path / "manifest.json").read_bytes()
+    manifest = reload(tmp_path)
+    manifest.record(artifact, [source], recipe="r1", valid=True)
+    manifest.save()
+    assert (tmp_path / "manifest.json").read_bytes() == before
+
+
+def test_cli_exits_non_zero_on_stale_entries(workspace):
+    tmp_path, source, artifact = workspace
+    command = [sys.executable, os.path.join(ROOT, "BuildManifest.py"), str(tmp_path / "manifest.json")]
+    assert subprocess.run(command, capture_output=True).returncode == 0
+    source.write_text("v2", encoding="utf-8")
+    result = subprocess.run(command, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 1
+    assert "輸入變更" in result.stdout
+
+
+def test_committed_manifest_is_up_to_date():
+    command = [sys.executable, os.path.join(ROOT, "BuildManifest.py")]
+    result = subprocess.run(command, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 0, result.stdout
+
+
+@pytest.fixture
+def sandbox_maker(tmp_path):
+    """AgentMaker 的產物、模板、建置清單與日誌都改到暫存目錄"""
+    template = tmp_path / "AutoTestAgent.py.template"
+    shutil.copy(os.path.join(ROOT, "Templates", "AutoTestAgent.py.template"), template)
+
+    def make(force=False):
+        maker = AgentMaker(use_cache=False, force=force, log_file=tmp_path / "AgentMaker.log")
+        maker.template_path = template
+        maker.agent_path = tmp_path / "AutoTestAgent.py"
+        maker.input_configuration_path = tmp_path / "InputConfiguration.pb"
+        maker.manifest = BuildManifest(tmp_path / "manifest.json", maker.project_root)
+        return maker
+
+    def log():
+        return (tmp_path / "AgentMaker.log").read_text(encoding="utf-8")
+
+    return make, template, log
+
+
+def test_agent_maker_skips_unchanged_and_rebuilds_on_change(sandbox_maker, tmp_path):
+    make, template, log = sandbox_maker
+    make().run()
+    assert "✅ AutoTestAgent 生成完成" in log()
+    built = (tmp_path / "AutoTestAgent.py").stat().st_mtime_ns
+
+    make().run()
+    assert "⏭️ AutoTestAgent.py: 已是最新" in log()
+    assert "⏭️ InputConfiguration.pb: 已是最新" in log()
+    assert (tmp_path / "AutoTestAgent.py").stat().st_mtime_ns == built
+
+    template.write_text(template.read_text(encoding="utf-8") + "# 新增\n", encoding="utf-8")
+    make().run()
+    assert "輸入變更: AutoTestAgent.py.template" in log()
+    assert (tmp_path / "AutoTestAgent.py").read_text(encoding="utf-8").endswith("# 新增\n")
+
+    (tmp_path / "AutoTestAgent.py").write_text("# 手動修改\n", encoding="utf-8")
+    make().run()
+    assert "產物與記錄不符" in log()
+
+
+def test_agent_maker_force_rebuilds_everything(sandbox_maker):
+    make, template, log = sandbox_maker
+    make().run()
+    make(force=True).run()
+    assert "🔄 InputConfiguration.pb: 強制重新生成" in log()
+    assert "🔄 AutoTestAgent.py: 強制重新生成" in log()
+    assert "✅ AutoTestAgent 生成完成" in log()
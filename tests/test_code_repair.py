@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""CodeRepair：線性時間重新斷行需與原本的逐字元實作 (_legacy_reformat) 結果一致"""
+
+import os
+import glob
+import random
+
+import pytest
+
+from CodeRepair import (KEYWORDS, MAX_LINE, reformat_joined_code, repair_split_lines, _legacy_reformat,
+                        garble, is_split_by_char)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("joined", [
+    "",
+    "#!/usr/bin/env python3# -*- coding: utf-8 -*-importsys",
+    'defmain():"""說明"""print("a:b")returnNone',
+    "x" * (MAX_LINE * 3 + 7),
+    "a" * (MAX_LINE - 2) + ":" + "b" * 5,
+    'if__name__=="__main__":main()',
+    '""""""::""',
+])
+def test_matches_legacy_on_edge_cases(joined):
+    assert reformat_joined_code(joined) == _legacy_reformat(joined)
+
+
+def test_matches_legacy_on_random_input():
+    rng = random.Random(20240501)
+    alphabet = list('ab :"x=()') + KEYWORDS + ['"""', '::'] + ['a'] * 20
+    for _ in range(500):
+        joined = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 300)))
+        assert reformat_joined_code(joined) == _legacy_reformat(joined), joined
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(ROOT, "*.py")))[:8])
+def test_matches_legacy_on_project_sources(path):
+    with open(path, "r", encoding="utf-8") as f:
+        lines = garble(f.read(), 10_000).split("\n")
+    joined = ''.join(line.strip() for line in lines if line.strip())
+    assert repair_split_lines(lines) == _legacy_reformat(joined)
+
+
+def test_coding_line_is_not_split():
+    repaired = reformat_joined_code("#!/usr/bin/env python3# -*- coding: utf-8 -*-import os")
+    assert repaired.split("\n")[:2] == ["#!/usr/bin/env python3", "# -*- coding: utf-8 -*-"]
+
+
+def test_lines_never_exceed_legacy_limit():
+    repaired = reformat_joined_code("y" * 1000 + "defx():" + "z" * 500)
+    assert max(len(line) for line in repaired.split("\n")) <= MAX_LINE + 1
+
+
+def test_is_split_by_char():
+    assert is_split_by_char(list("importos"))
+    assert not is_split_by_char(["import os", "x = 1", "a"])
+    assert is_split_by_char(["a"] * 10 + ["long line"] * 100, sample=10)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""FrameRecorder：收發兩個執行緒同時寫入時紀錄與索引不交錯"""
+
+import threading
+
+from FrameRecorder import FrameRecorder, FrameReader, RECORD_RECEIVED, RECORD_SENT, RECORD_HEADER
+
+
+def test_concurrent_writers_produce_readable_capture(tmp_path):
+    capture = str(tmp_path / "frames.capture")
+    recorder = FrameRecorder(capture, index_interval=50, buffer_size=4096)
+    count = 5000
+
+    def receive():
+        for i in range(count):
+            recorder.record_received(b"R" * (i % 37 + 1), timestamp=float(i))
+
+    def send():
+        for i in range(count):
+            recorder.record_sent(b"S" * (i % 23 + 1), timestamp=float(i))
+
+    threads = [threading.Thread(target=receive), threading.Thread(target=send)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.close()
+    recorder.record_sent(b"late")              # 關閉後的紀錄直接忽略
+
+    reader = FrameReader(capture)
+    records = list(reader.records())
+    received = [payload for record_type, _, payload in records if record_type == RECORD_RECEIVED]
+    sent = [payload for record_type, _, payload in records if record_type == RECORD_SENT]
+    assert len(received) == len(sent) == count
+    assert all(set(payload) == {ord("R")} for payload in received)
+    assert all(set(payload) == {ord("S")} for payload in sent)
+
+    index = reader.index()
+    assert sorted(index) == list(range(count))
+    with open(capture, "rb") as f:
+        data = f.read()
+    for frame, offset in index.items():
+        record_type, timestamp, length = RECORD_HEADER.unpack_from(data, offset)
+        assert record_type == RECORD_RECEIVED and timestamp == float(frame)
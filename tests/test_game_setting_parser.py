@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""GameSettingParser：流程狀態、按鍵、屏蔽清單、操作流程與內容雜湊快取"""
+
+import os
+import json
+
+import pytest
+
+import GameSettingParser
+from GameSettingParser import parse_game_setting, game_spec_from_content, load_game_spec, to_enum_suffix
+from AgentMaker import AgentMaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTING_PATH = os.path.join(ROOT, "GameSetting", "AutoTest_Game_Setting.md")
+
+SAMPLE = """
+## 1. 枚舉
+```cpp
+enum class EGameFlowState: uint8
+{
+    Copyright = 0,
+    // 投幣頁
+    CoinPage,
+    /* 選擇
+       場景 */
+    SelectScene = 5,
+    MAX
+};
+
+enum class EInputKeyType: uint8
+{
+    Left,
+    Right,
+    Start,  // 確認
+    SeatDetact,
+    MAX
+};
+```
+
+```cpp
+BLOCKED_DIGITAL_KEYS = [
+    "SeatDetact",   // 座椅偵測
+    // "Start",
+    "Right"
+];
+BLOCKED_VR_KEYS = ["Steer"];
+```
+
+UDP_HOST = "10.0.0.2"   # 遊戲主機
+UDP_PORT = 9000
+
+## 2. 需要操作的流程
+#### 2.1 賽道選擇 (EGameFlowState::SelectScene)
+**按鍵操作**
+- Left、Right，Start
+**操作邏輯**
+- ETrack：Left、Right 切換賽道
+"""
+
+
+@pytest.mark.parametrize("name, suffix", [
+    ("CoinPage", "COIN_PAGE"), ("UELogo", "UE_LOGO"), ("PV", "PV"), ("M23Read", "M23_READ"),
+    ("SeatDetact", "SEAT_DETACT"), ("AirspringAdjust", "AIRSPRING_ADJUST"),
+])
+def test_to_enum_suffix(name, suffix):
+    assert to_enum_suffix(name) == suffix
+
+
+def test_parse_sample_enums_with_numbers_and_aliases():
+    spec = parse_game_setting(SAMPLE)
+    flow = spec.enums["EGameFlowState"]
+    assert [(item.number, item.name) for item in flow.items] == \
+        [(0, "Copyright"), (1, "CoinPage"), (5, "SelectScene"), (6, "MAX")]
+    assert flow.items[1].aliases == ["CoinPage", "投幣頁"]
+    assert flow.items[2].aliases == ["SelectScene", "選擇", "場景"]
+    assert spec.states == ["Copyright", "CoinPage", "SelectScene"]
+    assert spec.keys == ["Left", "Right", "Start", "SeatDetact"]
+    assert spec.enums["EInputKeyType"].items[2].aliases == ["Start", "確認"]
+
+
+def test_parse_sample_blocked_lists_udp_and_flows():
+    spec = parse_game_setting(SAMPLE)
+    assert spec.blocked == {"BLOCKED_DIGITAL_KEYS": ["SeatDetact", "Right"], "BLOCKED_VR_KEYS": ["Steer"]}
+    assert spec.blocked_keys == ["SeatDetact", "Right"]
+    assert spec.blocked_vr_keys == ["Steer"]
+    assert spec.udp_config == {"host": "10.0.0.2", "port": 9000}
+    assert spec.flow_operations() == {"SelectScene": ["Left", "Right", "Start"]}
+    assert [flow.options for flow in spec.option_flows] == [[("ETrack", "Left", "Right")]]
+
+
+def test_parse_project_setting():
+    spec = load_game_spec(SETTING_PATH, cache_dir=None)
+    assert len(spec.states) == 40
+    assert spec.states[:4] == ["Copyright", "Warning", "Logo", "PV"]
+    assert spec.keys[-1] == "SeatDetact"
+    assert spec.vr_keys == ["Throttle", "RightBrake", "LeftBrake", "Steer"]
+    assert spec.blocked_keys == ["Emergency", "Test", "LeftLeg", "RightLeg", "SeatDetact", "Service"]
+    assert spec.udp_config == {"host": "127.0.0.1", "port": 8587}
+    assert spec.flow_operations()["CoinPage"] == ["Coin", "Nitro"]
+    assert ("ERouteDirection", "Up", "Down") in next(flow for flow in spec.flows if flow.name == "SelectScene").options
+
+
+def test_blocked_keys_map_to_proto_enum_names():
+    spec = load_game_spec(SETTING_PATH, cache_dir=None)
+    maker = AgentMaker(use_cache=False)
+    assert maker._map_blocked_keys(spec.blocked_keys) == \
+        ["EMERGENCY", "TEST", "LEFT_LEG", "RIGHT_LEG", "SEAT_DETECT", "SERVICE"]
+
+
+@pytest.fixture
+def fresh_memo(monkeypatch):
+    monkeypatch.setattr(GameSettingParser, "_memo", {})
+
+
+def cache_files(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(".json")) if os.path.isdir(cache_dir) else []
+
+
+def test_cache_roundtrip_and_memo(tmp_path, fresh_memo):
+    cache_dir = str(tmp_path / "cache")
+    spec = game_spec_from_content(SAMPLE, cache_dir)
+    assert game_spec_from_content(SAMPLE, cache_dir) is spec
+    assert len(cache_files(cache_dir)) == 1
+
+    GameSettingParser._memo.clear()
+    cached = game_spec_from_content(SAMPLE, cache_dir)
+    assert cached is not spec
+    assert cached.to_dict() == spec.to_dict()
+
+
+def test_cache_invalidated_by_content_and_parser_version(tmp_path, fresh_memo, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    game_spec_from_content(SAMPLE, cache_dir)
+    changed = game_spec_from_content(SAMPLE.replace("    Left,\n", "    Left,\n    Up,\n"), cache_dir)
+    assert changed.keys == ["Left", "Up", "Right", "Start", "SeatDetact"]
+    assert len(cache_files(cache_dir)) == 2
+
+    monkeypatch.setattr(GameSettingParser, "PARSER_VERSION", GameSettingParser.PARSER_VERSION + 1)
+    game_spec_from_content(SAMPLE, cache_dir)
+    assert len(cache_files(cache_dir)) == 3
+
+
+def test_corrupt_cache_is_reparsed(tmp_path, fresh_memo):
+    cache_dir = str(tmp_path / "cache")
+    game_spec_from_content(SAMPLE, cache_dir)
+    path = os.path.join(cache_dir, cache_files(cache_dir)[0])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1}, f)
+
+    GameSettingParser._memo.clear()
+    spec = game_spec_from_content(SAMPLE, cache_dir)
+    assert spec.keys == ["Left", "Right", "Start", "SeatDetact"]
+    with open(path, "r", encoding="utf-8") as f:
+        assert "enums" in json.load(f)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""GameSimulator 的流程：投幣與確認鍵推進狀態、選項鍵循環切換、停留時間到了自動前進"""
+
+import pytest
+
+from GameSimulator import GameSimulator, S, K
+from ProtoSchema.InputCommand_pb2 import InputCommand, ComplexInputCommand, EInputVrType
+
+
+def at(state, **kwargs):
+    simulator = GameSimulator(**kwargs)
+    simulator.set_state(state)
+    return simulator
+
+
+def send(simulator, key, is_key_down=True):
+    simulator.apply_input(InputCommand(key_inputs=[key], is_key_down=is_key_down).SerializeToString())
+
+
+def test_coin_page_needs_a_coin_before_start():
+    simulator = at(S.GAME_FLOW_COIN_PAGE)
+    send(simulator, K.INPUT_KEY_START)
+    assert simulator.state == S.GAME_FLOW_COIN_PAGE
+    send(simulator, K.INPUT_KEY_COIN)
+    send(simulator, K.INPUT_KEY_COIN)
+    assert simulator.game_data.player_coins == 2
+    send(simulator, K.INPUT_KEY_NITRO)
+    assert simulator.state == S.GAME_FLOW_M23_READ
+    assert simulator.game_data.player_coins == 1
+
+
+def test_start_walks_the_selection_flow():
+    simulator = at(S.GAME_FLOW_SELECT_MODE)
+    visited = [simulator.state]
+    for _ in range(4):
+        send(simulator, K.INPUT_KEY_START)
+        visited.append(simulator.state)
+    assert visited == [S.GAME_FLOW_SELECT_MODE, S.GAME_FLOW_PHOTO_AUTH, S.GAME_FLOW_SELECT_SCENE,
+                       S.GAME_FLOW_SELECT_BIKE, S.GAME_FLOW_LOAD_GAME]
+
+
+def test_option_keys_cycle_fields():
+    simulator = at(S.GAME_FLOW_SELECT_SCENE)
+    send(simulator, K.INPUT_KEY_LEFT)
+    assert simulator.game_data.selected_track == 10                 # 11 個賽道，往左繞回最後一個
+    send(simulator, K.INPUT_KEY_RIGHT)
+    send(simulator, K.INPUT_KEY_RIGHT)
+    assert simulator.game_data.selected_track == 1
+    send(simulator, K.INPUT_KEY_DOWN)
+    assert simulator.game_data.route_direction == 1
+    assert simulator.state == S.GAME_FLOW_SELECT_SCENE
+
+
+def test_key_release_and_unrelated_keys_do_nothing():
+    simulator = at(S.GAME_FLOW_SELECT_BIKE)
+    send(simulator, K.INPUT_KEY_START, is_key_down=False)
+    send(simulator, K.INPUT_KEY_COIN)
+    assert simulator.state == S.GAME_FLOW_SELECT_BIKE
+    assert simulator.transitions == 1
+
+
+@pytest.mark.parametrize("state, next_state", [
+    (S.GAME_FLOW_COPYRIGHT, S.GAME_FLOW_WARNING),
+    (S.GAME_FLOW_PV, S.GAME_FLOW_COIN_PAGE),
+    (S.GAME_FLOW_RIDE_SHOW, S.GAME_FLOW_RACE),
+    (S.GAME_FLOW_GAME_OVER, S.GAME_FLOW_COIN_PAGE),
+])
+def test_auto_transitions_after_dwell_time(state, next_state):
+    simulator = at(state)
+    simulator.tick()
+    assert simulator.state == state
+    simulator.state_since -= 10
+    simulator.tick()
+    assert simulator.state == next_state
+
+
+def complex_command(releases=(), presses=(), **axes):
+    command = ComplexInputCommand()
+    if releases:
+        command.digital_inputs.add(key_inputs=list(releases), is_key_down=False)
+    if presses:
+        command.digital_inputs.add(key_inputs=list(presses), is_key_down=True)
+    for name, value in axes.items():
+        command.analog_inputs.add(vr_type=EInputVrType.Value(f"INPUT_VR_{name}"), value=value)
+    return command.SerializeToString()
+
+
+def test_complex_input_presses_only_key_down():
+    simulator = at(S.GAME_FLOW_SELECT_MODE, input_format="complex")
+    simulator.apply_input(complex_command(presses=[K.INPUT_KEY_RIGHT]))
+    simulator.apply_input(complex_command(releases=[K.INPUT_KEY_RIGHT], presses=[K.INPUT_KEY_START]))
+    assert simulator.game_data.selected_mode == 1
+    assert simulator.state == S.GAME_FLOW_PHOTO_AUTH
+
+
+def test_complex_input_clamps_analog_axes():
+    simulator = at(S.GAME_FLOW_RACE, input_format="complex")
+    simulator.apply_input(complex_command(STEER=-2.0, THROTTLE=0.5))
+    assert (simulator.steer, simulator.throttle) == (-1.0, 0.5)
+    # 換狀態時清除轉向
+    simulator.set_state(S.GAME_FLOW_RACE_FINISH_SHOW)
+    assert simulator.steer == 0.0
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""InputScheduler 與 TimerWheel：到期順序、按鍵重複頻率與 token bucket 限制"""
+
+import random
+
+import pytest
+
+from InputScheduler import TimerWheel, InputScheduler
+
+
+def test_timer_wheel_returns_items_in_due_order():
+    wheel = TimerWheel(tick=0.01, slots=8)
+    wheel.schedule(0.05, "c")
+    wheel.schedule(0.01, "a")
+    wheel.schedule(0.03, "b")
+    assert len(wheel) == 3
+    assert wheel.advance(0.02) == ["a"]
+    assert wheel.advance(0.10) == ["b", "c"]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_keeps_events_beyond_one_round():
+    wheel = TimerWheel(tick=0.01, slots=4)
+    # 0.02 與 0.10 落在同一格，後者需再繞兩圈才到期
+    wheel.schedule(0.10, "late")
+    wheel.schedule(0.02, "early")
+    assert wheel.advance(0.05) == ["early"]
+    assert wheel.advance(0.09) == []
+    assert wheel.advance(0.10) == ["late"]
+
+
+def test_timer_wheel_schedules_past_events_on_next_advance():
+    wheel = TimerWheel(tick=0.01, slots=8, start=1.0)
+    wheel.schedule(0.5, "overdue")
+    assert wheel.advance(1.0) == ["overdue"]
+
+
+def test_timer_wheel_jumps_over_idle_gap():
+    wheel = TimerWheel(tick=0.001, slots=8)
+    assert wheel.advance(1e9) == []
+    assert wheel.current_tick == int(1e9 / 0.001) + 1
+    wheel.schedule(1e9 + 0.004, "after idle")
+    assert wheel.advance(1e9 + 0.01) == ["after idle"]
+
+
+def test_timer_wheel_catches_up_in_one_revolution():
+    wheel = TimerWheel(tick=0.001, slots=8)
+    wheel.schedule(1e6, "late")
+    wheel.schedule(0.02, "b")
+    wheel.schedule(0.003, "a")
+    wheel.schedule(0.02, "c")
+    assert wheel.advance(1e5) == ["a", "b", "c"]
+    assert len(wheel) == 1
+    assert wheel.advance(1e6 - 0.01) == []
+    assert wheel.advance(1e6) == ["late"]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_catch_up_matches_tick_by_tick_order():
+    rng = random.Random(7)
+    wheel = TimerWheel(tick=0.01, slots=4)
+    pending, now, order = [], 0.0, 0
+    for _ in range(200):
+        for _ in range(rng.randrange(3)):
+            at = now + rng.uniform(-0.05, 0.5)
+            target = max(int(at / wheel.tick), wheel.current_tick)
+            wheel.schedule(at, order)
+            pending.append((target, order))
+            order += 1
+        now += rng.choice([0.005, 0.03, 0.2])
+        now_tick = int(now / wheel.tick)
+        expected = sorted(entry for entry in pending if entry[0] <= now_tick)
+        pending = [entry for entry in pending if entry[0] > now_tick]
+        assert wheel.advance(now) == [item for _, item in expected]
+        assert len(wheel) == len(pending)
+
+
+def make_scheduler(**options):
+    return InputScheduler(clock=lambda: 0.0, **options)
+
+
+def test_press_schedules_release_after_hold():
+    scheduler = make_scheduler(hold=0.1, tick=0.01)
+    assert scheduler.press("UP", 0.0)
+    assert scheduler.due(0.0) == ([], ["UP"])
+    assert scheduler.due(0.05) == ([], [])
+    assert scheduler.due(0.1) == (["UP"], [])
+    assert not scheduler.held
+
+
+def test_press_rejects_held_key_and_key_rate():
+    scheduler = make_scheduler(hold=0.1, key_rate=5.0, tick=0.01)
+    assert scheduler.press("UP", 0.0)
+    assert not scheduler.press("UP", 0.05)     # 仍按著
+    scheduler.due(0.15)
+    assert not scheduler.press("UP", 0.15)     # 放開了但未滿 1/5 秒
+    assert scheduler.press("UP", 0.2)
+    assert scheduler.press("DOWN", 0.2)        # 頻率限制以按鍵為單位
+    assert scheduler.rejected == 2
+
+
+def test_token_bucket_limits_burst_and_refills_at_max_rate():
+    scheduler = make_scheduler(max_rate=100.0)
+    assert scheduler.burst == pytest.approx(5.0)
+    sent = 0
+    while scheduler.ready(0.0):
+        scheduler.take()
+        sent += 1
+    assert sent == 5
+    assert not scheduler.ready(0.005)
+    assert scheduler.ready(0.01)               # 0.01 秒補回 1 個 token
+    scheduler.take()
+    assert not scheduler.ready(0.01)
+    # 長時間閒置後最多只補到 burst
+    assert scheduler.ready(10.0)
+    assert scheduler.tokens == pytest.approx(scheduler.burst)
+    assert scheduler.sent == 6
+
+
+def test_release_all_clears_pending_events():
+    scheduler = make_scheduler(hold=1.0, tick=0.01)
+    scheduler.press("UP", 0.0)
+    scheduler.press("DOWN", 0.0)
+    assert sorted(scheduler.release_all()) == ["DOWN", "UP"]
+    assert scheduler.due(2.0) == ([], [])
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""ProtoBuilder：由 GameSetting.md 重新產生的 .proto/_pb2.py 與專案內的檔案一致，插入、重新排序枚舉值時名稱與註解不錯位"""
+
+import os
+import re
+
+import pytest
+from google.protobuf import descriptor_pool
+
+import ProtoBuilder
+from ProtoBuilder import (PROTO_FILES, ProtoSyntaxError, generate_outputs, parse_proto, pin_names,
+                          compile_builtin, existing_enums, resolve_compiler)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTING_PATH = os.path.join(ROOT, "GameSetting", "AutoTest_Game_Setting.md")
+SCHEMA_DIR = os.path.join(ROOT, "ProtoSchema")
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def generate(setting_path=SETTING_PATH, **options):
+    options.setdefault("cache_dir", None)
+    options.setdefault("log", lambda message: None)
+    return generate_outputs(setting_path=setting_path, output_dir=SCHEMA_DIR, compiler="builtin", **options)
+
+
+def enum_values(proto_text, enum_name):
+    """.proto 中指定枚舉的 [(名稱, 數值, 註解)]"""
+    body = re.search(r'enum %s \{(.*?)\}' % enum_name, proto_text, re.S).group(1)
+    return [(name, int(number), comment) for name, number, comment in
+            re.findall(r'^\s*(\w+) = (\d+);\s*(?://\s*(.*))?$', body, re.M)]
+
+
+def edited_setting(tmp_path, old, new):
+    content = read(SETTING_PATH)
+    assert old in content
+    path = tmp_path / "GameSetting.md"
+    path.write_text(content.replace(old, new, 1), encoding="utf-8")
+    return str(path)
+
+
+def test_regenerates_committed_schema_byte_for_byte():
+    outputs = generate()
+    assert sorted(outputs) == sorted(PROTO_FILES + [name.replace(".proto", "_pb2.py") for name in PROTO_FILES])
+    for name, content in outputs.items():
+        assert content == read(os.path.join(SCHEMA_DIR, name)), name
+
+
+def test_builtin_compiles_committed_protos_byte_for_byte():
+    # 內建編譯只是未安裝 grpcio-tools 時的備援，直接編譯提交的 .proto 必須與提交的 _pb2.py 完全相同
+    proto_texts = {name: read(os.path.join(SCHEMA_DIR, name)) for name in PROTO_FILES}
+    outputs = compile_builtin(proto_texts)
+    assert sorted(outputs) == sorted(name.replace(".proto", "_pb2.py") for name in PROTO_FILES)
+    for name, content in outputs.items():
+        assert content == read(os.path.join(SCHEMA_DIR, name)), name
+
+
+def test_auto_warns_when_falling_back_to_builtin(monkeypatch):
+    messages = []
+    monkeypatch.setattr(ProtoBuilder.importlib.util, "find_spec", lambda name: None)
+    generate_outputs(setting_path=SETTING_PATH, output_dir=SCHEMA_DIR, cache_dir=None, compiler="auto",
+                     log=messages.append)
+    assert any("未安裝 grpcio-tools" in message for message in messages)
+    messages.clear()
+    generate(log=messages.append)                                   # 明確指定 builtin 時不警告
+    assert not messages
+
+
+def test_keeps_hand_written_comments_and_pinned_names():
+    keys = enum_values(generate()["InputCommand.proto"], "EInputKeyType")
+    assert ("INPUT_KEY_EMERGENCY", 9, "安全裝置 - Motion Stop") in keys
+    assert ("INPUT_KEY_SPEED_UP", 12, "加速按鈕 - Lean over") in keys
+    # GameSetting.md 拼成 SeatDetact，沿用既有的 SEAT_DETECT
+    assert ("INPUT_KEY_SEAT_DETECT", 14, "安全裝置 - 座椅偵測") in keys
+
+
+def test_insert_state_before_select_bike(tmp_path):
+    setting = edited_setting(tmp_path, "    // 選擇車輛\n    SelectBike,", "    // 教學\n    Tutorial,\n    // 選擇車輛\n    SelectBike,")
+    outputs = generate(setting)
+    states = enum_values(outputs["GameFlowData.proto"], "EGameFlowState")
+    names = [name for name, _, _ in states]
+    assert len(names) == len(set(names))
+    assert states[4:8] == [("GAME_FLOW_COIN_PAGE", 4, "投幣頁"), ("GAME_FLOW_TUTORIAL", 5, "教學"),
+                           ("GAME_FLOW_SELECT_BIKE", 6, "選擇車輛"), ("GAME_FLOW_SELECT_SCENE", 7, "選擇場景")]
+    assert states[-1] == ("GAME_FLOW_MAX", 41, "")
+    assert "GAME_FLOW_TUTORIAL = 5" in outputs["GameFlowData.proto"]
+    assert "INPUT_KEY_SEAT_DETECT" in outputs["InputCommand.proto"]
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.AddSerializedFile(parse_proto(outputs["GameFlowData.proto"], "GameFlowData.proto").SerializeToString())
+    flow_state = pool.FindEnumTypeByName("sr4.EGameFlowState")
+    assert flow_state.values_by_name["GAME_FLOW_SELECT_SCENE"].number == 7
+    assert flow_state.values_by_number[5].name == "GAME_FLOW_TUTORIAL"
+    assert outputs["GameFlowData_pb2.py"] != read(os.path.join(SCHEMA_DIR, "GameFlowData_pb2.py"))
+
+
+def test_reorder_tracks_keeps_names_and_comments_together(tmp_path):
+    setting = edited_setting(tmp_path, "    // 北京\n    Beijing,\n    // 首爾\n    Seoul,",
+                             "    // 首爾\n    Seoul,\n    // 北京\n    Beijing,")
+    tracks = enum_values(generate(setting)["GameFlowData.proto"], "ETrack")
+    assert tracks[2:4] == [("TRACK_SEOUL", 2, "首爾"), ("TRACK_BEIJING", 3, "北京")]
+
+
+def test_removed_value_is_reported(tmp_path):
+    setting = edited_setting(tmp_path, "    // 重慶\n    Chongqing,\n", "")
+    messages = []
+    outputs = generate_outputs(setting_path=setting, output_dir=SCHEMA_DIR, cache_dir=None, compiler="builtin",
+                               log=messages.append)
+    assert "TRACK_CHONGQING" not in outputs["GameFlowData.proto"]
+    assert any("TRACK_CHONGQING" in message and "已不存在" in message for message in messages)
+
+
+def test_pin_names_only_pairs_names_unique_to_each_side():
+    existing = ["KEY_UP", "KEY_SEAT_DETECT", "KEY_MAX"]
+    assert pin_names(["KEY_UP", "KEY_SEAT_DETACT", "KEY_MAX"], existing) == existing
+    # 插入新值時既有名稱都還在，不會被拿去沿用
+    assert pin_names(["KEY_UP", "KEY_UPPER", "KEY_SEAT_DETECT", "KEY_MAX"], existing) == \
+        ["KEY_UP", "KEY_UPPER", "KEY_SEAT_DETECT", "KEY_MAX"]
+    # 一個既有名稱只沿用一次，優先給最相近的新名稱
+    assert pin_names(["KEY_SEAT_DETACT", "KEY_SEAT_DETECTS"], ["KEY_SEAT_DETECT"]) == \
+        ["KEY_SEAT_DETACT", "KEY_SEAT_DETECT"]
+    assert pin_names(["KEY_JUMP"], ["KEY_SEAT_DETECT"]) == ["KEY_JUMP"]
+
+
+def test_existing_enums_reads_names_and_comments():
+    names, comments = existing_enums(os.path.join(SCHEMA_DIR, "InputCommand.proto"))
+    assert names["EInputVrType"] == ["INPUT_VR_THROTTLE", "INPUT_VR_RIGHT_BRAKE", "INPUT_VR_LEFT_BRAKE",
+                                     "INPUT_VR_STEER", "INPUT_VR_MAX"]
+    assert comments["INPUT_KEY_NITRO"] == "氮氣加速"
+    assert existing_enums(os.path.join(SCHEMA_DIR, "Missing.proto")) == ({}, {})
+
+
+def test_cache_hit_returns_same_outputs(tmp_path):
+    messages = []
+    first = generate(cache_dir=str(tmp_path))
+    second = generate_outputs(setting_path=SETTING_PATH, output_dir=SCHEMA_DIR, cache_dir=str(tmp_path),
+                              compiler="builtin", log=messages.append)
+    assert second == first
+    assert any("快取命中" in message for message in messages)
+
+
+@pytest.mark.parametrize("text", [
+    'syntax = "proto3"; message A { message B { int32 x = 1; } B b = 1; }',
+    'syntax = "proto3"; message A { enum B { X = 0; } int32 b = 1; }',
+    'syntax = "proto3"; message A { oneof value { int32 x = 1; } }',
+    'syntax = "proto3"; option java_package = "x";',
+    'syntax = "proto3"; import "other.proto";',
+    'syntax = "proto3"; message A { repeated int32 x = 1 [packed = true]; }',
+    'syntax = "proto3"; enum E { option allow_alias = true; X = 0; }',
+    'syntax = "proto3"; message A { map<float, string> m = 1; }',
+    'syntax = "proto3"; message A { Missing m = 1; }',
+    'syntax = "proto2"; message A { int32 x = 1; }',
+])
+def test_parse_rejects_unsupported_syntax(text):
+    with pytest.raises(ProtoSyntaxError):
+        parse_proto(text, "x.proto")
+
+
+def test_map_fields_expand_to_entry_messages():
+    file_proto = parse_proto('syntax = "proto3"; package p; message A { map<string, int32> counts = 1; }', "x.proto")
+    entry = file_proto.message_type[0].nested_type[0]
+    assert entry.name == "CountsEntry" and entry.options.map_entry
+    assert file_proto.message_type[0].field[0].type_name == ".p.A.CountsEntry"
+
+
+def test_descriptor_pool_errors_become_build_errors():
+    with pytest.raises(ProtoSyntaxError, match="x.proto"):
+        compile_builtin({"x.proto": 'syntax = "proto3"; package p; enum E { P_X = 0; P_X = 1; }'})
+
+
+def test_resolve_compiler(monkeypatch):
+    assert resolve_compiler("builtin") == "builtin"
+    monkeypatch.setattr(ProtoBuilder.importlib.util, "find_spec", lambda name: None)
+    assert resolve_compiler("auto") == "builtin"
+    monkeypatch.setattr(ProtoBuilder.importlib.util, "find_spec", lambda name: object())
+    assert resolve_compiler("auto") == "grpc_tools"
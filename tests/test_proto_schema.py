@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""ProtoSchema 匯入時選擇 protobuf 後端但不輸出任何訊息，後端名稱由呼叫端記錄"""
+
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_schema(env=None):
+    completed = subprocess.run(
+        [sys.executable, "-c", "import ProtoSchema; print(ProtoSchema.BACKEND)"],
+        cwd=ROOT, capture_output=True, text=True, timeout=60, env=env
+    )
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout
+
+
+def test_import_is_silent_and_exposes_backend():
+    env = {key: value for key, value in os.environ.items() if key != "PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"}
+    assert import_schema(env).strip() in ("upb", "cpp", "python")
+
+
+def test_explicit_backend_is_respected():
+    env = dict(os.environ, PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION="python")
+    assert import_schema(env) == "python\n"
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""QCliCache 的快取鍵、淘汰與 AutoTestBuilder 只快取通過驗證的程式碼"""
+
+import os
+import sys
+import time
+
+import pytest
+
+import AutoTestBuilder as builder_module
+from AutoTestBuilder import AutoTestBuilder
+from QCliCache import QCliCache
+
+VALID_CODE = "#!/usr/bin/env python3\nclass AutoTestAgent:\n    def __init__(self):\n        self.port = 8587\n"
+INVALID_CODE = "#!/usr/bin/env python3\nprint('沒有 AutoTestAgent 類別')\n"
+COMMAND = "每次都隨機按一個鍵"
+
+
+def test_key_changes_with_prompt_inputs_and_version(tmp_path):
+    cache = QCliCache(str(tmp_path / "cache"))
+    setting = tmp_path / "setting.md"
+    setting.write_text("A", encoding="utf-8")
+    inputs = [str(setting), str(tmp_path / "missing.proto")]
+    base = cache.key("prompt", inputs, "q 1.0")
+
+    assert cache.key("prompt", inputs, "q 1.0") == base
+    assert cache.key("prompt", list(reversed(inputs)), "q 1.0") == base       # 與輸入檔順序無關
+    assert cache.key("prompt!", inputs, "q 1.0") != base
+    assert cache.key("prompt", inputs, "q 1.1") != base
+    setting.write_text("B", encoding="utf-8")
+    assert cache.key("prompt", inputs, "q 1.0") != base
+    setting.write_text("A", encoding="utf-8")
+    assert cache.key("prompt", inputs, "q 1.0") == base                        # 只看內容，不看修改時間
+    (tmp_path / "missing.proto").write_text("", encoding="utf-8")
+    assert cache.key("prompt", inputs, "q 1.0") != base                        # 缺少的檔案也計入
+
+
+def set_age(cache, key, seconds_ago):
+    stamp = time.time() - seconds_ago
+    os.utime(cache._path(key), (stamp, stamp))
+
+
+def test_get_refreshes_and_expires_by_age(tmp_path):
+    cache = QCliCache(str(tmp_path), max_age=3600)
+    cache.put("fresh", "a")
+    cache.put("old", "b")
+    set_age(cache, "fresh", 1800)
+    set_age(cache, "old", 7200)
+
+    assert cache.get("fresh") == "a"
+    assert os.path.getmtime(cache._path("fresh")) > time.time() - 60          # 命中時更新最後使用時間
+    assert cache.get("old") is None
+    assert not os.path.exists(cache._path("old"))
+    assert cache.get("never") is None
+
+
+def test_evict_removes_least_recently_used_first(tmp_path):
+    cache = QCliCache(str(tmp_path), max_age=0)
+    for index, name in enumerate(["a", "b", "c"]):
+        cache.put(name, "x" * 1000)
+        set_age(cache, name, 300 - index * 100)
+    assert [os.path.basename(path) for _, _, path in cache.entries()] == ["a.py", "b.py", "c.py"]
+    cache.get("a")                                                             # a 變成最近使用
+
+    cache.max_bytes = 2500
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == "x" * 1000
+
+
+def test_put_evicts_expired_entries(tmp_path):
+    cache = QCliCache(str(tmp_path), max_age=3600)
+    cache.put("old", "b")
+    set_age(cache, "old", 7200)
+    cache.put("new", "a")
+    assert [os.path.basename(path) for _, _, path in cache.entries()] == ["new.py"]
+    assert cache.clear() == 1 and cache.entries() == []
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    # 固定 Q CLI 版本，不實際執行 q --version
+    monkeypatch.setattr("QCliCache._tool_version", "q test")
+    builder = AutoTestBuilder(force_qcli=True, log_file=str(tmp_path / "builder.log"))
+    builder.cache = QCliCache(str(tmp_path / "cache"))
+    builder.output_path = str(tmp_path / "AutoTestAgent_Custom.py")
+    builder.calls = []
+
+    def fake_call_qcli(prompt):
+        builder.calls.append(prompt)
+        return builder.qcli_output
+
+    builder.call_qcli = fake_call_qcli
+    return builder
+
+
+def cache_key(builder):
+    prompt = builder.build_qcli_prompt(COMMAND, builder.load_game_setting(), builder.load_base_agent())
+    return builder.cache.key(prompt, builder.cache_inputs, "q test")
+
+
+def test_builder_caches_only_validated_code(builder):
+    builder.qcli_output = INVALID_CODE
+    assert builder.process_command(COMMAND)
+    assert builder.cache.entries() == []                                       # 驗證失敗仍輸出，但不快取
+
+    builder.qcli_output = VALID_CODE
+    assert builder.process_command(COMMAND)
+    assert builder.cache.get(cache_key(builder)) == VALID_CODE.strip()
+
+    builder.qcli_output = None
+    assert builder.process_command(COMMAND)                                    # 第三次直接命中快取
+    assert len(builder.calls) == 2
+    with open(builder.output_path, "r", encoding="utf-8") as f:
+        assert f.read() == VALID_CODE.strip()
+
+
+def test_no_cache_always_calls_qcli(builder):
+    builder.qcli_output = VALID_CODE
+    builder.process_command(COMMAND)
+    uncached = AutoTestBuilder(force_qcli=True, use_cache=False, log_file=builder.log_file)
+    uncached.output_path, uncached.call_qcli = builder.output_path, builder.call_qcli
+    assert uncached.cache is None
+    assert uncached.process_command(COMMAND)
+    assert len(builder.calls) == 2                                             # 快取中已有項目也不使用
+
+
+def test_no_cache_flag_disables_cache(monkeypatch):
+    created = {}
+
+    class Recorder:
+        def __init__(self, **kwargs):
+            created.update(kwargs)
+
+        def log(self, message):
+            pass
+
+        def process_command(self, command):
+            return True
+
+    monkeypatch.setattr(builder_module, "AutoTestBuilder", Recorder)
+    monkeypatch.setattr(sys, "argv", ["AutoTestBuilder.py", "--no-cache", "--command", COMMAND])
+    builder_module.main()
+    assert created["use_cache"] is False
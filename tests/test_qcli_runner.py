@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""QCliRunner：串流擷取、提早結束、逾時與取消時中止整個行程群組 (以 sys.executable -c 模擬 Q CLI)"""
+
+import os
+import sys
+import time
+import textwrap
+
+import pytest
+
+import QCliRunner
+from QCliRunner import StreamingTranscript, QCliResult
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="行程群組測試需要 POSIX")
+
+MODULE = textwrap.dedent("""\
+    #!/usr/bin/env python3
+    import sys
+
+    def main():
+        print("hi")
+
+    if __name__ == "__main__":
+        main()
+    """)
+
+
+def fake_qcli(body):
+    return [sys.executable, "-c", textwrap.dedent(body)]
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def wait_dead(pid, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not alive(pid)
+
+
+def test_transcript_ends_after_main_guard_with_split_ansi_codes():
+    transcript = StreamingTranscript()
+    text = "說明文字\n\x1b[32m" + MODULE.replace("main()\n", "\x1b[0mmain()\n", 1) + "以上是程式碼\n後續說明\n"
+    data = text.encode("utf-8")
+    # 一次一個位元組餵入：跳脫序列與多位元組字元都會被切開
+    for index in range(len(data)):
+        transcript.feed(data[index:index + 1])
+        if transcript.complete:
+            break
+    assert transcript.complete
+    assert transcript.finish().split("\n")[-1] == "    main()"
+    assert "\x1b" not in transcript.finish()
+    assert transcript.finish().split("\n")[1] == "#!/usr/bin/env python3"
+
+
+def test_transcript_waits_while_main_body_continues():
+    transcript = StreamingTranscript()
+    transcript.feed(MODULE.encode("utf-8"))
+    assert not transcript.complete                 # 還沒看到 main guard 之後的行
+    transcript.feed(b"    print('more')\n")
+    assert not transcript.complete
+    transcript.feed(b"# comment\n")
+    assert not transcript.complete
+    transcript.feed(b"```\n")
+    assert transcript.complete
+    assert transcript.finish().endswith("print('more')\n# comment")
+
+
+def test_transcript_replaces_invalid_utf8():
+    transcript = StreamingTranscript()
+    transcript.feed(b"\xff\xfe ok\n")
+    assert transcript.finish() == "�� ok"
+
+
+def test_stopped_early_kills_process_and_reports_success():
+    command = fake_qcli(f"""
+        import sys, time
+        for line in {MODULE.splitlines()!r}:
+            print(line, flush=True)
+            time.sleep(0.01)
+        print("done", flush=True)
+        time.sleep(60)
+        sys.exit(3)
+        """)
+    runner = QCliRunner.QCliRunner(timeout=30, log=lambda message: None, progress_interval=0)
+    result = runner.run(command)
+    assert result.stopped_early and not result.timed_out
+    assert result.returncode == 0                  # 被中止但視為成功
+    assert runner.process.returncode != 0
+    assert result.stdout.endswith("    main()")
+    assert result.elapsed < 10
+
+
+def test_timeout_kills_the_whole_process_group():
+    command = fake_qcli("""
+        import subprocess, sys, time
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        print(child.pid, flush=True)
+        time.sleep(60)
+        """)
+    messages = []
+    runner = QCliRunner.QCliRunner(timeout=1.0, log=messages.append, progress_interval=0.3)
+    result = runner.run(command)
+    assert result.timed_out and not result.stopped_early
+    assert 0.9 <= result.elapsed < 10
+    assert runner.process.poll() is not None
+    assert wait_dead(int(result.stdout.split()[0])), "Q CLI 的子行程沒有被中止"
+    assert any("Q CLI 執行中" in message for message in messages)
+
+
+def test_normal_exit_keeps_returncode_and_stderr():
+    command = fake_qcli("""
+        import sys
+        print("no code here")
+        print("錯誤", file=sys.stderr)
+        sys.exit(2)
+        """)
+    result = QCliRunner.QCliRunner(timeout=30, log=lambda message: None).run(command)
+    assert (result.returncode, result.stopped_early, result.timed_out) == (2, False, False)
+    assert result.stdout.strip() == "no code here"
+    assert result.stderr.strip() == "錯誤"
+
+
+def test_cancel_before_run_stops_immediately():
+    runner = QCliRunner.QCliRunner(timeout=30, log=lambda message: None)
+    runner.cancel()
+    result = runner.run(fake_qcli("import time; time.sleep(60)"))
+    assert result.cancelled
+    assert result.elapsed < 10
+    assert runner.process.returncode is not None
+
+
+def test_exception_while_reading_still_reaps_process(monkeypatch):
+    class Broken(StreamingTranscript):
+        def feed(self, data):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(QCliRunner, "StreamingTranscript", Broken)
+    runner = QCliRunner.QCliRunner(timeout=30, log=lambda message: None)
+    with pytest.raises(RuntimeError):
+        runner.run(fake_qcli("import time; print('x', flush=True); time.sleep(60)"))
+    assert runner.process.returncode is not None
+
+
+def test_result_returncode_zero_only_when_stopped_early():
+    assert QCliResult([], -9, "", "", stopped_early=True).returncode == 0
+    assert QCliResult([], -9, "", "", timed_out=True).returncode == -9
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""RaceController 在 GameSimulator 的彎曲賽道上留在賽道內，比不轉向的基準更快完賽"""
+
+import math
+
+from GameSimulator import GameSimulator, S, track_center, TRACK_HALF_WIDTH
+from RaceController import RaceController, _benchmark_frames
+
+STEP = 1 / 60
+RACE_SECONDS = 30.0
+
+
+def drive(controller):
+    """以固定時間步長模擬一場比賽，回傳 (完賽秒數或 None, 最遠 x, 偏離賽道的 frame 比例)"""
+    simulator = GameSimulator(race_duration=RACE_SECONDS)
+    simulator.set_state(S.GAME_FLOW_RACE)
+    farthest = 0.0
+    off_track = 0
+    steps = int(RACE_SECONDS / STEP)
+    for step in range(steps):
+        if controller and simulator.game_data.HasField("race_data"):
+            simulator.steer, simulator.throttle = controller.update(simulator.game_data.race_data)
+        simulator._drive(STEP)
+        if simulator.state != S.GAME_FLOW_RACE:
+            return (step + 1) * STEP, farthest, off_track / (step + 1)
+        x, y = simulator.race_position
+        farthest = max(farthest, x)
+        off_track += abs(y - track_center(x)) > TRACK_HALF_WIDTH
+    return None, farthest, off_track / steps
+
+
+def test_controller_beats_no_steer_baseline():
+    finish, _, off_track = drive(RaceController())
+    baseline_finish, baseline_farthest, baseline_off_track = drive(None)
+
+    assert baseline_finish is None and baseline_farthest < 200.0
+    assert finish is not None and finish < RACE_SECONDS
+    assert off_track < 0.05 < baseline_off_track
+
+
+def test_controller_output_is_bounded_and_resets():
+    controller = RaceController()
+    for race_data in _benchmark_frames(500, seed=2):
+        steer, throttle = controller.update(race_data)
+        assert -1.0 <= steer <= 1.0 and controller.min_throttle <= throttle <= 1.0
+    controller.reset()
+    assert controller.previous_pos is None and controller.output == (0.0, 1.0)
+
+
+def test_controller_steers_toward_target():
+    from ProtoSchema.GameFlowData_pb2 import GameRaceData
+
+    # 朝 +x 前進，目標在左側 (+y) 時轉向為負 (逆時針)，右側時為正
+    for target_y, sign in ((5.0, -1), (-5.0, 1)):
+        controller = RaceController()
+        for x in (0.0, 0.1):
+            race_data = GameRaceData(current_pos_x=x, target_position_x=x + 10.0, target_position_y=target_y,
+                                     normal_z=1.0)
+            steer, _ = controller.update(race_data)
+        assert math.copysign(1, steer) == sign
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""TransitionModel 從錄製資料學習流程轉換圖，FlowPlanner 依期望步數最短路徑走到可達的目標狀態"""
+
+import math
+import random
+
+from FrameRecorder import FrameRecorder
+from GameSimulator import GameSimulator, S, K
+from TransitionModel import TransitionModel, FlowPlanner
+from ProtoSchema.InputCommand_pb2 import EInputKeyType, InputCommand
+
+SELECTION = [S.GAME_FLOW_SELECT_MODE, S.GAME_FLOW_PHOTO_AUTH, S.GAME_FLOW_SELECT_SCENE, S.GAME_FLOW_SELECT_BIKE]
+KEYS = [K.INPUT_KEY_START, K.INPUT_KEY_LEFT, K.INPUT_KEY_RIGHT, K.INPUT_KEY_UP, K.INPUT_KEY_COIN]
+
+
+def key_name(key):
+    return EInputKeyType.Name(key).replace("INPUT_KEY_", "")
+
+
+def test_plan_accounts_for_retries_and_skips_unreachable_states():
+    model = TransitionModel()
+    # A 按 GO 有一半機率停在原地，按 SLOW 一定經過 B；B 按 GO 直達 C；D 到不了 C
+    model.observe_sequence([(1, "GO"), (1, "GO"), (3, None)])
+    model.observe_sequence([(1, "SLOW"), (2, "GO"), (3, None)])
+    model.observe_sequence([(4, "GO"), (4, None)])
+    policy, distance = model.plan(3)
+
+    assert distance[3] == 0.0 and distance[2] == 1.0
+    assert distance[1] == 2.0 and policy[1] in ("GO", "SLOW")   # 重試的期望步數 1 / (1 - 0.5) = 2
+    assert policy[2] == "GO"
+    assert 4 not in policy and math.isinf(distance[4])
+
+    # 只允許 SLOW 時 B 無法前往 C，但 A 仍可前往 B
+    policy, distance = model.plan(3, allowed_keys={"SLOW"})
+    assert policy == {} and math.isinf(distance[1])
+    policy, distance = model.plan(2, allowed_keys={"SLOW"})
+    assert policy == {1: "SLOW"} and distance[1] == 1.0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    model = TransitionModel()
+    model.observe_sequence([(1, "START"), (2, "LEFT"), (2, "START"), (3, None)])
+    path = str(tmp_path / "FlowModel.json")
+    model.save(path)
+    assert TransitionModel.load(path).counts == model.counts
+
+
+def record_random_session(path, steps=600, seed=3):
+    """在選擇流程中隨機按鍵並錄製收發封包，到達 LOAD_GAME 後重新開始"""
+    rng = random.Random(seed)
+    simulator = GameSimulator()
+    simulator.set_state(S.GAME_FLOW_SELECT_MODE)
+    recorder = FrameRecorder(path)
+    for _ in range(steps):
+        recorder.record_received(simulator.frame())
+        if simulator.state not in SELECTION:
+            simulator.set_state(S.GAME_FLOW_SELECT_MODE)
+            continue
+        key = rng.choice(KEYS)
+        recorder.record_sent(InputCommand(key_inputs=[key], is_key_down=True).SerializeToString())
+        simulator.press(key)
+    recorder.close()
+
+
+def test_planner_reaches_target_learned_from_capture(tmp_path):
+    path = str(tmp_path / "session.capture")
+    record_random_session(path)
+    model = TransitionModel()
+    assert model.learn(path) == 600
+
+    planner = FlowPlanner(model, S.GAME_FLOW_LOAD_GAME, explore=0.0)
+    assert all(planner.policy[state] == "START" for state in SELECTION)
+
+    simulator = GameSimulator()
+    simulator.set_state(S.GAME_FLOW_SELECT_MODE)
+    for _ in range(len(SELECTION)):
+        key = planner.choose(simulator.state)
+        simulator.press(EInputKeyType.Value("INPUT_KEY_" + key))
+    assert simulator.state == S.GAME_FLOW_LOAD_GAME
+    assert planner.choose(S.GAME_FLOW_RACE) is None                # 沒有規劃的狀態交給隨機選鍵
+
+
+def test_explore_falls_back_to_random_keys():
+    model = TransitionModel()
+    model.observe_sequence([(1, "START"), (2, None)])
+    random.seed(0)
+    planner = FlowPlanner(model, 2, explore=0.5)
+    choices = [planner.choose(1) for _ in range(200)]
+    assert choices.count(None) > 50 and choices.count("START") > 50